@@ -15,7 +15,7 @@ CREATE OR REPLACE AGENT INS_CO.LOSS_CLAIMS.CLAIMS_AUDIT_AGENT
   },
   "instructions": {
     "response": "In your response, address me by my first name",
-    "orchestration": "You are an insurance claims agent.\n\nPriority 1 (Analysis):\nUse CA_INS (Cortex Analyst with semantic view) for quantitative questions about the claim.\n\nUse the two Cortex Search tools (claim_notes, guidelines) for guidelines, notes, or qualitative \"why\" questions.\n\n-If the user asks about claim completeness, deem a claim as complete if the following are available: Claim level data, claim lines, financial, claim notes.\n\n-Produce charts when possible.",
+    "orchestration": "You are an insurance claims agent.\n\nPriority 1 (Analysis):\nUse CA_INS (Cortex Analyst with semantic view) for quantitative questions about the claim.\n\nUse the two Cortex Search tools (claim_notes, guidelines) for guidelines, notes, or qualitative \"why\" questions.\n\nFor the standard audit checks on a claim (payment issued 3-5, 8-13, 14-29 or 30+ days after the invoice, total payment over total reserve, payment over performer authority), call CLAIM_AUDIT_FLAGS first. It returns the precomputed result and violation details for every rule, so only use CA_INS when the user asks for more than the flags contain.\n\nIf the user asks whether an image appears to be tampered with, reused or duplicated, call IMAGE_REUSE with the file name. Report any other claims the image also appears on before describing the image.\n\n-If the user asks about claim completeness, deem a claim as complete if the following are available: Claim level data, claim lines, financial, claim notes.\n\n-Produce charts when possible.",
     "sample_questions": [
       {
         "question": "Based on the state of new jersey's insurance claims guidelines, have any of my claims been outside of the mandated settlement window?"
@@ -157,9 +157,53 @@ CREATE OR REPLACE AGENT INS_CO.LOSS_CLAIMS.CLAIMS_AUDIT_AGENT
           ]
         }
       }
+    },
+    {
+      "tool_spec": {
+        "type": "generic",
+        "name": "CLAIM_AUDIT_FLAGS",
+        "description": "PROCEDURE/FUNCTION DETAILS:\n- Type: Custom Function\n- Language: SQL\n- Signature: (P_CLAIM_NO VARCHAR)\n- Returns: ARRAY of OBJECT (rule_id, rule, flagged, violation_count, details, evaluated_at)\n- Execution: Lookup of precomputed results, no model calls\n- Volatility: Stable between runs of REFRESH_CLAIM_AUDIT_FLAGS\n- Primary Function: Claim audit rule results\n- Target: CLAIM_AUDIT_FLAGS table\n- Error Handling: Returns NULL if the claim has not been evaluated\n\nDESCRIPTION:\nThis function returns the deterministic audit rule results for one claim from the CLAIM_AUDIT_FLAGS table, which REFRESH_CLAIM_AUDIT_FLAGS fills for every claim at once. Each element covers one rule: payment issued to the vendor 3-5, 8-13, 14-29 or 30+ calendar days after the invoice was received, total payment amount over the total reserved amount, and payment in excess of the performer authority. Flagged rules include a details array listing each offending invoice and payment, claim total, or payment and authority limit, so the answer can be given without generating SQL.\n\nUSAGE SCENARIOS:\n- Claim audits: Answer the standard audit questions for a claim instantly and consistently\n- Triage: Check which rules a claim violates before drilling into notes, invoices or guidelines",
+        "input_schema": {
+          "type": "object",
+          "properties": {
+            "p_claim_no": {
+              "type": "string"
+            }
+          },
+          "required": [
+            "p_claim_no"
+          ]
+        }
+      }
+    },
+    {
+      "tool_spec": {
+        "type": "generic",
+        "name": "IMAGE_REUSE",
+        "description": "PROCEDURE/FUNCTION DETAILS:\n- Type: Custom Function\n- Language: SQL\n- Signature: (P_FILE_NAME VARCHAR)\n- Returns: ARRAY of OBJECT (match_relative_path, match_claim_no, cross_claim, phash_distance, dhash_distance)\n- Execution: Lookup of precomputed perceptual-hash matches, no model calls\n- Volatility: Stable between runs of pyutil/imghash\n- Primary Function: Reused and near-duplicate evidence image detection\n- Target: EVIDENCE_IMAGE_MATCHES table\n- Error Handling: Returns NULL if the image has not been hashed, an empty array if it has no near-duplicates\n\nDESCRIPTION:\nThis function returns the evidence images that are near-duplicates of the given image file, including lightly edited copies (resized, recompressed, cropped or brightened), with the claim each one belongs to. Matches come from perceptual hashes (pHash and dHash) of every image in the loss_evidence stage, so the check covers all claims at once. A match with cross_claim TRUE means the same photo was submitted as evidence on another claim, a common fraud signal. Smaller distances mean more similar images (0 is visually identical).\n\nUSAGE SCENARIOS:\n- Fraud detection: Check whether a photo also appears on other claims before assessing it\n- Tampering questions: Combine with Image_summary when asked whether an image appears to be tampered with or reused",
+        "input_schema": {
+          "type": "object",
+          "properties": {
+            "p_file_name": {
+              "type": "string"
+            }
+          },
+          "required": [
+            "p_file_name"
+          ]
+        }
+      }
     }
   ],
   "tool_resources": {
+    "CLAIM_AUDIT_FLAGS": {
+      "type": "function",
+      "execution_environment": {
+        "type": "warehouse",
+        "query_timeout": 30
+      },
+      "identifier": "INS_CO.LOSS_CLAIMS.GET_CLAIM_AUDIT_FLAGS"
+    },
     "CLASSIFY_FUNCTION": {
       "type": "function",
       "execution_environment": {
@@ -168,6 +212,14 @@ CREATE OR REPLACE AGENT INS_CO.LOSS_CLAIMS.CLAIMS_AUDIT_AGENT
       },
       "identifier": "INS_CO.LOSS_CLAIMS.CLASSIFY_DOCUMENT"
     },
+    "IMAGE_REUSE": {
+      "type": "function",
+      "execution_environment": {
+        "type": "warehouse",
+        "query_timeout": 30
+      },
+      "identifier": "INS_CO.LOSS_CLAIMS.FIND_REUSED_IMAGES"
+    },
     "Image_summary": {
       "type": "function",
       "execution_environment": {
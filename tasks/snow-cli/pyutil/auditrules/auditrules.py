@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+auditrules - deterministic claim audit rule engine
+Evaluates the claim audit checks for every claim at once instead of asking Cortex
+Analyst one claim and one question at a time. The rules are declared once in RULES and
+can be evaluated two ways with the same semantics:
+
+    generate-sql  Writes set-based SQL (sql/batch-2/010-claim_audit_flags.sql) that fills
+                  the CLAIM_AUDIT_FLAGS table in Snowflake with one row per claim and rule
+    evaluate      Runs the rules with pandas joins on a local extract laid out for
+                  pyutil/snowcliload (e.g. the output of pyutil/synthclaims)
+"""
+
+import argparse
+import json
+import sys
+import textwrap
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+SNOW_CLI_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_SQL_FILE = SNOW_CLI_DIR / "sql" / "batch-2" / "010-claim_audit_flags.sql"
+FLAGS_TABLE = "INS_CO.LOSS_CLAIMS.CLAIM_AUDIT_FLAGS"
+
+# Audit rules in display order. Payment lag rules compare each vendor invoice with the
+# PAY transactions on the same claim line; max_days None means open-ended.
+RULES = [
+    {"rule_id": "PAYMENT_LAG_3_5", "kind": "payment_lag", "min_days": 3, "max_days": 5,
+     "description": "Payment issued to the vendor 3-5 calendar days after the invoice was received"},
+    {"rule_id": "PAYMENT_LAG_8_13", "kind": "payment_lag", "min_days": 8, "max_days": 13,
+     "description": "Payment issued to the vendor 8-13 calendar days after the invoice was received"},
+    {"rule_id": "PAYMENT_LAG_14_29", "kind": "payment_lag", "min_days": 14, "max_days": 29,
+     "description": "Payment issued to the vendor 14-29 calendar days after the invoice was received"},
+    {"rule_id": "PAYMENT_LAG_30_PLUS", "kind": "payment_lag", "min_days": 30, "max_days": None,
+     "description": "Payment issued to the vendor 30+ calendar days after the invoice was received",
+     "truth_column": "LATE_PAYMENT"},
+    {"rule_id": "PAY_OVER_RESERVE", "kind": "pay_over_reserve",
+     "description": "Total payment amount for the claim exceeds the total reserved amount",
+     "truth_column": "OVER_RESERVE"},
+    {"rule_id": "PAY_OVER_AUTHORITY", "kind": "pay_over_authority",
+     "description": "Payment made in excess of the performer authority",
+     "truth_column": "OVER_AUTHORITY"},
+]
+
+FLAG_COLUMNS = ["CLAIM_NO", "RULE_ID", "RULE_ORDER", "RULE_DESCRIPTION", "FLAGGED", "VIOLATION_COUNT", "DETAILS"]
+
+
+def sql_literal(value: str) -> str:
+    """Quote a string as a SQL literal."""
+    return "'" + value.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def lag_condition(rule: Dict) -> str:
+    """SQL condition on days_between for a payment lag rule."""
+    if rule["max_days"] is None:
+        return f"days_between >= {rule['min_days']}"
+    return f"days_between BETWEEN {rule['min_days']} AND {rule['max_days']}"
+
+
+def rule_violations_sql(rule: Dict) -> str:
+    """SELECT returning one row per violation of a rule: claim_no, rule_id, sort keys and detail."""
+    rule_id = sql_literal(rule["rule_id"])
+    if rule["kind"] == "payment_lag":
+        return (
+            f"SELECT claim_no, {rule_id} AS rule_id, line_no, fxid,\n"
+            f"              OBJECT_CONSTRUCT('line_no', line_no, 'inv_id', inv_id, 'vendor', vendor,\n"
+            f"                               'invoice_date', invoice_date, 'payment_date', fin_tx_post_dt,\n"
+            f"                               'days', days_between) AS detail\n"
+            f"       FROM invoice_payments\n"
+            f"       WHERE {lag_condition(rule)}"
+        )
+    if rule["kind"] == "pay_over_reserve":
+        return (
+            f"SELECT claim_no, {rule_id} AS rule_id, NULL AS line_no, NULL AS fxid,\n"
+            f"              OBJECT_CONSTRUCT('total_payment', total_pay, 'total_reserve', total_rsv) AS detail\n"
+            f"       FROM claim_totals\n"
+            f"       WHERE total_pay > total_rsv"
+        )
+    if rule["kind"] == "pay_over_authority":
+        return (
+            f"SELECT p.claim_no, {rule_id} AS rule_id, p.line_no, p.fxid,\n"
+            f"              OBJECT_CONSTRUCT('line_no', p.line_no, 'performer_id', p.performer_id,\n"
+            f"                               'payment', p.fin_tx_amt, 'authority', a.to_amt) AS detail\n"
+            f"       FROM payments p\n"
+            f"                JOIN INS_CO.LOSS_CLAIMS.authorization a ON a.performer_id = p.performer_id\n"
+            f"       WHERE p.fin_tx_amt > a.to_amt"
+        )
+    raise ValueError(f"Unknown rule kind: {rule['kind']}")
+
+
+def generate_sql(rules: List[Dict] = RULES) -> str:
+    """
+    Generate the SQL script that evaluates every rule for every claim in one statement.
+
+    Args:
+        rules: Rule declarations
+
+    Returns:
+        SQL script creating REFRESH_CLAIM_AUDIT_FLAGS and GET_CLAIM_AUDIT_FLAGS and refreshing the flags
+    """
+    rule_values = ",\n                  ".join(
+        f"({sql_literal(rule['rule_id'])}, {order}, {sql_literal(rule['description'])})"
+        for order, rule in enumerate(rules, start=1)
+    )
+    violations = textwrap.indent(
+        "       " + "\n       UNION ALL\n       ".join(rule_violations_sql(rule) for rule in rules), " " * 8
+    )
+
+    return f"""-- Generated by pyutil/auditrules/auditrules.py generate-sql. Do not edit by hand;
+-- change RULES in auditrules.py and regenerate.
+USE DATABASE ins_co;
+USE SCHEMA ins_co.loss_claims;
+
+-- Evaluates every audit rule for every claim in a single set-based statement and
+-- replaces the contents of CLAIM_AUDIT_FLAGS (one row per claim and rule).
+CREATE OR REPLACE PROCEDURE INS_CO.LOSS_CLAIMS.REFRESH_CLAIM_AUDIT_FLAGS()
+  RETURNS OBJECT
+  LANGUAGE SQL
+  EXECUTE AS OWNER
+  AS
+  $$
+    DECLARE
+    v_rows INTEGER DEFAULT 0;
+    v_flagged INTEGER DEFAULT 0;
+    BEGIN
+      INSERT OVERWRITE INTO INS_CO.LOSS_CLAIMS.CLAIM_AUDIT_FLAGS
+          (claim_no, rule_id, rule_order, rule_description, flagged, violation_count, details, evaluated_at)
+      WITH payments AS (SELECT cl.claim_no, cl.line_no, cl.performer_id, ft.fxid, ft.fin_tx_amt, ft.fin_tx_post_dt
+                        FROM INS_CO.LOSS_CLAIMS.claim_lines cl
+                                 JOIN INS_CO.LOSS_CLAIMS.financial_transactions ft ON ft.line_no = cl.line_no
+                        WHERE ft.financial_type = 'PAY'),
+           invoice_payments AS (SELECT p.claim_no, p.line_no, p.fxid, p.fin_tx_post_dt,
+                                       i.inv_id, i.vendor, i.invoice_date,
+                                       DATEDIFF(DAY, i.invoice_date, p.fin_tx_post_dt) AS days_between
+                                FROM payments p
+                                         JOIN (SELECT DISTINCT inv_id, line_no, vendor, invoice_date
+                                               FROM INS_CO.LOSS_CLAIMS.invoices) i ON i.line_no = p.line_no),
+           claim_totals AS (SELECT cl.claim_no,
+                                   SUM(IFF(ft.financial_type = 'PAY', ft.fin_tx_amt, 0)) AS total_pay,
+                                   SUM(IFF(ft.financial_type = 'RSV', ft.fin_tx_amt, 0)) AS total_rsv
+                            FROM INS_CO.LOSS_CLAIMS.claim_lines cl
+                                     JOIN INS_CO.LOSS_CLAIMS.financial_transactions ft ON ft.line_no = cl.line_no
+                            GROUP BY cl.claim_no),
+           violations AS (
+{violations}
+           ),
+           rules AS (SELECT column1 AS rule_id, column2 AS rule_order, column3 AS rule_description
+                     FROM VALUES
+                  {rule_values})
+      SELECT c.claim_no,
+             r.rule_id,
+             r.rule_order,
+             r.rule_description,
+             COUNT(v.rule_id) > 0                                                           AS flagged,
+             COUNT(v.rule_id)                                                               AS violation_count,
+             IFF(COUNT(v.rule_id) > 0,
+                 TO_JSON(ARRAY_AGG(v.detail) WITHIN GROUP (ORDER BY v.line_no, v.fxid)), NULL) AS details,
+             CURRENT_TIMESTAMP()                                                            AS evaluated_at
+      FROM INS_CO.LOSS_CLAIMS.claims c
+               CROSS JOIN rules r
+               LEFT JOIN violations v ON v.claim_no = c.claim_no AND v.rule_id = r.rule_id
+      GROUP BY c.claim_no, r.rule_id, r.rule_order, r.rule_description;
+
+      v_rows := SQLROWCOUNT;
+      SELECT COUNT(DISTINCT claim_no) INTO :v_flagged
+      FROM INS_CO.LOSS_CLAIMS.CLAIM_AUDIT_FLAGS
+      WHERE flagged;
+
+      RETURN OBJECT_CONSTRUCT('success', TRUE, 'rows', :v_rows, 'flagged_claims', :v_flagged,
+                              'refresh_timestamp', CURRENT_TIMESTAMP());
+    END;
+  $$
+;
+
+-- Precomputed audit flags for one claim, for the agent and the Streamlit app
+CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.GET_CLAIM_AUDIT_FLAGS(P_CLAIM_NO VARCHAR)
+  RETURNS ARRAY
+  LANGUAGE SQL
+  AS
+  $$
+    SELECT ARRAY_AGG(OBJECT_CONSTRUCT('rule_id', rule_id,
+                                      'rule', rule_description,
+                                      'flagged', flagged,
+                                      'violation_count', violation_count,
+                                      'details', PARSE_JSON(details),
+                                      'evaluated_at', evaluated_at))
+                     WITHIN GROUP (ORDER BY rule_order)
+    FROM INS_CO.LOSS_CLAIMS.CLAIM_AUDIT_FLAGS
+    WHERE claim_no = P_CLAIM_NO
+  $$
+;
+
+CALL INS_CO.LOSS_CLAIMS.REFRESH_CLAIM_AUDIT_FLAGS();
+"""
+
+
+def read_table(data_dir: Path, table: str) -> Optional[pd.DataFrame]:
+    """
+    Read one table from a local extract as strings.
+
+    Accepts <table>.csv|.csv.gz|.parquet or a <table>/ directory of part files.
+
+    Returns:
+        DataFrame with upper-cased column names, or None if the table is missing
+    """
+    candidates = [data_dir / f"{table}.csv", data_dir / f"{table}.csv.gz", data_dir / f"{table}.parquet"]
+    parts = [path for path in candidates if path.is_file()]
+    if (data_dir / table).is_dir():
+        parts = sorted((data_dir / table).glob("*.parquet")) or sorted((data_dir / table).glob("*.csv*"))
+    if not parts:
+        return None
+
+    frames = [
+        pd.read_parquet(part).astype(str) if part.suffix == ".parquet" else pd.read_csv(part, dtype=str)
+        for part in parts
+    ]
+    frame = pd.concat(frames, ignore_index=True)
+    frame.columns = [column.upper() for column in frame.columns]
+    return frame
+
+
+def load_extract(data_dir: Path) -> Dict[str, pd.DataFrame]:
+    """Read the tables the rules need from a local extract."""
+    tables = {}
+    for table in ("claims", "claim_lines", "financial_transactions", "invoices", "authorization"):
+        frame = read_table(data_dir, table)
+        if frame is None:
+            raise FileNotFoundError(f"No input found for {table.upper()} in {data_dir}")
+        tables[table] = frame
+    return tables
+
+
+def evaluate(tables: Dict[str, pd.DataFrame], rules: List[Dict] = RULES) -> pd.DataFrame:
+    """
+    Evaluate every rule for every claim with vectorized pandas joins.
+
+    Produces the same rows as the generated SQL (without EVALUATED_AT).
+
+    Args:
+        tables: DataFrames keyed by lower-case table name, with upper-case columns
+        rules: Rule declarations
+
+    Returns:
+        DataFrame with FLAG_COLUMNS, one row per claim and rule
+    """
+    lines = tables["claim_lines"][["CLAIM_NO", "LINE_NO", "PERFORMER_ID"]].astype(str)
+    ft = tables["financial_transactions"][["FXID", "LINE_NO", "FINANCIAL_TYPE", "FIN_TX_AMT", "FIN_TX_POST_DT"]].copy()
+    ft["LINE_NO"] = ft["LINE_NO"].astype(str)
+    ft["FIN_TX_AMT"] = pd.to_numeric(ft["FIN_TX_AMT"])
+    ft["FIN_TX_POST_DT"] = pd.to_datetime(ft["FIN_TX_POST_DT"])
+    invoices = tables["invoices"][["INV_ID", "LINE_NO", "VENDOR", "INVOICE_DATE"]].astype(str).drop_duplicates()
+    invoices["INVOICE_DATE"] = pd.to_datetime(invoices["INVOICE_DATE"])
+    authorization = tables["authorization"][["PERFORMER_ID", "TO_AMT"]].astype(str)
+    authorization["TO_AMT"] = pd.to_numeric(authorization["TO_AMT"])
+
+    line_ft = ft.merge(lines, on="LINE_NO")
+    payments = line_ft[line_ft["FINANCIAL_TYPE"] == "PAY"]
+    invoice_payments = payments.merge(invoices, on="LINE_NO")
+    invoice_payments = invoice_payments.assign(
+        DAYS_BETWEEN=(invoice_payments["FIN_TX_POST_DT"] - invoice_payments["INVOICE_DATE"]).dt.days
+    )
+    totals = line_ft.assign(
+        PAY=line_ft["FIN_TX_AMT"].where(line_ft["FINANCIAL_TYPE"] == "PAY", 0.0),
+        RSV=line_ft["FIN_TX_AMT"].where(line_ft["FINANCIAL_TYPE"] == "RSV", 0.0),
+    ).groupby("CLAIM_NO", as_index=False)[["PAY", "RSV"]].sum()
+    payments_auth = payments.merge(authorization, on="PERFORMER_ID")
+
+    violations = []
+    for rule in rules:
+        if rule["kind"] == "payment_lag":
+            days = invoice_payments["DAYS_BETWEEN"]
+            hit = days >= rule["min_days"]
+            if rule["max_days"] is not None:
+                hit &= days <= rule["max_days"]
+            rows = invoice_payments[hit]
+            details = [
+                {"line_no": r.LINE_NO, "inv_id": r.INV_ID, "vendor": r.VENDOR,
+                 "invoice_date": r.INVOICE_DATE.date().isoformat(),
+                 "payment_date": r.FIN_TX_POST_DT.date().isoformat(), "days": int(r.DAYS_BETWEEN)}
+                for r in rows.itertuples()
+            ]
+        elif rule["kind"] == "pay_over_reserve":
+            rows = totals[totals["PAY"] > totals["RSV"]].assign(LINE_NO="", FXID="")
+            details = [{"total_payment": r.PAY, "total_reserve": r.RSV} for r in rows.itertuples()]
+        elif rule["kind"] == "pay_over_authority":
+            rows = payments_auth[payments_auth["FIN_TX_AMT"] > payments_auth["TO_AMT"]]
+            details = [
+                {"line_no": r.LINE_NO, "performer_id": r.PERFORMER_ID, "payment": r.FIN_TX_AMT, "authority": r.TO_AMT}
+                for r in rows.itertuples()
+            ]
+        else:
+            raise ValueError(f"Unknown rule kind: {rule['kind']}")
+
+        violations.append(pd.DataFrame({
+            "CLAIM_NO": rows["CLAIM_NO"].to_numpy(),
+            "RULE_ID": rule["rule_id"],
+            "LINE_NO": rows["LINE_NO"].to_numpy(),
+            "FXID": rows["FXID"].to_numpy(),
+            "DETAIL": details,
+        }))
+
+    # LINE_NO and FXID are read as strings; order details numerically like the SQL's
+    # ORDER BY line_no, fxid (blank keys from claim-level rules sort last)
+    violations = pd.concat(violations, ignore_index=True)
+    violations = violations.assign(
+        LINE_KEY=pd.to_numeric(violations["LINE_NO"], errors="coerce"),
+        FXID_KEY=pd.to_numeric(violations["FXID"], errors="coerce"),
+    ).sort_values(["CLAIM_NO", "RULE_ID", "LINE_KEY", "FXID_KEY"])
+    grouped = violations.groupby(["CLAIM_NO", "RULE_ID"]).agg(
+        VIOLATION_COUNT=("DETAIL", "size"),
+        DETAILS=("DETAIL", lambda details: json.dumps(list(details))),
+    ).reset_index()
+
+    rule_frame = pd.DataFrame({
+        "RULE_ID": [rule["rule_id"] for rule in rules],
+        "RULE_ORDER": range(1, len(rules) + 1),
+        "RULE_DESCRIPTION": [rule["description"] for rule in rules],
+    })
+    claims = tables["claims"][["CLAIM_NO"]].astype(str).drop_duplicates()
+    flags = claims.merge(rule_frame, how="cross").merge(grouped, on=["CLAIM_NO", "RULE_ID"], how="left")
+    flags["VIOLATION_COUNT"] = flags["VIOLATION_COUNT"].fillna(0).astype(int)
+    flags["FLAGGED"] = flags["VIOLATION_COUNT"] > 0
+    flags["DETAILS"] = flags["DETAILS"].where(flags["FLAGGED"], None)
+    return flags[FLAG_COLUMNS].sort_values(["CLAIM_NO", "RULE_ORDER"], ignore_index=True)
+
+
+def compare_with_truth(flags: pd.DataFrame, truth: pd.DataFrame, rules: List[Dict] = RULES) -> List[Dict]:
+    """
+    Compare flagged claims with the violations injected by pyutil/synthclaims.
+
+    Only rules with a claim-level ground truth (truth_column) are compared.
+
+    Returns:
+        List of dicts with rule_id, expected, flagged, missed and unexpected claim counts
+    """
+    results = []
+    for rule in rules:
+        column = rule.get("truth_column")
+        if not column or column not in truth.columns:
+            continue
+        expected = set(truth.loc[truth[column].astype(str).str.lower() == "true", "CLAIM_NO"].astype(str))
+        flagged = set(flags.loc[(flags["RULE_ID"] == rule["rule_id"]) & flags["FLAGGED"], "CLAIM_NO"])
+        results.append({
+            "rule_id": rule["rule_id"],
+            "expected": len(expected),
+            "flagged": len(flagged),
+            "missed": len(expected - flagged),
+            "unexpected": len(flagged - expected),
+        })
+    return results
+
+
+def main():
+    """
+    Main entry point for command-line execution.
+
+    Usage:
+        python auditrules.py generate-sql [-o FILE]
+        python auditrules.py evaluate <data_dir> [-o FLAGS_CSV]
+    """
+    parser = argparse.ArgumentParser(description="Evaluate the claim audit rules for every claim at once")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sql_parser = subparsers.add_parser("generate-sql", help="Write the set-based CLAIM_AUDIT_FLAGS SQL")
+    sql_parser.add_argument("-o", "--output", default=str(DEFAULT_SQL_FILE),
+                            help=f"SQL file to write (default: {DEFAULT_SQL_FILE.relative_to(SNOW_CLI_DIR)})")
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="Evaluate the rules on a local extract with pandas")
+    evaluate_parser.add_argument("data_dir", help="Directory with per-table CSV/Parquet inputs (snowcliload layout)")
+    evaluate_parser.add_argument("-o", "--output", help="Also write the flags to this CSV file")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "generate-sql":
+            Path(args.output).write_text(generate_sql(), encoding="utf-8")
+            print(f"✓ Wrote {len(RULES)} rule(s) to {args.output}")
+            sys.exit(0)
+
+        data_dir = Path(args.data_dir)
+        started = time.perf_counter()
+        tables = load_extract(data_dir)
+        loaded = time.perf_counter()
+        flags = evaluate(tables)
+        elapsed = time.perf_counter() - loaded
+
+        if args.output:
+            flags.to_csv(args.output, index=False)
+
+        claims = flags["CLAIM_NO"].nunique()
+        print(f"\n{'='*60}")
+        print(f"Claim Audit ({claims:,} claims, {len(RULES)} rules):")
+        for rule in RULES:
+            flagged = int(flags.loc[flags["RULE_ID"] == rule["rule_id"], "FLAGGED"].sum())
+            print(f"  {rule['rule_id']:<22}{flagged:>12,} claim(s) flagged")
+        print(f"  Flagged claims:       {flags.loc[flags['FLAGGED'], 'CLAIM_NO'].nunique():,}")
+        print(f"  Load time:            {loaded - started:.1f}s")
+        print(f"  Evaluation time:      {elapsed:.1f}s")
+
+        truth = read_table(data_dir, "audit_truth")
+        if truth is not None:
+            print("\nAgainst injected violations (audit_truth):")
+            for result in compare_with_truth(flags, truth):
+                print(f"  {result['rule_id']:<22}expected {result['expected']:,}, flagged {result['flagged']:,}, "
+                      f"missed {result['missed']:,}, unexpected {result['unexpected']:,}")
+        print(f"{'='*60}")
+        sys.exit(0)
+
+    except FileNotFoundError as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nERROR: Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+chunkbench - chunking configuration benchmark for the Cortex Search services
+Re-chunks the parsed claim notes and guidelines with a grid of chunk sizes and overlaps
+using a local port of split_text_recursive_character, retrieves with a BM25 stand-in for
+the search services against the agent's sample questions and a labelled query set, and
+reports recall@k against chunk count and index size, so the chunking parameters used in
+INGEST_STAGE_DOCUMENTS can be chosen from data rather than guessed.
+"""
+
+import argparse
+import csv
+import json
+import math
+import re
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+SNOW_CLI_DIR = Path(__file__).resolve().parents[2]
+REPO_ROOT = SNOW_CLI_DIR.parents[1]
+DEFAULT_UPLOAD_DIR = REPO_ROOT / "upload"
+DEFAULT_LABELS_FILE = Path(__file__).resolve().parent / "labelled_queries.json"
+DEFAULT_AGENT_SQL = SNOW_CLI_DIR / "agent" / "output" / "claims_audit_agent_create_agent.sql"
+
+# Search service corpora: source table and document class (pyutil/docextract)
+CORPORA = {
+    "claim_notes": {"table": "INS_CO.LOSS_CLAIMS.PARSED_CLAIM_NOTES", "doc_class": "CLAIM_NOTE"},
+    "guidelines": {"table": "INS_CO.LOSS_CLAIMS.PARSED_GUIDELINES", "doc_class": "GUIDELINE"},
+}
+
+# Separators of split_text_recursive_character for the 'markdown' and 'none' formats (regexes)
+SEPARATORS = {
+    "markdown": [r"\n#{1,6} ", r"```\n", r"\n\*\*\*+\n", r"\n---+\n", r"\n___+\n", r"\n\n", r"\n", r" ", r""],
+    "none": [r"\n\n", r"\n", r" ", r""],
+}
+
+# snowflake-arctic-embed-l-v2.0 vectors, as used by both search services
+EMBEDDING_DIMENSIONS = 1024
+EMBEDDING_BYTES_PER_DIMENSION = 4
+
+STOPWORDS = {
+    "a", "an", "and", "any", "are", "as", "be", "been", "by", "can", "did", "do", "does", "for", "from",
+    "have", "how", "i", "if", "in", "is", "it", "my", "of", "on", "or", "that", "the", "there", "this",
+    "to", "was", "what", "when", "which", "who", "with",
+}
+
+
+def split_with_separator(text: str, separator: str) -> List[str]:
+    """Split on a separator regex, keeping each separator at the start of the following piece."""
+    if not separator:
+        return list(text)
+    pieces = re.split(f"({separator})", text)
+    splits = [pieces[0]] + [pieces[i] + pieces[i + 1] for i in range(1, len(pieces) - 1, 2)]
+    if len(pieces) % 2 == 0:
+        splits.append(pieces[-1])
+    return [s for s in splits if s]
+
+
+def merge_splits(splits: List[str], chunk_size: int, overlap: int) -> List[str]:
+    """Greedily merge adjacent splits into chunks of at most chunk_size, carrying up to overlap back."""
+    chunks = []
+    current: List[str] = []
+    total = 0
+    for split in splits:
+        if total + len(split) > chunk_size and current:
+            chunk = "".join(current).strip()
+            if chunk:
+                chunks.append(chunk)
+            while total > overlap or (total + len(split) > chunk_size and total > 0):
+                total -= len(current[0])
+                current = current[1:]
+        current.append(split)
+        total += len(split)
+    chunk = "".join(current).strip()
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def split_text_recursive_character(text: str, fmt: str, chunk_size: int, overlap: int,
+                                   separators: Optional[List[str]] = None) -> List[str]:
+    """
+    Local port of SNOWFLAKE.CORTEX.SPLIT_TEXT_RECURSIVE_CHARACTER.
+
+    Splits on the first separator that occurs in the text, merges pieces up to chunk_size
+    characters with up to overlap characters carried between chunks, and recurses with the
+    remaining separators into pieces that are still too long.
+
+    Args:
+        text: Text to split
+        fmt: 'markdown' or 'none'
+        chunk_size: Maximum characters per chunk
+        overlap: Characters shared by consecutive chunks
+
+    Returns:
+        List of chunks
+    """
+    separators = SEPARATORS[fmt] if separators is None else separators
+    separator, remaining = separators[-1], []
+    for i, candidate in enumerate(separators):
+        if candidate == "" or re.search(candidate, text):
+            separator, remaining = candidate, separators[i + 1:]
+            break
+
+    chunks, good = [], []
+    for split in split_with_separator(text, separator):
+        if len(split) < chunk_size:
+            good.append(split)
+            continue
+        if good:
+            chunks.extend(merge_splits(good, chunk_size, overlap))
+            good = []
+        if remaining:
+            chunks.extend(split_text_recursive_character(split, fmt, chunk_size, overlap, remaining))
+        else:
+            chunks.append(split)
+    if good:
+        chunks.extend(merge_splits(good, chunk_size, overlap))
+    return chunks
+
+
+def chunk_document(filename: str, text: str, chunk_size: int, overlap: int, fmt: str) -> List[Dict]:
+    """
+    Chunk one document the way INGEST_STAGE_DOCUMENTS does (CONCAT(filename, ': ', chunk)).
+
+    Returns:
+        List of dicts with filename, text and the chunk's start and end offsets in the source
+    """
+    chunks, cursor = [], 0
+    for chunk in split_text_recursive_character(text, fmt, chunk_size, overlap):
+        start = text.find(chunk, cursor)
+        if start < 0:
+            start = text.find(chunk)
+        cursor = max(start, 0)
+        chunks.append({"filename": filename, "text": f"{filename}: {chunk}", "start": start, "end": start + len(chunk)})
+    return chunks
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens without stopwords."""
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over a list of chunk texts, as a local stand-in for a Cortex Search service."""
+
+    def __init__(self, texts: List[str], k1: float = 1.2, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.term_counts = [Counter(tokenize(text)) for text in texts]
+        self.lengths = np.array([sum(counts.values()) for counts in self.term_counts], dtype=float)
+        self.avg_length = self.lengths.mean() if len(texts) else 0.0
+        document_frequency = Counter(term for counts in self.term_counts for term in counts)
+        n = len(texts)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    def search(self, query: str, k: int) -> List[int]:
+        """Indices of the top-k chunks for a query."""
+        scores = np.zeros(len(self.term_counts))
+        norm = self.k1 * (1 - self.b + self.b * self.lengths / max(self.avg_length, 1e-9))
+        for term in set(tokenize(query)):
+            if term not in self.idf:
+                continue
+            tf = np.array([counts.get(term, 0) for counts in self.term_counts], dtype=float)
+            scores += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+        order = np.argsort(-scores, kind="stable")
+        return [int(i) for i in order[:k] if scores[i] > 0]
+
+
+def locate_span(text: str, span: str) -> Optional[Tuple[int, int]]:
+    """Find an answer span in a document, treating any whitespace run as equivalent."""
+    pattern = r"\s+".join(re.escape(token) for token in span.split())
+    match = re.search(pattern, text)
+    return (match.start(), match.end()) if match else None
+
+
+def span_coverage(chunks: List[Dict], retrieved: List[int], spans: List[Tuple[str, int, int]]) -> Tuple[float, bool]:
+    """
+    Fraction of the answer span characters covered by the retrieved chunks, and whether any were hit.
+
+    Args:
+        chunks: Chunks of the corpus
+        retrieved: Indices of the retrieved chunks
+        spans: (filename, start, end) answer spans
+
+    Returns:
+        Tuple of (coverage in [0, 1], hit)
+    """
+    total = covered = 0
+    for filename, start, end in spans:
+        mask = np.zeros(end - start, dtype=bool)
+        for i in retrieved:
+            chunk = chunks[i]
+            if chunk["filename"] != filename:
+                continue
+            lo, hi = max(start, chunk["start"]), min(end, chunk["end"])
+            if hi > lo:
+                mask[lo - start:hi - start] = True
+        total += end - start
+        covered += int(mask.sum())
+    return (covered / total if total else 0.0), covered > 0
+
+
+def load_sample_questions(agent_sql: Path) -> List[str]:
+    """Read the sample questions from the agent specification."""
+    text = agent_sql.read_text(encoding="utf-8")
+    spec = json.loads(text.split("$$")[1])
+    return [q["question"] for q in spec.get("instructions", {}).get("sample_questions", [])]
+
+
+def load_local_documents(upload_dir: Path) -> Dict[str, Dict[str, str]]:
+    """Extract the claim notes and guidelines in the upload directory with pyutil/docextract."""
+    sys.path.insert(0, str(SNOW_CLI_DIR / "pyutil" / "docextract"))
+    import docextract
+
+    rows, needs_ocr = docextract.extract_directory(upload_dir, verbose=False)
+    if needs_ocr:
+        print(f"  Skipping documents that need OCR: {', '.join(needs_ocr)}")
+    documents = {corpus: {} for corpus in CORPORA}
+    for row in rows:
+        for corpus, config in CORPORA.items():
+            if row["doc_class"] == config["doc_class"]:
+                documents[corpus][row["relative_path"]] = row["extracted_content"]
+    return documents
+
+
+def load_snowflake_documents(connection_name: str) -> Dict[str, Dict[str, str]]:
+    """Read the parsed documents the search services are built from."""
+    documents = {}
+    for corpus, config in CORPORA.items():
+        cmd = ['snow', 'sql', '-c', connection_name, '--query',
+               f"SELECT filename, extracted_content FROM {config['table']}", '--format', 'JSON']
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        rows = json.loads(result.stdout) if result.stdout.strip() else []
+        documents[corpus] = {row["FILENAME"]: row["EXTRACTED_CONTENT"] or "" for row in rows}
+    return documents
+
+
+def prepare_queries(labels: List[Dict], sample_questions: List[str],
+                    documents: Dict[str, Dict[str, str]]) -> List[Dict]:
+    """
+    Resolve the labelled queries' answer spans to document offsets.
+
+    Sample questions without a label are reported and left out of the scores.
+
+    Returns:
+        List of dicts with question, corpus, spans and source ('sample' or 'labelled')
+    """
+    labelled = {label["question"]: label for label in labels}
+    unlabelled = [q for q in sample_questions if q not in labelled]
+    if unlabelled:
+        print(f"  {len(unlabelled)} agent sample question(s) have no search label and are not scored")
+
+    queries = []
+    for label in labels:
+        spans = []
+        for span in label["answer_spans"]:
+            for filename, text in documents.get(label["corpus"], {}).items():
+                located = locate_span(text, span)
+                if located:
+                    spans.append((filename, *located))
+                    break
+            else:
+                print(f"  Answer span not found in {label['corpus']}: {span[:60]!r}")
+        if spans:
+            queries.append({
+                "question": label["question"],
+                "corpus": label["corpus"],
+                "spans": spans,
+                "source": "sample" if label["question"] in sample_questions else "labelled",
+            })
+    return queries
+
+
+def evaluate_config(documents: Dict[str, Dict[str, str]], queries: List[Dict], chunk_size: int,
+                    overlap: int, fmt: str, k: int) -> Dict:
+    """Chunk every corpus with one configuration and score retrieval for all queries."""
+    chunks = {
+        corpus: [c for filename, text in docs.items() for c in chunk_document(filename, text, chunk_size, overlap, fmt)]
+        for corpus, docs in documents.items()
+    }
+    indexes = {corpus: BM25Index([c["text"] for c in corpus_chunks]) for corpus, corpus_chunks in chunks.items()}
+
+    coverages, hits, context_chars = [], [], []
+    for query in queries:
+        retrieved = indexes[query["corpus"]].search(query["question"], k)
+        coverage, hit = span_coverage(chunks[query["corpus"]], retrieved, query["spans"])
+        coverages.append(coverage)
+        hits.append(hit)
+        context_chars.append(sum(len(chunks[query["corpus"]][i]["text"]) for i in retrieved))
+
+    all_chunks = [c for corpus_chunks in chunks.values() for c in corpus_chunks]
+    text_bytes = sum(len(c["text"].encode("utf-8")) for c in all_chunks)
+    vector_bytes = len(all_chunks) * EMBEDDING_DIMENSIONS * EMBEDDING_BYTES_PER_DIMENSION
+    return {
+        "chunk_size": chunk_size,
+        "overlap": overlap,
+        "chunks": len(all_chunks),
+        "avg_chunk_chars": round(text_bytes / max(len(all_chunks), 1)),
+        "text_bytes": text_bytes,
+        "index_bytes": text_bytes + vector_bytes,
+        "context_chars": round(float(np.mean(context_chars)) if context_chars else 0.0),
+        "whole_corpus_retrieved": any(len(corpus_chunks) <= k for corpus_chunks in chunks.values()),
+        f"recall@{k}": round(float(np.mean(coverages)) if coverages else 0.0, 3),
+        f"hit@{k}": round(float(np.mean(hits)) if hits else 0.0, 3),
+    }
+
+
+def main():
+    """
+    Main entry point for command-line execution.
+
+    Usage:
+        python chunkbench.py [--connection NAME] [--sizes 200,400,...] [--overlaps 0,30,...] [-k 3]
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark chunk size and overlap for the Cortex Search services on recall@k vs. index size"
+    )
+    parser.add_argument("--connection", help="Read PARSED_CLAIM_NOTES / PARSED_GUIDELINES from this Snowflake "
+                                             "CLI connection instead of extracting the upload directory locally")
+    parser.add_argument("--upload-dir", default=str(DEFAULT_UPLOAD_DIR),
+                        help="Directory of source documents for local extraction (default: upload/)")
+    parser.add_argument("--labels", default=str(DEFAULT_LABELS_FILE),
+                        help="Labelled queries JSON (default: labelled_queries.json next to this script)")
+    parser.add_argument("--sizes", default="200,400,800,1200,2000", help="Comma-separated chunk sizes")
+    parser.add_argument("--overlaps", default="0,30,100,200", help="Comma-separated chunk overlaps")
+    parser.add_argument("--format", dest="fmt", choices=sorted(SEPARATORS), default="markdown",
+                        help="split_text_recursive_character format (default: markdown)")
+    parser.add_argument("-k", type=int, default=3, help="Chunks retrieved per query (default: 3)")
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="Recall the recommended configuration may give up for a smaller index (default: 0.02)")
+    parser.add_argument("-o", "--output", help="Also write the results to this CSV file")
+
+    args = parser.parse_args()
+
+    try:
+        if args.connection:
+            print(f"Reading parsed documents with connection: {args.connection}")
+            documents = load_snowflake_documents(args.connection)
+        else:
+            print(f"Extracting documents locally from: {args.upload_dir}")
+            documents = load_local_documents(Path(args.upload_dir))
+
+        labels = json.loads(Path(args.labels).read_text(encoding="utf-8"))
+        queries = prepare_queries(labels, load_sample_questions(DEFAULT_AGENT_SQL), documents)
+        if not queries:
+            raise ValueError("No labelled query could be resolved against the documents")
+
+        sizes = [int(v) for v in args.sizes.split(",")]
+        overlaps = [int(v) for v in args.overlaps.split(",")]
+        results = [
+            evaluate_config(documents, queries, size, overlap, args.fmt, args.k)
+            for size in sizes for overlap in overlaps if overlap < size
+        ]
+
+        recall_key, hit_key = f"recall@{args.k}", f"hit@{args.k}"
+        print(f"\n{'='*78}")
+        print(f"Chunking Benchmark ({len(queries)} queries, "
+              f"{sum(q['source'] == 'sample' for q in queries)} from agent sample questions, BM25 top-{args.k})")
+        print(f"{'='*78}")
+        print(f"  {'Size':>6}{'Overlap':>9}{'Chunks':>8}{'Avg chars':>11}{'Index KB':>10}"
+              f"{'Context':>9}{recall_key:>11}{hit_key:>9}")
+        for r in results:
+            print(f"  {r['chunk_size']:>6}{r['overlap']:>9}{r['chunks']:>8}{r['avg_chunk_chars']:>11}"
+                  f"{r['index_bytes'] / 1024:>10.1f}{r['context_chars']:>9}{r[recall_key]:>11.3f}"
+                  f"{r[hit_key]:>9.3f}{'  *' if r['whole_corpus_retrieved'] else ''}")
+
+        scored = [r for r in results if not r["whole_corpus_retrieved"]] or results
+        best_recall = max(r[recall_key] for r in scored)
+        recommended = min(
+            (r for r in scored if r[recall_key] >= best_recall - args.tolerance),
+            key=lambda r: (r["index_bytes"], -r[recall_key])
+        )
+        print(f"{'-'*78}")
+        if any(r["whole_corpus_retrieved"] for r in results):
+            print(f"  * top-{args.k} returns a whole corpus, so recall is not informative for that row")
+        print(f"  Recommended: chunk size {recommended['chunk_size']}, overlap {recommended['overlap']} "
+              f"({recall_key} {recommended[recall_key]:.3f}, {recommended['chunks']} chunks)")
+        print(f"{'='*78}")
+
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=list(results[0]))
+                writer.writeheader()
+                writer.writerows(results)
+        sys.exit(0)
+
+    except subprocess.CalledProcessError as e:
+        print(f"\nERROR: Snowflake CLI failed with code {e.returncode}", file=sys.stderr)
+        if e.stderr:
+            print(f"\nSTDERR:\n{e.stderr}", file=sys.stderr)
+        sys.exit(1)
+    except (FileNotFoundError, NotADirectoryError, ValueError) as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nERROR: Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,19 @@ import subprocess
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "snowbroker"))
+import snowbroker  # noqa: E402
+
 
 def describe_agent(connection_name: str, agent_name: str) -> dict:
     """Run DESCRIBE AGENT and return the result as a dict."""
+    results = snowbroker.execute(connection_name, f'DESCRIBE AGENT {agent_name}')
+    if results is not None:
+        data = results[0] if results else []
+        if not data:
+            raise ValueError(f"No data returned for agent: {agent_name}")
+        return data[0]
+    
     cmd = [
         'snow', 'sql', '-c', connection_name,
         '--query', f'DESCRIBE AGENT {agent_name}',
@@ -133,6 +143,9 @@ def main():
         except subprocess.CalledProcessError as e:
             print(f"Error describing agent {agent_name}: {e.stderr}", file=sys.stderr)
             sys.exit(1)
+        except snowbroker.BrokerError as e:
+            print(f"Error describing agent {agent_name}: {e}", file=sys.stderr)
+            sys.exit(1)
         except ValueError as e:
             print(f"Error: {e}", file=sys.stderr)
             sys.exit(1)
@@ -158,6 +171,7 @@ def main():
         print(f"  Generated {si_file}")
 
     print(f"\nGenerated SQL files for {len(agent_names)} agent(s) in {output_dir}")
+    snowbroker.print_savings()
 
 
 if __name__ == "__main__":
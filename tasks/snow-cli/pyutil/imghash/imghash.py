@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+imghash - perceptual-hash index for near-duplicate and reused evidence images
+Computes pHash and dHash for every evidence image in a batch with NumPy, keeps them in an
+array-backed multi-index hashing (MIH) index for Hamming-radius queries, and loads the hashes
+and the near-duplicate pairs into EVIDENCE_IMAGE_HASHES and EVIDENCE_IMAGE_MATCHES, so a
+photo reused across claims is found with a lookup instead of one LLM call per file.
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+HASHES_TABLE = "INS_CO.LOSS_CLAIMS.EVIDENCE_IMAGE_HASHES"
+MATCHES_TABLE = "INS_CO.LOSS_CLAIMS.EVIDENCE_IMAGE_MATCHES"
+INGEST_STAGE = "@INS_CO.LOSS_CLAIMS.IMAGE_HASH_INGEST"
+DEFAULT_INDEX_PATH = Path.home() / ".cache" / "ins_co_claims_audit" / "evidence_image_hashes.npz"
+
+# Same image types as REFRESH_IMAGE_SUMMARIES
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+# Evidence files are named <claim_no>_<description>.<ext>, e.g. 1899_claim_evidence1.jpeg
+DEFAULT_CLAIM_PATTERN = r"^(\d+)_"
+
+# pHash: 8x8 lowest frequencies of the DCT of a 32x32 grayscale thumbnail; dHash: 9x8 gradients
+PHASH_SIZE, PHASH_LOW = 32, 8
+DHASH_WIDTH, DHASH_HEIGHT = 9, 8
+
+# MIH splits each 64-bit hash into 4 substrings of 16 bits; by the pigeonhole principle two
+# hashes within Hamming distance r agree within r // 4 bits on at least one substring
+SUBSTRINGS = 4
+SUBSTRING_BITS = 64 // SUBSTRINGS
+
+DEFAULT_PHASH_RADIUS = 8
+DEFAULT_DHASH_RADIUS = 12
+QUERY_BATCH_SIZE = 256
+
+HASH_CSV_COLUMNS = ["relative_path", "md5", "claim_no", "phash", "dhash", "width", "height"]
+MATCH_CSV_COLUMNS = ["relative_path", "claim_no", "match_relative_path", "match_claim_no",
+                     "phash_distance", "dhash_distance", "cross_claim"]
+
+
+def file_md5(file_path: Path) -> str:
+    """MD5 of a file, read in chunks."""
+    digest = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def claim_no_for(file_name: str, claim_pattern: str) -> str:
+    """Claim number from an evidence file name, or an empty string if the name has none."""
+    match = re.search(claim_pattern, file_name)
+    return match.group(1) if match else ""
+
+
+def decode_thumbnails(file_path: str) -> Optional[Tuple[bytes, bytes, int, int]]:
+    """
+    Decode an image once into the two grayscale thumbnails the hashes are computed from.
+
+    JPEGs are decoded at reduced scale (draft mode), and EXIF orientation is applied so a
+    copy that differs only by its orientation tag hashes the same.
+
+    Returns:
+        Tuple of (32x32 pixels, 9x8 pixels, width, height), or None if the file is not an image
+    """
+    try:
+        with Image.open(file_path) as img:
+            width, height = img.size
+            img.draft("L", (PHASH_SIZE * 4, PHASH_SIZE * 4))
+            gray = ImageOps.exif_transpose(img).convert("L")
+            phash_px = gray.resize((PHASH_SIZE, PHASH_SIZE), Image.Resampling.LANCZOS)
+            dhash_px = gray.resize((DHASH_WIDTH, DHASH_HEIGHT), Image.Resampling.LANCZOS)
+            return phash_px.tobytes(), dhash_px.tobytes(), width, height
+    except (UnidentifiedImageError, OSError):
+        return None
+
+
+def dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II matrix of size n x n."""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.sqrt(2.0 / n) * np.cos(np.pi * (2 * x + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+def pack_bits(bits: np.ndarray) -> np.ndarray:
+    """Pack an (N, 64) boolean array into N uint64 hashes, first bit most significant."""
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def phash_batch(pixels: np.ndarray) -> np.ndarray:
+    """
+    pHash of a batch of 32x32 grayscale thumbnails.
+
+    Args:
+        pixels: (N, 32, 32) array
+
+    Returns:
+        (N,) uint64 hashes: bit set where a low-frequency DCT coefficient is above the median
+    """
+    d = dct_matrix(PHASH_SIZE)
+    coefficients = d @ pixels.astype(np.float64) @ d.T
+    low = coefficients[:, :PHASH_LOW, :PHASH_LOW].reshape(len(pixels), -1)
+    median = np.median(low[:, 1:], axis=1, keepdims=True)  # the DC term is excluded
+    return pack_bits(low > median)
+
+
+def dhash_batch(pixels: np.ndarray) -> np.ndarray:
+    """
+    dHash of a batch of 9x8 grayscale thumbnails.
+
+    Args:
+        pixels: (N, 8, 9) array
+
+    Returns:
+        (N,) uint64 hashes: bit set where a pixel is brighter than its left neighbour
+    """
+    pixels = pixels.astype(np.int16)
+    return pack_bits((pixels[:, :, 1:] > pixels[:, :, :-1]).reshape(len(pixels), -1))
+
+
+def hash_images(file_paths: List[Path], workers: int) -> Tuple[List[int], Dict[str, np.ndarray]]:
+    """
+    Hash a list of images, decoding in parallel and hashing the whole batch at once.
+
+    Returns:
+        Tuple of (positions in file_paths that decoded, dict of phash, dhash, width, height arrays)
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        decoded = list(pool.map(decode_thumbnails, [str(p) for p in file_paths], chunksize=16))
+
+    ok = [i for i, result in enumerate(decoded) if result is not None]
+    if not ok:
+        records = empty_records()
+        return ok, {column: records[column] for column in ("phash", "dhash", "width", "height")}
+    phash_px = np.frombuffer(b"".join(decoded[i][0] for i in ok), dtype=np.uint8)
+    dhash_px = np.frombuffer(b"".join(decoded[i][1] for i in ok), dtype=np.uint8)
+    return ok, {
+        "phash": phash_batch(phash_px.reshape(-1, PHASH_SIZE, PHASH_SIZE)),
+        "dhash": dhash_batch(dhash_px.reshape(-1, DHASH_HEIGHT, DHASH_WIDTH)),
+        "width": np.array([decoded[i][2] for i in ok], dtype=np.int32),
+        "height": np.array([decoded[i][3] for i in ok], dtype=np.int32),
+    }
+
+
+# Set bits per byte value, for NumPy < 2.0 which has no np.bitwise_count
+BYTE_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.int32)
+
+
+def hamming(a: np.ndarray, b) -> np.ndarray:
+    """Elementwise Hamming distance between uint64 hashes."""
+    x = np.bitwise_xor(a, b)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x).astype(np.int32)
+    x = np.asarray(x, dtype=np.uint64)
+    byte_counts = BYTE_POPCOUNT[np.ascontiguousarray(x.reshape(-1)).view(np.uint8)]
+    return byte_counts.reshape(x.shape + (8,)).sum(axis=-1, dtype=np.int32)
+
+
+def substring_masks(max_bits: int) -> np.ndarray:
+    """All 16-bit masks with at most max_bits bits set, to probe neighbouring substrings."""
+    masks = [0]
+    for bits in range(1, max_bits + 1):
+        masks.extend(sum(1 << b for b in combo) for combo in combinations(range(SUBSTRING_BITS), bits))
+    return np.array(masks, dtype=np.uint16)
+
+
+class MultiIndexHash:
+    """
+    Multi-index hashing over 64-bit hashes for Hamming-radius queries.
+
+    Each 16-bit substring has a sorted key array and the matching row order, so a probe is a
+    binary search; candidates from all substrings are then verified against the full hash.
+    """
+
+    def __init__(self, hashes: np.ndarray, keys: Optional[List[np.ndarray]] = None,
+                 orders: Optional[List[np.ndarray]] = None):
+        self.hashes = hashes
+        if keys is None:
+            keys, orders = [], []
+            for j in range(SUBSTRINGS):
+                substring = self.substring(hashes, j)
+                order = np.argsort(substring, kind="stable").astype(np.uint32)
+                keys.append(substring[order])
+                orders.append(order)
+        self.keys, self.orders = keys, orders
+
+    @staticmethod
+    def substring(hashes: np.ndarray, j: int) -> np.ndarray:
+        """The j-th 16-bit substring of each hash."""
+        return ((hashes >> np.uint64(j * SUBSTRING_BITS)) & np.uint64(0xFFFF)).astype(np.uint16)
+
+    def search(self, queries: np.ndarray, radius: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        All indexed hashes within a Hamming radius of each query.
+
+        Args:
+            queries: (Q,) uint64 query hashes
+            radius: Maximum Hamming distance
+
+        Returns:
+            Tuple of (query positions, index rows, distances), one element per match
+        """
+        masks = substring_masks(radius // SUBSTRINGS)
+        found_q, found_i = [], []
+        for start in range(0, len(queries), QUERY_BATCH_SIZE):
+            batch = queries[start:start + QUERY_BATCH_SIZE]
+            pairs = []
+            for j in range(SUBSTRINGS):
+                probes = (self.substring(batch, j)[:, None] ^ masks[None, :]).ravel()
+                lo = np.searchsorted(self.keys[j], probes, side="left")
+                counts = np.searchsorted(self.keys[j], probes, side="right") - lo
+                total = int(counts.sum())
+                if not total:
+                    continue
+                offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                rows = self.orders[j][np.repeat(lo, counts) + offsets]
+                query_pos = np.repeat(np.arange(len(batch)).repeat(len(masks)), counts)
+                # Verify before de-duplicating: far fewer pairs survive than are probed
+                keep = hamming(self.hashes[rows], batch[query_pos]) <= radius
+                pairs.append(query_pos[keep].astype(np.int64) * len(self.hashes) + rows[keep])
+            if not pairs:
+                continue
+            query_pos, rows = np.divmod(np.unique(np.concatenate(pairs)), len(self.hashes))
+            found_q.append(query_pos + start)
+            found_i.append(rows)
+
+        if not found_q:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, empty.astype(np.int32)
+        query_pos, rows = np.concatenate(found_q), np.concatenate(found_i)
+        return query_pos, rows, hamming(self.hashes[rows], queries[query_pos])
+
+
+def save_index(index_path: Path, records: Dict[str, np.ndarray]):
+    """Write the hash records and their MIH tables to an uncompressed .npz file."""
+    mih = MultiIndexHash(records["phash"])
+    tables = {f"phash_keys_{j}": mih.keys[j] for j in range(SUBSTRINGS)}
+    tables.update({f"phash_order_{j}": mih.orders[j] for j in range(SUBSTRINGS)})
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(index_path, "wb") as f:
+        np.savez(f, **records, **tables)
+
+
+def load_index(index_path: Path) -> Tuple[Dict[str, np.ndarray], MultiIndexHash]:
+    """Read the hash records and rebuild the MIH index from its stored tables."""
+    with np.load(index_path) as data:
+        arrays = {name: data[name] for name in data.files}
+    records = {name: arrays[name] for name in arrays if not name.startswith("phash_keys_")
+               and not name.startswith("phash_order_")}
+    mih = MultiIndexHash(records["phash"],
+                         [arrays[f"phash_keys_{j}"] for j in range(SUBSTRINGS)],
+                         [arrays[f"phash_order_{j}"] for j in range(SUBSTRINGS)])
+    return records, mih
+
+
+def empty_records() -> Dict[str, np.ndarray]:
+    """Hash records for an empty index."""
+    return {
+        "relative_path": np.array([], dtype=str), "md5": np.array([], dtype=str),
+        "claim_no": np.array([], dtype=str),
+        "phash": np.array([], dtype=np.uint64), "dhash": np.array([], dtype=np.uint64),
+        "width": np.array([], dtype=np.int32), "height": np.array([], dtype=np.int32),
+    }
+
+
+def build_index(directory: Path, index_path: Path, claim_pattern: str, workers: int) -> Dict:
+    """
+    Hash new or changed images in a directory into the index, reusing unchanged hashes.
+
+    Args:
+        directory: Directory of evidence files, as uploaded to the loss_evidence stage
+        index_path: .npz index to update
+        claim_pattern: Regex whose first group is the claim number in a file name
+        workers: Decoding processes
+
+    Returns:
+        Dict with images, reused, hashed and skipped counts and the hashing time
+    """
+    if not directory.is_dir():
+        raise NotADirectoryError(f"Path is not a directory: {directory}")
+
+    files = sorted(p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES)
+    md5s = [file_md5(p) for p in files]
+
+    previous = load_index(index_path)[0] if index_path.exists() else empty_records()
+    known = {(path, md5): i for i, (path, md5) in enumerate(zip(previous["relative_path"], previous["md5"]))}
+    reuse = [(pos, known[(p.name, md5)]) for pos, (p, md5) in enumerate(zip(files, md5s)) if (p.name, md5) in known]
+    reused_pos = {pos for pos, _ in reuse}
+    new_pos = [pos for pos in range(len(files)) if pos not in reused_pos]
+
+    started = time.perf_counter()
+    decoded_pos, hashes = hash_images([files[pos] for pos in new_pos], workers) if new_pos else ([], None)
+    hash_ms = int((time.perf_counter() - started) * 1000)
+    hashed_pos = [new_pos[i] for i in decoded_pos]
+
+    old_rows = np.array([row for _, row in reuse], dtype=np.int64)
+    positions = [pos for pos, _ in reuse] + hashed_pos
+    records = {
+        "relative_path": np.array([files[pos].name for pos in positions], dtype=str),
+        "md5": np.array([md5s[pos] for pos in positions], dtype=str),
+        "claim_no": np.array([claim_no_for(files[pos].name, claim_pattern) for pos in positions], dtype=str),
+    }
+    for column in ("phash", "dhash", "width", "height"):
+        parts = [previous[column][old_rows]] + ([hashes[column]] if hashes else [])
+        records[column] = np.concatenate(parts).astype(previous[column].dtype)
+
+    order = np.argsort(records["relative_path"], kind="stable")
+    save_index(index_path, {name: values[order] for name, values in records.items()})
+    return {
+        "images": len(positions),
+        "reused": len(reuse),
+        "hashed": len(hashed_pos),
+        "skipped": len(new_pos) - len(hashed_pos),
+        "hash_ms": hash_ms,
+    }
+
+
+def find_matches(records: Dict[str, np.ndarray], mih: MultiIndexHash, phash_radius: int,
+                 dhash_radius: int) -> List[Dict]:
+    """
+    All pairs of distinct indexed images within both Hamming radii, in both directions.
+
+    Returns:
+        List of match rows in MATCH_CSV_COLUMNS order
+    """
+    query_pos, rows, phash_distance = mih.search(records["phash"], phash_radius)
+    dhash_distance = hamming(records["dhash"][query_pos], records["dhash"][rows])
+    keep = (query_pos != rows) & (dhash_distance <= dhash_radius)
+
+    matches = []
+    for q, r, pd, dd in zip(query_pos[keep], rows[keep], phash_distance[keep], dhash_distance[keep]):
+        claim_no, match_claim_no = records["claim_no"][q], records["claim_no"][r]
+        matches.append({
+            "relative_path": records["relative_path"][q],
+            "claim_no": claim_no,
+            "match_relative_path": records["relative_path"][r],
+            "match_claim_no": match_claim_no,
+            "phash_distance": int(pd),
+            "dhash_distance": int(dd),
+            "cross_claim": bool(claim_no and match_claim_no and claim_no != match_claim_no),
+        })
+    return matches
+
+
+def query_image(records: Dict[str, np.ndarray], mih: MultiIndexHash, image: str, phash_radius: int,
+                dhash_radius: int) -> List[Dict]:
+    """
+    Indexed images within both Hamming radii of an indexed file name or a local image file.
+
+    Returns:
+        List of dicts with relative_path, claim_no and both distances, nearest first
+    """
+    indexed = np.flatnonzero(records["relative_path"] == Path(image).name)
+    if len(indexed) and not Path(image).is_file():
+        phash, dhash = records["phash"][indexed[:1]], records["dhash"][indexed[:1]]
+    else:
+        decoded = decode_thumbnails(image)
+        if decoded is None:
+            raise ValueError(f"Not an indexed file name or a readable image: {image}")
+        phash = phash_batch(np.frombuffer(decoded[0], dtype=np.uint8).reshape(1, PHASH_SIZE, PHASH_SIZE))
+        dhash = dhash_batch(np.frombuffer(decoded[1], dtype=np.uint8).reshape(1, DHASH_HEIGHT, DHASH_WIDTH))
+
+    _, rows, phash_distance = mih.search(phash, phash_radius)
+    dhash_distance = hamming(records["dhash"][rows], dhash[0])
+    results = [
+        {"relative_path": records["relative_path"][r], "claim_no": records["claim_no"][r],
+         "phash_distance": int(pd), "dhash_distance": int(dd)}
+        for r, pd, dd in zip(rows, phash_distance, dhash_distance) if dd <= dhash_radius
+    ]
+    return sorted(results, key=lambda m: (m["phash_distance"], m["dhash_distance"], m["relative_path"]))
+
+
+def write_csv_gz(rows: List[Dict], columns: List[str], output_path: Path):
+    """Write rows as a gzipped CSV with a header row."""
+    with gzip.open(output_path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def load_tables(connection_name: str, records: Dict[str, np.ndarray], matches: List[Dict]) -> str:
+    """
+    Replace EVIDENCE_IMAGE_HASHES and EVIDENCE_IMAGE_MATCHES with the index contents.
+
+    Both tables are loaded with one PUT and one COPY each, in a single Snowflake CLI call.
+
+    Returns:
+        Snowflake CLI output of the load
+    """
+    hash_rows = [
+        {"relative_path": path, "md5": md5, "claim_no": claim_no,
+         "phash": f"{int(phash):016x}", "dhash": f"{int(dhash):016x}", "width": int(width), "height": int(height)}
+        for path, md5, claim_no, phash, dhash, width, height in zip(
+            records["relative_path"], records["md5"], records["claim_no"], records["phash"],
+            records["dhash"], records["width"], records["height"])
+    ]
+    file_format = ("FILE_FORMAT = (TYPE = CSV COMPRESSION = GZIP SKIP_HEADER = 1\n"
+                   "                 FIELD_OPTIONALLY_ENCLOSED_BY = '\"' EMPTY_FIELD_AS_NULL = TRUE)")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        batch_id = time.strftime('%Y%m%d%H%M%S')
+        statements = []
+        for table, columns, rows, prefix in (
+            (HASHES_TABLE, HASH_CSV_COLUMNS, hash_rows, "hashes"),
+            (MATCHES_TABLE, MATCH_CSV_COLUMNS, matches, "matches"),
+        ):
+            batch_name = f"{prefix}_{batch_id}.csv.gz"
+            batch_path = Path(tmp_dir) / batch_name
+            write_csv_gz(rows, columns, batch_path)
+            statements.extend([
+                f"PUT 'file://{batch_path.absolute()}' {INGEST_STAGE} AUTO_COMPRESS=FALSE OVERWRITE=TRUE;",
+                f"TRUNCATE TABLE {table};",
+                f"COPY INTO {table} ({', '.join(columns)})\n"
+                f"  FROM {INGEST_STAGE}\n"
+                f"  FILES = ('{batch_name}')\n"
+                f"  {file_format}\n"
+                f"  PURGE = TRUE;",
+            ])
+        cmd = ['snow', 'sql', '-c', connection_name, '-q', "\n".join(statements)]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return result.stdout
+
+
+def main():
+    """
+    Main entry point for command-line execution.
+
+    Usage:
+        python imghash.py index <directory> [--index PATH] [--workers N]
+        python imghash.py query <file_name_or_image> [--index PATH]
+        python imghash.py load <connection_name> [--index PATH]
+    """
+    parser = argparse.ArgumentParser(
+        description="Perceptual-hash index for near-duplicate and reused evidence images"
+    )
+    parser.add_argument("--index", default=str(DEFAULT_INDEX_PATH),
+                        help=f"Index file (default: {DEFAULT_INDEX_PATH})")
+    parser.add_argument("--phash-radius", type=int, default=DEFAULT_PHASH_RADIUS,
+                        help=f"Maximum pHash Hamming distance of a match (default: {DEFAULT_PHASH_RADIUS})")
+    parser.add_argument("--dhash-radius", type=int, default=DEFAULT_DHASH_RADIUS,
+                        help=f"Maximum dHash Hamming distance of a match (default: {DEFAULT_DHASH_RADIUS})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="Hash new or changed images in a directory into the index")
+    index_parser.add_argument("directory", help="Directory of files uploaded to the loss_evidence stage")
+    index_parser.add_argument("--claim-pattern", default=DEFAULT_CLAIM_PATTERN,
+                              help="Regex whose first group is the claim number in a file name")
+    index_parser.add_argument("--workers", type=int, default=4, help="Decoding processes (default: 4)")
+
+    query_parser = subparsers.add_parser("query", help="List indexed images that match an image")
+    query_parser.add_argument("image", help="Indexed file name, or path of a local image")
+
+    load_parser = subparsers.add_parser("load", help="Load the hashes and near-duplicate pairs into Snowflake")
+    load_parser.add_argument("connection_name", help="Snowflake CLI connection name")
+
+    args = parser.parse_args()
+    index_path = Path(args.index).expanduser()
+
+    try:
+        if args.command == "index":
+            print(f"Scanning directory: {args.directory}")
+            stats = build_index(Path(args.directory), index_path, args.claim_pattern, args.workers)
+            print(f"\n{'='*60}")
+            print("Evidence Image Hash Index:")
+            print(f"  Images indexed:       {stats['images']}")
+            print(f"  Unchanged (reused):   {stats['reused']}")
+            print(f"  Hashed:               {stats['hashed']} in {stats['hash_ms']} ms")
+            print(f"  Unreadable (skipped): {stats['skipped']}")
+            print(f"  Index file:           {index_path}")
+            print(f"{'='*60}")
+            sys.exit(0)
+
+        if not index_path.exists():
+            raise FileNotFoundError(f"Index not found: {index_path}. Run the index command first")
+        records, mih = load_index(index_path)
+
+        if args.command == "query":
+            started = time.perf_counter()
+            results = query_image(records, mih, args.image, args.phash_radius, args.dhash_radius)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            results = [r for r in results if r["relative_path"] != Path(args.image).name]
+            print(f"\n{len(results)} match(es) for {args.image} among {len(records['phash'])} images "
+                  f"({elapsed_ms:.1f} ms):")
+            for r in results:
+                print(f"  {r['relative_path']}  claim {r['claim_no'] or '-'}  "
+                      f"pHash {r['phash_distance']}  dHash {r['dhash_distance']}")
+            claims = sorted({r["claim_no"] for r in results if r["claim_no"]})
+            if claims:
+                print(f"\nAlso appears on claims: {', '.join(claims)}")
+            sys.exit(0)
+
+        started = time.perf_counter()
+        matches = find_matches(records, mih, args.phash_radius, args.dhash_radius)
+        match_ms = int((time.perf_counter() - started) * 1000)
+        print(f"Found {len(matches) // 2} near-duplicate pair(s) among {len(records['phash'])} images "
+              f"in {match_ms} ms")
+        print(f"Loading {HASHES_TABLE} and {MATCHES_TABLE}...")
+        load_tables(args.connection_name, records, matches)
+        print(f"\n{'='*60}")
+        print("Evidence Image Hashes Loaded:")
+        print(f"  Images:            {len(records['phash'])}")
+        print(f"  Matching pairs:    {len(matches) // 2}")
+        print(f"  Cross-claim pairs: {sum(m['cross_claim'] for m in matches) // 2}")
+        print(f"{'='*60}")
+        sys.exit(0)
+
+    except subprocess.CalledProcessError as e:
+        print(f"\nERROR: Snowflake CLI failed with code {e.returncode}", file=sys.stderr)
+        if e.stderr:
+            print(f"\nSTDERR:\n{e.stderr}", file=sys.stderr)
+        sys.exit(1)
+    except (FileNotFoundError, NotADirectoryError, ValueError) as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nERROR: Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
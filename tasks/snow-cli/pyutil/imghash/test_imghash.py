@@ -0,0 +1,32 @@
+"""Tests for imghash."""
+
+import numpy as np
+
+from imghash import build_index, hash_images, load_index
+
+
+def test_hash_images_returns_empty_arrays_when_nothing_decodes(tmp_path):
+    broken = tmp_path / "1899_broken.jpg"
+    broken.write_bytes(b"not a jpeg")
+
+    ok, hashes = hash_images([broken], workers=1)
+
+    assert ok == []
+    assert hashes["phash"].dtype == np.uint64 and len(hashes["phash"]) == 0
+    assert hashes["dhash"].dtype == np.uint64 and len(hashes["dhash"]) == 0
+    assert hashes["width"].dtype == np.int32 and len(hashes["width"]) == 0
+    assert hashes["height"].dtype == np.int32 and len(hashes["height"]) == 0
+
+
+def test_build_index_skips_images_that_do_not_decode(tmp_path):
+    images = tmp_path / "evidence"
+    images.mkdir()
+    (images / "1899_broken.jpg").write_bytes(b"not a jpeg")
+    index_path = tmp_path / "index.npz"
+
+    result = build_index(images, index_path, r"^(\d+)_", workers=1)
+
+    assert result["images"] == 0
+    assert result["skipped"] == 1
+    records, _ = load_index(index_path)
+    assert len(records["relative_path"]) == 0
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+imgsummary - precomputed image summaries refresh utility
+Runs the offline batch job that summarizes every image in the LOSS_EVIDENCE stage
+into the IMAGE_SUMMARIES table. Only new or changed files (by relative_path + md5)
+are sent to the multimodal model on each run.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+IMAGE_SUMMARIES_TABLE = "INS_CO.LOSS_CLAIMS.IMAGE_SUMMARIES"
+REFRESH_PROCEDURE = "INS_CO.LOSS_CLAIMS.REFRESH_IMAGE_SUMMARIES"
+
+
+def run_snow_query(connection_name: str, query: str) -> list:
+    """
+    Run a single query with the Snowflake CLI and return the JSON result rows.
+
+    Args:
+        connection_name: Snowflake CLI connection name
+        query: SQL statement to execute
+
+    Returns:
+        List of result rows (dicts keyed by column name)
+    """
+    cmd = ['snow', 'sql', '-c', connection_name, '--query', query, '--format', 'JSON']
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout) if result.stdout.strip() else []
+
+
+def refresh_image_summaries(connection_name: str, full_refresh: bool = False) -> Optional[Dict]:
+    """
+    Summarize new or changed images into the IMAGE_SUMMARIES table.
+
+    Args:
+        connection_name: Snowflake CLI connection name
+        full_refresh: Discard all existing summaries first and re-summarize every image
+
+    Returns:
+        The OBJECT returned by the refresh procedure, or None if it returned nothing
+    """
+    if full_refresh:
+        print(f"Truncating {IMAGE_SUMMARIES_TABLE} for a full refresh...")
+        run_snow_query(connection_name, f"TRUNCATE TABLE IF EXISTS {IMAGE_SUMMARIES_TABLE}")
+
+    rows = run_snow_query(connection_name, f"CALL {REFRESH_PROCEDURE}()")
+    if not rows:
+        return None
+
+    value = next(iter(rows[0].values()))
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def main():
+    """
+    Main entry point for command-line execution.
+
+    Usage:
+        python imgsummary.py <connection_name> [--full-refresh]
+    """
+    parser = argparse.ArgumentParser(
+        description="Summarize new or changed LOSS_EVIDENCE images into the IMAGE_SUMMARIES table"
+    )
+    parser.add_argument("connection_name", help="Snowflake CLI connection name")
+    parser.add_argument("--full-refresh", dest="full_refresh", action="store_true",
+                        help="Re-summarize every image instead of only new or changed ones")
+
+    args = parser.parse_args()
+
+    try:
+        print(f"Using Snowflake connection: {args.connection_name}")
+        started = time.perf_counter()
+        result = refresh_image_summaries(args.connection_name, args.full_refresh)
+        elapsed = time.perf_counter() - started
+
+        print(f"\n{'='*60}")
+        if result is None:
+            print("✗ Refresh procedure returned no result")
+            print(f"{'='*60}")
+            sys.exit(1)
+
+        print("Image Summary Refresh:")
+        print(f"  Summarized: {result.get('summarized', 0)}")
+        print(f"  Removed:    {result.get('removed', 0)}")
+        print(f"  Elapsed:    {elapsed:.1f}s")
+        print(f"{'='*60}")
+        sys.exit(0)
+
+    except subprocess.CalledProcessError as e:
+        print(f"\nERROR: Refresh failed with code {e.returncode}", file=sys.stderr)
+        if e.stderr:
+            print(f"\nSTDERR:\n{e.stderr}", file=sys.stderr)
+        sys.exit(1)
+    except FileNotFoundError:
+        print("\nERROR: 'snow' command not found. Please ensure Snowflake CLI is installed.", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+segtranscribe - segmented parallel transcription for long call recordings
+Splits WAV recordings locally into overlapping segments cut at silence, uploads the
+segments in one PUT, transcribes them concurrently with AI_TRANSCRIBE and stitches the
+speaker-labelled utterances back into one timeline. The result is stored in CALL_TRANSCRIPTS
+keyed by the recording's md5, where TRANSCRIBE_AUDIO_SIMPLE reads it instead of
+re-transcribing the whole file inside the agent's orchestration budget.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+TRANSCRIPTS_TABLE = "INS_CO.LOSS_CLAIMS.CALL_TRANSCRIPTS"
+SEGMENTS_STAGE = "@INS_CO.LOSS_CLAIMS.AUDIO_SEGMENTS"
+
+# Frame length for the loudness profile used to find silence
+FRAME_SECONDS = 0.02
+SAMPLE_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def file_md5(file_path: Path) -> str:
+    """MD5 of a file's contents, matching the stage directory md5 of an uncompressed PUT."""
+    digest = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def decode_samples(raw: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Decode PCM frames into a mono float array in [-1, 1]."""
+    if sample_width == 3:
+        data = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = (data[:, 0] | (data[:, 1] << 8) | (data[:, 2] << 16)) << 8 >> 8
+        scale = float(1 << 23)
+    else:
+        samples = np.frombuffer(raw, dtype=SAMPLE_DTYPES[sample_width]).astype(np.float64)
+        if sample_width == 1:
+            samples -= 128.0
+        scale = float(1 << (8 * sample_width - 1))
+    return samples.reshape(-1, channels).mean(axis=1) / scale
+
+
+def loudness_profile(wav_path: Path) -> Tuple[np.ndarray, float]:
+    """
+    Compute the RMS loudness of every FRAME_SECONDS frame of a WAV file, streaming the file.
+
+    Args:
+        wav_path: Path to a PCM WAV file
+
+    Returns:
+        Tuple of (RMS per frame, duration in seconds)
+    """
+    with wave.open(str(wav_path), "rb") as wav:
+        channels, sample_width, rate, total_frames = (
+            wav.getnchannels(), wav.getsampwidth(), wav.getframerate(), wav.getnframes()
+        )
+        frame_len = max(1, int(rate * FRAME_SECONDS))
+        block_frames = frame_len * 500
+        rms = []
+        while True:
+            raw = wav.readframes(block_frames)
+            if not raw:
+                break
+            samples = decode_samples(raw, sample_width, channels)
+            usable = len(samples) // frame_len * frame_len
+            if usable:
+                rms.append(np.sqrt((samples[:usable].reshape(-1, frame_len) ** 2).mean(axis=1)))
+    return (np.concatenate(rms) if rms else np.zeros(0)), total_frames / rate
+
+
+def find_cut_points(
+    rms: np.ndarray,
+    duration: float,
+    segment_seconds: float,
+    search_seconds: float,
+    min_silence_seconds: float
+) -> List[float]:
+    """
+    Choose segment boundaries at the quietest stretch before each target segment length.
+
+    Args:
+        rms: RMS loudness per FRAME_SECONDS frame
+        duration: Recording duration in seconds
+        segment_seconds: Maximum segment length
+        search_seconds: How far before the target length to look for silence
+        min_silence_seconds: Length of the quiet stretch the loudness is averaged over
+
+    Returns:
+        Cut times in seconds, in ascending order (excluding 0 and the end)
+    """
+    window = max(1, int(min_silence_seconds / FRAME_SECONDS))
+    smoothed = np.convolve(rms, np.ones(window) / window, mode="same") if len(rms) else rms
+
+    cuts = []
+    position = 0.0
+    while duration - position > segment_seconds:
+        target = position + segment_seconds
+        lo = int(max(position + segment_seconds / 2, target - search_seconds) / FRAME_SECONDS)
+        hi = max(lo + 1, min(int(target / FRAME_SECONDS), len(smoothed)))
+        if lo >= len(smoothed):
+            cut = target
+        else:
+            cut = (lo + int(np.argmin(smoothed[lo:hi])) + 0.5) * FRAME_SECONDS
+        cuts.append(cut)
+        position = cut
+    return cuts
+
+
+def plan_segments(cuts: List[float], duration: float, overlap_seconds: float) -> List[Dict]:
+    """
+    Turn cut times into overlapping segments.
+
+    Each segment owns the audio between its cuts and is padded by overlap_seconds on both
+    sides, so an utterance crossing a cut is heard whole by at least one segment.
+
+    Returns:
+        List of dicts with index, start, end, own_start and own_end in seconds
+    """
+    bounds = [0.0] + cuts + [duration]
+    return [
+        {
+            "index": i,
+            "start": max(0.0, own_start - overlap_seconds),
+            "end": min(duration, own_end + overlap_seconds),
+            "own_start": own_start,
+            "own_end": own_end,
+        }
+        for i, (own_start, own_end) in enumerate(zip(bounds, bounds[1:]))
+    ]
+
+
+def write_segments(wav_path: Path, segments: List[Dict], output_dir: Path) -> List[Path]:
+    """Write each segment as a WAV file with the source's format, without re-encoding."""
+    paths = []
+    with wave.open(str(wav_path), "rb") as source:
+        params = source.getparams()
+        rate = source.getframerate()
+        for segment in segments:
+            start_frame = int(segment["start"] * rate)
+            source.setpos(start_frame)
+            frames = source.readframes(int(segment["end"] * rate) - start_frame)
+            path = output_dir / f"{wav_path.stem}_seg{segment['index']:04d}.wav"
+            with wave.open(str(path), "wb") as target:
+                target.setparams(params)
+                target.writeframes(frames)
+            paths.append(path)
+    return paths
+
+
+def run_snow_query(connection_name: str, query: str) -> list:
+    """Run a query with the Snowflake CLI and return the JSON result rows."""
+    cmd = ['snow', 'sql', '-c', connection_name, '--query', query, '--format', 'JSON']
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout) if result.stdout.strip() else []
+
+
+def transcribe_segment(connection_name: str, stage_path: str) -> Dict:
+    """Transcribe one uploaded segment with speaker-level timestamps."""
+    stage, _, relative_path = stage_path.partition("/")
+    rows = run_snow_query(
+        connection_name,
+        f"SELECT AI_TRANSCRIBE(TO_FILE('{stage}', '{relative_path}'), "
+        f"{{'timestamp_granularity': 'speaker'}}) AS transcription"
+    )
+    value = next(iter(rows[0].values())) if rows else None
+    return json.loads(value) if isinstance(value, str) else (value or {})
+
+
+def match_speakers(previous: List[Dict], current: List[Dict], overlap_start: float, overlap_end: float) -> Dict:
+    """
+    Map one segment's speaker labels onto the stitched labels of the segment before it.
+
+    Both segments hear the overlap region, so a speaker's utterances there line up in time.
+    Label pairs are ranked by the seconds they share inside the overlap and matched one-to-one.
+
+    Returns:
+        Dict from the segment's own label to the stitched label, for the labels that matched
+    """
+    shared = {}
+    for utterance in current:
+        for earlier in previous:
+            seconds = (min(utterance["end"], earlier["end"], overlap_end)
+                       - max(utterance["start"], earlier["start"], overlap_start))
+            if seconds > 0 and utterance["speaker_label"] is not None and earlier["speaker_label"] is not None:
+                key = (utterance["speaker_label"], earlier["speaker_label"])
+                shared[key] = shared.get(key, 0.0) + seconds
+
+    mapping, taken = {}, set()
+    for (label, stitched), _ in sorted(shared.items(), key=lambda pair: -pair[1]):
+        if label not in mapping and stitched not in taken:
+            mapping[label] = stitched
+            taken.add(stitched)
+    return mapping
+
+
+def stitch_transcripts(segments: List[Dict], transcriptions: List[Dict], duration: float) -> Dict:
+    """
+    Stitch per-segment transcriptions into one timeline.
+
+    Utterance times are shifted by the segment's start. Overlap is removed by keeping each
+    utterance only in the segment that owns its midpoint. AI_TRANSCRIBE assigns speaker labels
+    per segment, so each segment's labels are mapped onto the previous segment's through the
+    utterances both heard in their overlap (see match_speakers). Labels that find no match are
+    namespaced by segment (e.g. "S2:SPEAKER_1") rather than merged with an unrelated speaker.
+    Each utterance also records its source segment.
+
+    Returns:
+        Object shaped like the AI_TRANSCRIBE result: audio_duration, segments and text
+    """
+    utterances = []
+    previous, previous_end = [], 0.0
+    for segment, transcription in zip(segments, transcriptions):
+        heard = []
+        for item in transcription.get("segments") or []:
+            start = segment["start"] + float(item.get("start", 0.0))
+            end = segment["start"] + float(item.get("end", item.get("start", 0.0)))
+            heard.append({"start": start, "end": end, "speaker_label": item.get("speaker_label"),
+                          "text": item.get("text", "")})
+
+        mapping = match_speakers(previous, heard, segment["start"], previous_end)
+        for utterance in heard:
+            label = utterance["speaker_label"]
+            if label is not None and label not in mapping:
+                mapping[label] = label if segment["index"] == 0 else f"S{segment['index']}:{label}"
+            utterance["speaker_label"] = mapping.get(label)
+        previous, previous_end = heard, segment["end"]
+
+        for utterance in heard:
+            midpoint = (utterance["start"] + utterance["end"]) / 2
+            if not segment["own_start"] <= midpoint < segment["own_end"]:
+                continue
+            utterances.append({
+                "start": round(utterance["start"], 3),
+                "end": round(utterance["end"], 3),
+                "speaker_label": utterance["speaker_label"],
+                "text": utterance["text"],
+                "source_segment": segment["index"],
+            })
+
+    utterances.sort(key=lambda u: u["start"])
+    return {
+        "audio_duration": round(duration, 3),
+        "segments": utterances,
+        "text": " ".join(u["text"].strip() for u in utterances if u["text"]),
+    }
+
+
+def stored_md5s(connection_name: str, md5s: List[str]) -> set:
+    """Return the md5s that already have a stored transcript."""
+    values = ", ".join(f"'{md5}'" for md5 in md5s)
+    rows = run_snow_query(connection_name, f"SELECT DISTINCT md5 FROM {TRANSCRIPTS_TABLE} WHERE md5 IN ({values})")
+    return {row["MD5"] for row in rows}
+
+
+def store_transcript(connection_name: str, row: Dict, work_dir: Path):
+    """Load one transcript row into CALL_TRANSCRIPTS with PUT and COPY, replacing any earlier one."""
+    batch_name = f"transcript_{row['md5']}.json.gz"
+    with gzip.open(work_dir / batch_name, "wt", encoding="utf-8") as f:
+        f.write(json.dumps(row) + "\n")
+
+    query = (
+        f"PUT 'file://{(work_dir / batch_name).absolute()}' {SEGMENTS_STAGE}/transcripts "
+        f"AUTO_COMPRESS=FALSE OVERWRITE=TRUE;\n"
+        f"DELETE FROM {TRANSCRIPTS_TABLE} WHERE md5 = '{row['md5']}';\n"
+        f"COPY INTO {TRANSCRIPTS_TABLE} (relative_path, md5, transcript, segment_count, audio_seconds, transcribe_ms, method)\n"
+        f"  FROM (SELECT $1:relative_path, $1:md5, $1:transcript, $1:segment_count, $1:audio_seconds,\n"
+        f"               $1:transcribe_ms, 'SEGMENTED'\n"
+        f"        FROM {SEGMENTS_STAGE}/transcripts)\n"
+        f"  FILES = ('{batch_name}')\n"
+        f"  FILE_FORMAT = (TYPE = JSON COMPRESSION = GZIP)\n"
+        f"  PURGE = TRUE;\n"
+        f"REMOVE {SEGMENTS_STAGE}/{row['md5']}/;"
+    )
+    subprocess.run(['snow', 'sql', '-c', connection_name, '-q', query], capture_output=True, text=True, check=True)
+
+
+def transcribe_recording(
+    connection_name: str,
+    wav_path: Path,
+    args: argparse.Namespace,
+    verbose: bool = True
+) -> Dict:
+    """
+    Split, upload, transcribe and stitch one recording.
+
+    Args:
+        connection_name: Snowflake CLI connection name (unused with --dry-run)
+        wav_path: Path to a PCM WAV file
+        args: Parsed segmentation and concurrency options
+        verbose: Print progress
+
+    Returns:
+        Dict with md5, segment count, audio seconds and transcription time
+    """
+    md5 = file_md5(wav_path)
+    rms, duration = loudness_profile(wav_path)
+    cuts = find_cut_points(rms, duration, args.segment_seconds, args.search_seconds, args.min_silence_seconds)
+    segments = plan_segments(cuts, duration, args.overlap_seconds)
+    if verbose:
+        print(f"  {wav_path.name}: {duration:.0f}s -> {len(segments)} segment(s), cuts at "
+              f"{', '.join(f'{cut:.1f}s' for cut in cuts) or 'none'}")
+    summary = {"file": wav_path.name, "md5": md5, "segments": len(segments), "audio_seconds": duration,
+               "transcribe_ms": 0}
+    if args.dry_run:
+        return summary
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = Path(tmp_dir)
+        paths = write_segments(wav_path, segments, work_dir)
+        subprocess.run(
+            ['snow', 'sql', '-c', connection_name, '-q',
+             f"PUT 'file://{work_dir.absolute()}/*.wav' {SEGMENTS_STAGE}/{md5} "
+             f"AUTO_COMPRESS=FALSE OVERWRITE=TRUE PARALLEL={args.parallel}"],
+            capture_output=True, text=True, check=True
+        )
+
+        started = time.perf_counter()
+        stage = SEGMENTS_STAGE.split("/")[0]
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            transcriptions = list(pool.map(
+                lambda path: transcribe_segment(connection_name, f"{stage}/{md5}/{path.name}"), paths
+            ))
+        transcribe_ms = int((time.perf_counter() - started) * 1000)
+
+        transcript = stitch_transcripts(segments, transcriptions, duration)
+        store_transcript(connection_name, {
+            "relative_path": wav_path.name,
+            "md5": md5,
+            "transcript": transcript,
+            "segment_count": len(segments),
+            "audio_seconds": round(duration, 3),
+            "transcribe_ms": transcribe_ms,
+        }, work_dir)
+
+    summary["transcribe_ms"] = transcribe_ms
+    if verbose:
+        print(f"    transcribed {len(segments)} segment(s) in {transcribe_ms / 1000:.1f}s "
+              f"({duration / max(transcribe_ms / 1000, 0.001):.1f}x real time), "
+              f"{len(transcript['segments'])} utterance(s)")
+    return summary
+
+
+def main():
+    """
+    Main entry point for command-line execution.
+
+    Usage:
+        python segtranscribe.py <path> <connection_name> [--segment-seconds N] [--overlap-seconds N]
+                                [--workers N] [--force] [--dry-run]
+    """
+    parser = argparse.ArgumentParser(
+        description="Transcribe long WAV recordings in parallel segments into CALL_TRANSCRIPTS"
+    )
+    parser.add_argument("path", help="WAV file, or directory whose .wav files are transcribed")
+    parser.add_argument("connection_name", help="Snowflake CLI connection name")
+    parser.add_argument("--segment-seconds", type=float, default=300.0,
+                        help="Maximum segment length in seconds (default: 300)")
+    parser.add_argument("--overlap-seconds", type=float, default=2.0,
+                        help="Audio shared by neighbouring segments in seconds (default: 2)")
+    parser.add_argument("--search-seconds", type=float, default=30.0,
+                        help="How far before the maximum length to look for silence (default: 30)")
+    parser.add_argument("--min-silence-seconds", type=float, default=0.4,
+                        help="Length of the quiet stretch a cut is centred on (default: 0.4)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Segments transcribed concurrently (default: 4)")
+    parser.add_argument("--parallel", type=int, default=8,
+                        help="PUT upload threads (default: 8)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-transcribe recordings that already have a stored transcript")
+    parser.add_argument("--dry-run", dest="dry_run", action="store_true",
+                        help="Only plan the segments locally")
+
+    args = parser.parse_args()
+
+    try:
+        path = Path(args.path)
+        wav_files = sorted(path.glob("*.wav")) if path.is_dir() else [path]
+        if not wav_files or not wav_files[0].is_file():
+            raise FileNotFoundError(f"No WAV files found at {path}")
+
+        if not args.dry_run and not args.force:
+            md5s = {f: file_md5(f) for f in wav_files}
+            done = stored_md5s(args.connection_name, list(md5s.values()))
+            skipped = [f for f in wav_files if md5s[f] in done]
+            for f in skipped:
+                print(f"  {f.name}: already transcribed, skipping (use --force to redo)")
+            wav_files = [f for f in wav_files if f not in skipped]
+
+        results = [transcribe_recording(args.connection_name, f, args) for f in wav_files]
+
+        print(f"\n{'='*60}")
+        print("Segmented Transcription:")
+        print(f"  Recordings:    {len(results)}")
+        print(f"  Segments:      {sum(r['segments'] for r in results)}")
+        print(f"  Audio:         {sum(r['audio_seconds'] for r in results) / 60:.1f} min")
+        if not args.dry_run:
+            print(f"  Transcription: {sum(r['transcribe_ms'] for r in results) / 1000:.1f}s")
+        print(f"{'='*60}")
+        sys.exit(0)
+
+    except subprocess.CalledProcessError as e:
+        print(f"\nERROR: Snowflake CLI failed with code {e.returncode}", file=sys.stderr)
+        if e.stderr:
+            print(f"\nSTDERR:\n{e.stderr}", file=sys.stderr)
+        sys.exit(1)
+    except wave.Error as e:
+        print(f"\nERROR: {e}. Only PCM WAV files are supported.", file=sys.stderr)
+        sys.exit(1)
+    except FileNotFoundError as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
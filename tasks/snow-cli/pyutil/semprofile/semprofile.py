@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+semprofile - semantic view sample value profiler
+Profiles every table referenced by the CA_INS_CO semantic view with one aggregate pass per
+table (APPROX_TOP_K, APPROX_COUNT_DISTINCT, MIN/MAX, null counts), sampling huge tables with a
+fixed seed, and rewrites the sample_values in the view's WITH EXTENSION (CA='...') JSON. The
+rest of the DDL, synonyms and comments included, is kept byte for byte, so running it twice
+on the same data produces the same file.
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SNOW_CLI_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_SQL_FILE = SNOW_CLI_DIR / "sql" / "batch-2" / "007-semantic_views.sql"
+DATABASE, SCHEMA = "INS_CO", "LOSS_CLAIMS"
+
+# Kinds of semantic view entries carried in the extension JSON, in the order it lists them
+ENTRY_KINDS = ("dimensions", "facts", "time_dimensions")
+TIME_TYPES = {"DATE", "TIMESTAMP_NTZ", "TIMESTAMP_LTZ", "TIMESTAMP_TZ", "TIME"}
+
+DEFAULT_SAMPLE_VALUES = 3
+# APPROX_TOP_K keeps this many counters; top values are exact when a column has fewer distinct values
+TOP_K_COUNTERS = 1000
+# Columns with at least this many distinct values per non-null row (keys, free text) have no
+# meaningful top values, and APPROX_TOP_K's counters for them depend on scan order; their
+# sample values are the lowest values instead
+NEAR_UNIQUE_RATIO = 0.9
+DEFAULT_SAMPLE_THRESHOLD_ROWS = 1_000_000
+DEFAULT_SEED = 42
+
+EXTENSION_PATTERN = re.compile(r"(with extension \(CA=')(.*)('\n\);\n?)$", re.S)
+SECTION_PATTERN = r"\n\t{name} \(\n(.*?)\n\t\)"
+ENTRY_PATTERN = re.compile(r"^\t\t(\w+)\.(.+?) as (\w+)(?: with| comment|,?$)", re.M)
+
+
+def run_snow_query(connection_name: str, query: str) -> list:
+    """
+    Run a single query with the Snowflake CLI and return the JSON result rows.
+
+    Args:
+        connection_name: Snowflake CLI connection name
+        query: SQL statement to execute
+
+    Returns:
+        List of result rows (dicts keyed by column name)
+    """
+    cmd = ['snow', 'sql', '-c', connection_name, '--query', query, '--format', 'JSON']
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout) if result.stdout.strip() else []
+
+
+def sql_string(value: str) -> str:
+    """Escape text for a single-quoted SQL string literal (backslashes and quotes)."""
+    return value.replace("\\", "\\\\").replace("'", "''")
+
+
+def unescape_sql_string(value: str) -> str:
+    """Inverse of sql_string."""
+    return re.sub(r"\\\\|''", lambda m: "\\" if m.group(0) == "\\\\" else "'", value)
+
+
+def parse_semantic_view(ddl: str) -> Tuple[List[str], List[Dict], Dict]:
+    """
+    Read the tables, the facts and dimensions, and the extension JSON of a semantic view DDL.
+
+    Returns:
+        Tuple of (table names, entries as dicts of table, expr, name, section, extension JSON)
+    """
+    match = EXTENSION_PATTERN.search(ddl)
+    if not match:
+        raise ValueError("No WITH EXTENSION (CA='...') clause found in the semantic view DDL")
+    extension = json.loads(unescape_sql_string(match.group(2)))
+
+    tables_section = re.search(SECTION_PATTERN.format(name="tables"), ddl, re.S)
+    tables = re.findall(r"^\t\t(\w+)", tables_section.group(1), re.M) if tables_section else []
+
+    entries = []
+    for section in ("facts", "dimensions"):
+        body = re.search(SECTION_PATTERN.format(name=section), ddl, re.S)
+        for table, expr, name in ENTRY_PATTERN.findall(body.group(1) if body else ""):
+            entries.append({"table": table, "expr": expr, "name": name, "section": section})
+    return tables, entries, extension
+
+
+def metadata_query(tables: List[str]) -> str:
+    """Row counts and column types of the semantic view tables, from INFORMATION_SCHEMA."""
+    names = ", ".join(f"'{t}'" for t in tables)
+    return (
+        f"SELECT c.table_name, c.column_name, c.data_type, t.row_count\n"
+        f"FROM {DATABASE}.INFORMATION_SCHEMA.COLUMNS c\n"
+        f"JOIN {DATABASE}.INFORMATION_SCHEMA.TABLES t\n"
+        f"  ON t.table_schema = c.table_schema AND t.table_name = c.table_name\n"
+        f"WHERE c.table_schema = '{SCHEMA}' AND c.table_name IN ({names})"
+    )
+
+
+def profile_query(entries: List[Dict], row_counts: Dict[str, int], sample_threshold_rows: int,
+                  seed: int, sample_values: int) -> str:
+    """
+    One aggregate SELECT per table, combined with UNION ALL into a single statement.
+
+    Each table returns one row holding an OBJECT per column, so every column of a table is
+    profiled in the same scan. Tables above sample_threshold_rows are read through a
+    seeded SAMPLE of about that many rows. APPROX_TOP_K returns every value it counts, not
+    just the sample values, so values tied at the cut-off (e.g. unique keys) are chosen by
+    top_values rather than by the engine. MIN_BY also returns the sample_values lowest values,
+    the deterministic choice for near-unique columns.
+
+    Returns:
+        The profiling query
+    """
+    by_table: Dict[str, List[Dict]] = {}
+    for entry in entries:
+        by_table.setdefault(entry["table"], []).append(entry)
+
+    selects = []
+    for table, table_entries in by_table.items():
+        columns = ",\n".join(
+            f"    '{e['name']}', OBJECT_CONSTRUCT_KEEP_NULL(\n"
+            f"        'distinct', APPROX_COUNT_DISTINCT({e['expr']}),\n"
+            f"        'nulls', COUNT_IF({e['expr']} IS NULL),\n"
+            f"        'min', TO_VARCHAR(MIN({e['expr']})),\n"
+            f"        'max', TO_VARCHAR(MAX({e['expr']})),\n"
+            f"        'top', APPROX_TOP_K(TO_VARCHAR({e['expr']}), {TOP_K_COUNTERS}, {TOP_K_COUNTERS}),\n"
+            f"        'lowest', MIN_BY(TO_VARCHAR({e['expr']}), {e['expr']}, {sample_values}))"
+            for e in table_entries
+        )
+        rows = row_counts.get(table) or 0
+        sample = ""
+        if rows > sample_threshold_rows:
+            percent = max(round(100.0 * sample_threshold_rows / rows, 4), 0.0001)
+            sample = f" SAMPLE ({percent}) SEED ({seed})"
+        selects.append(
+            f"SELECT '{table}' AS table_name, COUNT(*) AS profiled_rows, OBJECT_CONSTRUCT(\n{columns}\n  ) AS profile\n"
+            f"FROM {DATABASE}.{SCHEMA}.{table}{sample}"
+        )
+    return "\nUNION ALL\n".join(selects)
+
+
+def as_json(value):
+    """VARIANT columns come back from the Snowflake CLI as JSON text."""
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def top_values(top: List, limit: int) -> List[str]:
+    """Most frequent non-null values, ties broken by value so the result is deterministic."""
+    pairs = [(value, count) for value, count in (top or []) if value is not None]
+    return [value for value, _ in sorted(pairs, key=lambda p: (-p[1], p[0]))[:limit]]
+
+
+def column_sample_values(profile: Dict, rows: int, limit: int) -> List[str]:
+    """
+    Sample values for one profiled column.
+
+    Near-unique columns (see NEAR_UNIQUE_RATIO) take their lowest values, so the choice does
+    not depend on which values APPROX_TOP_K happened to count; other columns take top_values.
+    """
+    non_null = rows - (profile.get("nulls") or 0)
+    if non_null > 0 and (profile.get("distinct") or 0) >= NEAR_UNIQUE_RATIO * non_null:
+        lowest = [value for value in (profile.get("lowest") or []) if value is not None]
+        return list(dict.fromkeys(lowest))[:limit]
+    return top_values(profile.get("top"), limit)
+
+
+def update_extension(extension: Dict, entries: List[Dict], profiles: Dict[str, Dict],
+                     profiled_rows: Dict[str, int], column_types: Dict[Tuple[str, str], str],
+                     sample_values: int) -> Dict:
+    """
+    Rewrite the sample_values of every semantic view entry in the extension JSON.
+
+    Existing tables and entries keep their position; entries added to the view are appended
+    (DATE/TIMESTAMP dimensions as time_dimensions), and entries removed from it are dropped.
+    Everything else in the extension (relationships, verified queries) is left unchanged.
+
+    Returns:
+        The updated extension JSON
+    """
+    extension = json.loads(json.dumps(extension))
+    tables = {t["name"]: t for t in extension.setdefault("tables", [])}
+    names = {(e["table"], e["name"]) for e in entries}
+
+    for table in tables.values():
+        for kind in ENTRY_KINDS:
+            if kind in table:
+                table[kind] = [c for c in table[kind] if (table["name"], c["name"]) in names]
+
+    for entry in entries:
+        table = tables.get(entry["table"])
+        if table is None:
+            table = tables[entry["table"]] = {"name": entry["table"]}
+            extension["tables"].append(table)
+        existing = next((c for kind in ENTRY_KINDS for c in table.get(kind, []) if c["name"] == entry["name"]), None)
+        if existing is None:
+            kind = entry["section"]
+            if kind == "dimensions" and column_types.get((entry["table"], entry["expr"].upper())) in TIME_TYPES:
+                kind = "time_dimensions"
+            existing = {"name": entry["name"]}
+            table.setdefault(kind, []).append(existing)
+
+        profile = profiles.get(entry["table"], {}).get(entry["name"])
+        if profile is None:
+            continue
+        values = column_sample_values(profile, profiled_rows.get(entry["table"], 0), sample_values)
+        if values:
+            existing["sample_values"] = values
+        else:
+            existing.pop("sample_values", None)
+    return extension
+
+
+def render_ddl(ddl: str, extension: Dict) -> str:
+    """Replace the extension JSON in the DDL, serialized the way the file stores it."""
+    serialized = sql_string(json.dumps(extension, separators=(",", ":")))
+    return EXTENSION_PATTERN.sub(lambda m: m.group(1) + serialized + m.group(3), ddl)
+
+
+def print_profile(profiles: Dict[str, Dict], profiled_rows: Dict[str, int], row_counts: Dict[str, int]):
+    """Print rows, distinct values, nulls and range per profiled column."""
+    print(f"\n{'='*78}")
+    print("Semantic View Profile:")
+    for table, columns in profiles.items():
+        rows, scanned = row_counts.get(table) or 0, profiled_rows.get(table, 0)
+        sampled = f", sampled {scanned:,}" if scanned < rows else ""
+        print(f"\n  {table} ({rows:,} rows{sampled})")
+        for name, p in columns.items():
+            value_range = f"{p.get('min')} .. {p.get('max')}" if p.get("min") is not None else "-"
+            print(f"    {name:<24} distinct ~{p.get('distinct', 0):<8} nulls {p.get('nulls', 0):<8} {value_range}")
+    print(f"{'='*78}")
+
+
+def main():
+    """
+    Main entry point for command-line execution.
+
+    Usage:
+        python semprofile.py <connection_name> [--sql-file PATH] [--sample-values N] [--check]
+    """
+    parser = argparse.ArgumentParser(
+        description="Regenerate the semantic view sample values from a single-pass profile of each table"
+    )
+    parser.add_argument("connection_name", help="Snowflake CLI connection name")
+    parser.add_argument("--sql-file", default=str(DEFAULT_SQL_FILE),
+                        help="Semantic view DDL to update (default: sql/batch-2/007-semantic_views.sql)")
+    parser.add_argument("--sample-values", type=int, default=DEFAULT_SAMPLE_VALUES,
+                        help=f"Sample values per dimension or fact (default: {DEFAULT_SAMPLE_VALUES})")
+    parser.add_argument("--sample-threshold-rows", type=int, default=DEFAULT_SAMPLE_THRESHOLD_ROWS,
+                        help="Profile tables with more rows than this through a seeded SAMPLE of about "
+                             f"this many rows (default: {DEFAULT_SAMPLE_THRESHOLD_ROWS:,})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"SAMPLE seed (default: {DEFAULT_SEED})")
+    parser.add_argument("--check", action="store_true",
+                        help="Only report whether the DDL is out of date; exit 1 if it is")
+    parser.add_argument("--show-query", dest="show_query", action="store_true",
+                        help="Print the profiling query")
+
+    args = parser.parse_args()
+
+    try:
+        sql_file = Path(args.sql_file)
+        ddl = sql_file.read_text(encoding="utf-8")
+        tables, entries, extension = parse_semantic_view(ddl)
+        print(f"Profiling {len(entries)} dimensions and facts in {len(tables)} tables "
+              f"with connection: {args.connection_name}")
+
+        started = time.perf_counter()
+        column_types, row_counts = {}, {}
+        for row in run_snow_query(args.connection_name, metadata_query(tables)):
+            column_types[(row["TABLE_NAME"], row["COLUMN_NAME"])] = row["DATA_TYPE"]
+            row_counts[row["TABLE_NAME"]] = int(row["ROW_COUNT"] or 0)
+
+        query = profile_query(entries, row_counts, args.sample_threshold_rows, args.seed, args.sample_values)
+        if args.show_query:
+            print(f"\n{query}\n")
+        profiles, profiled_rows = {}, {}
+        for row in run_snow_query(args.connection_name, query):
+            profiles[row["TABLE_NAME"]] = as_json(row["PROFILE"])
+            profiled_rows[row["TABLE_NAME"]] = int(row["PROFILED_ROWS"])
+        elapsed = time.perf_counter() - started
+
+        print_profile(profiles, profiled_rows, row_counts)
+        updated = render_ddl(ddl, update_extension(extension, entries, profiles, profiled_rows, column_types,
+                                                   args.sample_values))
+        print(f"\nProfiled in {elapsed:.1f}s with 2 queries")
+
+        if updated == ddl:
+            print(f"✓ {sql_file.name} is up to date")
+            sys.exit(0)
+        if args.check:
+            print(f"⚠️  {sql_file.name} has out-of-date sample values", file=sys.stderr)
+            sys.exit(1)
+        sql_file.write_text(updated, encoding="utf-8")
+        print(f"✓ Updated sample values in {sql_file}")
+        sys.exit(0)
+
+    except subprocess.CalledProcessError as e:
+        print(f"\nERROR: Snowflake CLI failed with code {e.returncode}", file=sys.stderr)
+        if e.stderr:
+            print(f"\nSTDERR:\n{e.stderr}", file=sys.stderr)
+        sys.exit(1)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nERROR: Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
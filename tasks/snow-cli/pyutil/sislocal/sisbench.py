@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+sisbench - Streamlit app benchmark on the local Snowflake stand-in
+Replays scripted auditor sessions against streamlit_app.py with Streamlit's AppTest,
+backed by the sislocal fake session, and reports reruns/sec, Snowflake round-trips per
+interaction and peak memory. Thresholds turn the report into a pre-deploy regression gate.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from sislocal import SNOW_CLI_DIR, LocalBackend, install
+
+DEFAULT_APP_PATH = SNOW_CLI_DIR / "streamlit" / "streamlit_app.py"
+DEFAULT_CLAIM = "1899"
+DEFAULT_IMAGE = "1899_claim_evidence1.jpeg"
+
+
+def find_widget(widgets, label: str):
+    """Return the first widget of a collection with the given label."""
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"Widget not found: {label!r}")
+
+
+def auditor_session(claim_no: str, image_name: str) -> List[Tuple[str, Callable[[AppTest], None]]]:
+    """
+    The scripted interactions of one auditor session, in order.
+
+    Args:
+        claim_no: Claim number the auditor selects
+        image_name: Evidence image the auditor inspects
+
+    Returns:
+        List of (interaction name, action) pairs; each action triggers one AppTest run
+    """
+    return [
+        ("open app", lambda at: at.run()),
+        ("select claim", lambda at: at.selectbox(key="selected_claim").set_value(claim_no).run()),
+        ("ask predefined question", lambda at: find_widget(at.button, "Ask Predefined Question").click().run()),
+        ("ask follow-up", lambda at: at.chat_input[0].set_value(f"Show the reserves for claim {claim_no}").run()),
+        ("select image", lambda at: find_widget(at.selectbox, "Select an Image File:").set_value(image_name).run()),
+        ("load original", lambda at: at.checkbox(key="show_original_image").check().run()),
+        ("summarize image", lambda at: find_widget(at.button, "Generate Image Summary & Similarity").click().run()),
+        ("rank claim images", lambda at: find_widget(at.button, "Rank All Evidence Images for Claim").click().run()),
+    ]
+
+
+def run_benchmark(
+    app_path: Path,
+    sessions: int,
+    claim_no: str,
+    image_name: str,
+    latency: Dict[str, float],
+    cold: bool,
+    timeout: float
+) -> Dict:
+    """
+    Replay auditor sessions and collect per-interaction measurements.
+
+    Args:
+        app_path: Path to the Streamlit app under test
+        sessions: Number of auditor sessions to replay sequentially
+        claim_no: Claim number selected in each session
+        image_name: Evidence image inspected in each session
+        latency: Injected latency per round-trip kind, in seconds
+        cold: Clear Streamlit caches before every session
+        timeout: Per-run AppTest timeout, in seconds
+
+    Returns:
+        Dict with per-interaction rows and overall totals
+    """
+    backend = LocalBackend(latency=latency)
+    install(backend)
+
+    interactions: Dict[str, Dict] = {}
+    total_reruns = 0
+    total_seconds = 0.0
+    tracemalloc.start()
+
+    for _ in range(sessions):
+        if cold:
+            st.cache_data.clear()
+            st.cache_resource.clear()
+        at = AppTest.from_file(str(app_path), default_timeout=timeout)
+
+        for name, action in auditor_session(claim_no, image_name):
+            reruns_before = at.session_state["perf_tracer"].rerun if "perf_tracer" in at.session_state else 0
+            round_trips_before = backend.round_trips()
+            tracemalloc.reset_peak()
+            started = time.perf_counter()
+
+            action(at)
+
+            elapsed = time.perf_counter() - started
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            if at.exception:
+                raise RuntimeError(f"App raised during '{name}': {at.exception[0].message}")
+
+            reruns = at.session_state["perf_tracer"].rerun - reruns_before
+            stats = interactions.setdefault(name, {
+                "interaction": name, "runs": 0, "reruns": 0, "round_trips": 0,
+                "seconds": 0.0, "peak_mb": 0.0,
+            })
+            stats["runs"] += 1
+            stats["reruns"] += reruns
+            stats["round_trips"] += backend.round_trips() - round_trips_before
+            stats["seconds"] += elapsed
+            stats["peak_mb"] = max(stats["peak_mb"], peak_bytes / (1024 * 1024))
+            total_reruns += reruns
+            total_seconds += elapsed
+
+    tracemalloc.stop()
+
+    rows = []
+    for stats in interactions.values():
+        rows.append({
+            "interaction": stats["interaction"],
+            "round_trips_per_run": stats["round_trips"] / stats["runs"],
+            "reruns_per_run": stats["reruns"] / stats["runs"],
+            "ms_per_run": 1000 * stats["seconds"] / stats["runs"],
+            "peak_mb": stats["peak_mb"],
+        })
+
+    return {
+        "sessions": sessions,
+        "cold": cold,
+        "latency": backend.latency,
+        "interactions": rows,
+        "total_reruns": total_reruns,
+        "total_seconds": total_seconds,
+        "reruns_per_second": total_reruns / total_seconds if total_seconds else 0.0,
+        "round_trips_by_kind": dict(backend.counters),
+        "peak_mb": max((row["peak_mb"] for row in rows), default=0.0),
+    }
+
+
+def print_report(report: Dict):
+    """Print the benchmark report as a table."""
+    print(f"\n{'='*78}")
+    print(f"Streamlit App Benchmark ({report['sessions']} session(s), "
+          f"{'cold' if report['cold'] else 'warm'} caches)")
+    print(f"Injected latency: {json.dumps(report['latency'])}")
+    print(f"{'='*78}")
+    print(f"  {'Interaction':<28}{'Round-trips':>12}{'Reruns':>10}{'ms/run':>12}{'Peak MB':>12}")
+    for row in report["interactions"]:
+        print(f"  {row['interaction']:<28}{row['round_trips_per_run']:>12.1f}{row['reruns_per_run']:>10.1f}"
+              f"{row['ms_per_run']:>12.1f}{row['peak_mb']:>12.1f}")
+    print(f"{'-'*78}")
+    print(f"  Reruns/sec:          {report['reruns_per_second']:.2f}")
+    print(f"  Round-trips by kind: {json.dumps(report['round_trips_by_kind'])}")
+    print(f"  Peak memory:         {report['peak_mb']:.1f} MB")
+    print(f"{'='*78}")
+
+
+def check_thresholds(report: Dict, max_round_trips: float, min_reruns_per_second: float,
+                     max_peak_mb: float) -> List[str]:
+    """
+    Compare a report against regression thresholds.
+
+    Returns:
+        List of threshold violation messages (empty when all thresholds pass)
+    """
+    violations = []
+    for row in report["interactions"]:
+        if max_round_trips is not None and row["round_trips_per_run"] > max_round_trips:
+            violations.append(f"{row['interaction']}: {row['round_trips_per_run']:.1f} round-trips "
+                              f"> {max_round_trips}")
+    if min_reruns_per_second is not None and report["reruns_per_second"] < min_reruns_per_second:
+        violations.append(f"reruns/sec {report['reruns_per_second']:.2f} < {min_reruns_per_second}")
+    if max_peak_mb is not None and report["peak_mb"] > max_peak_mb:
+        violations.append(f"peak memory {report['peak_mb']:.1f} MB > {max_peak_mb} MB")
+    return violations
+
+
+def main():
+    """
+    Main entry point for command-line execution.
+
+    Usage:
+        python sisbench.py [--sessions N] [--latency-sql S] [--max-round-trips N] [--json FILE]
+    """
+    parser = argparse.ArgumentParser(
+        description="Replay auditor sessions against the Streamlit app on a local Snowflake stand-in"
+    )
+    parser.add_argument("--app", default=str(DEFAULT_APP_PATH), help="Path to the Streamlit app")
+    parser.add_argument("--sessions", type=int, default=3, help="Auditor sessions to replay (default: 3)")
+    parser.add_argument("--claim", default=DEFAULT_CLAIM, help="Claim number to audit")
+    parser.add_argument("--image", default=DEFAULT_IMAGE, help="Evidence image to inspect")
+    parser.add_argument("--cold", action="store_true", help="Clear Streamlit caches before every session")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-run AppTest timeout in seconds")
+    for kind in ("sql", "cortex", "analyst", "file"):
+        parser.add_argument(f"--latency-{kind}", dest=f"latency_{kind}", type=float,
+                            help=f"Injected latency per {kind} round-trip, in seconds")
+    parser.add_argument("--max-round-trips", dest="max_round_trips", type=float,
+                        help="Fail if any interaction averages more round-trips than this")
+    parser.add_argument("--min-reruns-per-second", dest="min_reruns_per_second", type=float,
+                        help="Fail if the overall rerun rate is lower than this")
+    parser.add_argument("--max-peak-mb", dest="max_peak_mb", type=float,
+                        help="Fail if peak traced memory exceeds this many MB")
+    parser.add_argument("--json", dest="json_output", help="Also write the report to this JSON file")
+
+    args = parser.parse_args()
+
+    app_path = Path(args.app)
+    if not app_path.exists():
+        print(f"Error: Streamlit app not found: {app_path}", file=sys.stderr)
+        sys.exit(1)
+
+    latency = {
+        kind: getattr(args, f"latency_{kind}")
+        for kind in ("sql", "cortex", "analyst", "file")
+        if getattr(args, f"latency_{kind}") is not None
+    }
+
+    try:
+        report = run_benchmark(app_path, args.sessions, args.claim, args.image,
+                               latency, args.cold, args.timeout)
+    except Exception as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_report(report)
+    if args.json_output:
+        Path(args.json_output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to {args.json_output}")
+
+    violations = check_thresholds(report, args.max_round_trips, args.min_reruns_per_second, args.max_peak_mb)
+    if violations:
+        print(f"\n✗ {len(violations)} threshold(s) exceeded:", file=sys.stderr)
+        for violation in violations:
+            print(f"  - {violation}", file=sys.stderr)
+        sys.exit(1)
+
+    print("\n✓ All thresholds passed")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
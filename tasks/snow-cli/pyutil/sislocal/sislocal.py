@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+sislocal - local stand-in for Streamlit in Snowflake
+Provides an offline Snowpark session and `_snowflake.send_snow_api_request` so the
+claims audit Streamlit app can be loaded, profiled and load-tested outside Snowflake.
+
+The session is backed by an in-process DuckDB database created from the batch-1 table
+DDL and seeded from the reference data in data/reference. The LOSS_EVIDENCE stage is
+served from the local upload directory. Cortex functions and the Cortex Analyst API return deterministic
+stand-in results, and every round-trip can be slowed down by a configurable latency.
+
+Usage (interactive, from tasks/snow-cli):
+    streamlit run pyutil/sislocal/sislocal.py -- streamlit/streamlit_app.py
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import runpy
+import sys
+import tempfile
+import threading
+import time
+import types
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import duckdb
+import pandas as pd
+
+SNOW_CLI_DIR = Path(__file__).resolve().parents[2]
+REPO_ROOT = SNOW_CLI_DIR.parents[1]
+DEFAULT_DDL_FILE = SNOW_CLI_DIR / "sql" / "batch-1" / "001-table_ddl.sql"
+DEFAULT_REFERENCE_DATA_DIR = SNOW_CLI_DIR / "data" / "reference"
+DEFAULT_STAGES = {
+    "INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE": REPO_ROOT / "upload",
+}
+
+# Injected latency per round-trip kind, in seconds. Override with SISLOCAL_LATENCY='{"sql": 0.1}'
+DEFAULT_LATENCY = {
+    "sql": 0.0,
+    "cortex": 0.0,
+    "analyst": 0.0,
+    "file": 0.0,
+}
+
+CORTEX_FUNCTION_RE = re.compile(r"\b(AI_COMPLETE|COMPLETE|AI_SIMILARITY)\s*\(", re.IGNORECASE)
+DIRECTORY_RE = re.compile(r"DIRECTORY\(\s*'?@([\w.$]+)'?\s*\)", re.IGNORECASE)
+# Table names that are reserved words in DuckDB and must be quoted there
+RESERVED_TABLE_RE = re.compile(r"(?<![\w\"])(AUTHORIZATION)(?![\w\"])", re.IGNORECASE)
+
+
+def quote_reserved_names(sql: str) -> str:
+    """Quote table names that DuckDB reserves (e.g. AUTHORIZATION)."""
+    return RESERVED_TABLE_RE.sub(lambda m: f'"{m.group(1).lower()}"', sql)
+
+
+def load_latency_profile(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Build the latency profile from the defaults, SISLOCAL_LATENCY and explicit overrides.
+
+    Args:
+        overrides: Per-kind latency in seconds taking precedence over the environment
+
+    Returns:
+        Dict of round-trip kind -> latency in seconds
+    """
+    latency = dict(DEFAULT_LATENCY)
+    if os.environ.get("SISLOCAL_LATENCY"):
+        latency.update(json.loads(os.environ["SISLOCAL_LATENCY"]))
+    if overrides:
+        latency.update(overrides)
+    return latency
+
+
+def translate_ddl(ddl_sql: str) -> List[str]:
+    """
+    Translate the Snowflake CREATE TABLE statements of a DDL file into DuckDB statements.
+
+    Args:
+        ddl_sql: Contents of a Snowflake DDL file
+
+    Returns:
+        List of DuckDB CREATE TABLE statements
+    """
+    ddl_sql = re.sub(r"--[^\n]*", "", ddl_sql)
+    statements = []
+    for statement in ddl_sql.split(";"):
+        statement = statement.strip()
+        if not re.match(r"CREATE\s+(OR\s+REPLACE\s+)?TABLE", statement, re.IGNORECASE):
+            continue
+        statement = re.sub(r"\s+COMMENT\s+'(?:[^']|'')*'", "", statement, flags=re.IGNORECASE)
+        statement = re.sub(r"\bTIMESTAMP_NTZ\b", "TIMESTAMP", statement, flags=re.IGNORECASE)
+        statement = re.sub(r"\bVARIANT\b", "JSON", statement, flags=re.IGNORECASE)
+        statements.append(quote_reserved_names(statement))
+    return statements
+
+
+def reference_data_sources(data_dir: Path) -> Dict[str, str]:
+    """
+    Find the per-table reference data inputs in the layout pyutil/snowcliload reads.
+
+    Args:
+        data_dir: Directory with <table>.csv|.csv.gz|.parquet files or <table>/ part directories
+
+    Returns:
+        Dict of table name -> DuckDB table function call reading that input
+    """
+    sources = {}
+    for entry in sorted(Path(data_dir).iterdir()):
+        if entry.is_dir():
+            parts = sorted(entry.glob("*.parquet")) or sorted(entry.glob("*.csv*"))
+            if not parts:
+                continue
+            table, files = entry.name, [str(part) for part in parts]
+        else:
+            match = re.match(r"(\w+)\.(csv(?:\.gz)?|parquet)$", entry.name, re.IGNORECASE)
+            if not match:
+                continue
+            table, files = match.group(1), [str(entry)]
+        if files[0].endswith(".parquet"):
+            sources[table.upper()] = f"read_parquet({files!r})"
+        else:
+            sources[table.upper()] = f"read_csv({files!r}, header = true, all_varchar = true)"
+    return sources
+
+
+def offline_similarity(text1: str, text2: str) -> float:
+    """Deterministic stand-in for AI_SIMILARITY: Jaccard similarity of the word sets."""
+    words1 = set(re.findall(r"\w+", (text1 or "").lower()))
+    words2 = set(re.findall(r"\w+", (text2 or "").lower()))
+    if not words1 or not words2:
+        return 0.0
+    return len(words1 & words2) / len(words1 | words2)
+
+
+def offline_complete(model: str, prompt: str, file_ref: Optional[str] = None) -> str:
+    """Deterministic stand-in for COMPLETE / AI_COMPLETE."""
+    subject = Path(file_ref).name if file_ref else "the prompt"
+    return f"[offline {model}] Summary of {subject}: damaged dwelling and fence after a tree fell during a storm."
+
+
+class LocalBackend:
+    """
+    In-process dataset behind the fake session, with round-trip counters and injected latency.
+    """
+
+    def __init__(
+        self,
+        ddl_file: Path = DEFAULT_DDL_FILE,
+        reference_data_dir: Optional[Path] = DEFAULT_REFERENCE_DATA_DIR,
+        stages: Optional[Dict[str, Path]] = None,
+        latency: Optional[Dict[str, float]] = None,
+        output_dir: Optional[Path] = None
+    ):
+        self.latency = load_latency_profile(latency)
+        self.stages = {name.upper(): Path(path) for name, path in (stages or DEFAULT_STAGES).items()}
+        self.output_dir = Path(output_dir or tempfile.mkdtemp(prefix="sislocal_stage_"))
+        self.counters: Dict[str, int] = {kind: 0 for kind in self.latency}
+        self._lock = threading.Lock()
+
+        self.con = duckdb.connect()
+        self.con.execute("ATTACH ':memory:' AS ins_co")
+        self.con.execute("CREATE SCHEMA ins_co.loss_claims")
+        self.con.execute("USE ins_co.loss_claims")
+        self._register_functions()
+
+        for statement in translate_ddl(Path(ddl_file).read_text(encoding="utf-8")):
+            self.con.execute(statement)
+        if reference_data_dir and Path(reference_data_dir).is_dir():
+            for table, source in reference_data_sources(reference_data_dir).items():
+                self.con.execute(f"INSERT INTO {quote_reserved_names(table)} BY NAME SELECT * FROM {source}")
+            self._refresh_claim_audit_flags()
+        self._load_stage_directories()
+
+    def _register_functions(self):
+        """Register DuckDB equivalents for the Snowflake functions the app uses."""
+        self.con.create_function("AI_SIMILARITY", offline_similarity, ["VARCHAR", "VARCHAR"], "DOUBLE")
+        self.con.create_function("COMPLETE", offline_complete, ["VARCHAR", "VARCHAR", "VARCHAR"], "VARCHAR")
+        self.con.create_function("AI_COMPLETE", offline_complete, ["VARCHAR", "VARCHAR", "VARCHAR"], "VARCHAR")
+        for macro in (
+            "CREATE MACRO STARTSWITH(s, prefix) AS starts_with(s, prefix)",
+            "CREATE MACRO SHA2(s, bits) AS sha256(s)",
+            "CREATE MACRO TO_FILE(path) AS path",
+            # Timestamps in the fake directory are already fixed-format strings
+            "CREATE MACRO TO_VARCHAR(value, fmt) AS CAST(value AS VARCHAR)",
+            "CREATE MACRO TO_TIMESTAMP_TZ(value, fmt) AS value",
+        ):
+            self.con.execute(macro)
+
+    def _refresh_claim_audit_flags(self):
+        """Fill CLAIM_AUDIT_FLAGS with the pyutil/auditrules rules, as REFRESH_CLAIM_AUDIT_FLAGS does in Snowflake."""
+        sys.path.insert(0, str(SNOW_CLI_DIR / "pyutil" / "auditrules"))
+        import auditrules
+
+        tables = {}
+        for table in ("claims", "claim_lines", "financial_transactions", "invoices", "authorization"):
+            frame = self.con.execute(f"SELECT * FROM {quote_reserved_names(table)}").df().astype(str)
+            frame.columns = [column.upper() for column in frame.columns]
+            tables[table] = frame
+        if tables["claims"].empty:
+            return
+
+        flags_df = auditrules.evaluate(tables)
+        flags_df.columns = [column.lower() for column in flags_df.columns]
+        self.con.register("claim_audit_flags_df", flags_df)
+        self.con.execute("INSERT INTO claim_audit_flags BY NAME SELECT * FROM claim_audit_flags_df")
+        self.con.unregister("claim_audit_flags_df")
+
+    def _load_stage_directories(self):
+        """Build the directory table for every stage from its local directory."""
+        rows = []
+        for stage_name, stage_dir in self.stages.items():
+            if not stage_dir.is_dir():
+                continue
+            for path in sorted(p for p in stage_dir.rglob("*") if p.is_file()):
+                stat = path.stat()
+                modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+                rows.append({
+                    "stage_name": stage_name,
+                    "relative_path": path.relative_to(stage_dir).as_posix(),
+                    "size": stat.st_size,
+                    "md5": hashlib.md5(path.read_bytes()).hexdigest(),
+                    "last_modified": modified.strftime("%Y-%m-%d %H:%M:%S.%f000 +0000"),
+                })
+        directory_df = pd.DataFrame(
+            rows, columns=["stage_name", "relative_path", "size", "md5", "last_modified"]
+        )
+        self.con.register("stage_directory_df", directory_df)
+        self.con.execute("CREATE TABLE stage_directory AS SELECT * FROM stage_directory_df")
+        self.con.unregister("stage_directory_df")
+        self.con.execute(
+            "CREATE MACRO stage_directory_of(name) AS TABLE "
+            "SELECT relative_path, size, md5, last_modified FROM stage_directory WHERE stage_name = name"
+        )
+
+    def _wait(self, kind: str):
+        self.counters[kind] = self.counters.get(kind, 0) + 1
+        delay = self.latency.get(kind, 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def round_trips(self) -> int:
+        """Total number of simulated Snowflake round-trips so far."""
+        return sum(self.counters.values())
+
+    def translate_query(self, query: str) -> str:
+        """Rewrite Snowflake-specific syntax in a query into its DuckDB equivalent."""
+        query = re.sub(r"\bSNOWFLAKE\.CORTEX\.", "", query, flags=re.IGNORECASE)
+        query = DIRECTORY_RE.sub(lambda m: f"stage_directory_of('{m.group(1).upper()}')", query)
+        return quote_reserved_names(query.strip().rstrip(";"))
+
+    def execute(self, query: str, params: Optional[List] = None) -> pd.DataFrame:
+        """
+        Execute a Snowflake query against the local dataset.
+
+        Args:
+            query: Snowflake SQL text
+            params: Positional (qmark) bind parameters
+
+        Returns:
+            Result as a DataFrame with Snowflake-style upper-case column names
+        """
+        from snowflake.snowpark.exceptions import SnowparkSQLException
+
+        self._wait("cortex" if CORTEX_FUNCTION_RE.search(query) else "sql")
+        with self._lock:
+            try:
+                cursor = self.con.execute(self.translate_query(query), params or [])
+                df = cursor.fetchdf() if cursor.description else pd.DataFrame()
+            except duckdb.Error as e:
+                raise SnowparkSQLException(f"[sislocal] {e}") from e
+        # Unquoted identifiers resolve to upper case in Snowflake; quoted mixed-case aliases do not
+        df.columns = [c.upper() if c == c.lower() else c for c in df.columns]
+        return df
+
+    def resolve_stage_path(self, stage_location: str) -> Path:
+        """Map '@DB.SCHEMA.STAGE/path' to the local file backing it."""
+        stage_name, _, relative_path = stage_location.lstrip("@").partition("/")
+        stage_dir = self.stages.get(stage_name.upper())
+        if stage_dir is None:
+            stage_dir = self.output_dir / stage_name.upper()
+        return stage_dir / relative_path
+
+    def analyst_response(self, request_body: Dict) -> Dict:
+        """Canned Cortex Analyst reply: an explanation plus a SQL statement for the asked claim."""
+        self._wait("analyst")
+        question = ""
+        for message in reversed(request_body.get("messages", [])):
+            if message.get("role") == "user":
+                question = " ".join(c.get("text", "") for c in message.get("content", []))
+                break
+        claim_match = re.search(r"claim (\w+)", question, re.IGNORECASE)
+        claim_no = claim_match.group(1) if claim_match else "1899"
+        statement = (
+            "SELECT cl.claim_no, cl.line_no, ft.financial_type, ft.fin_tx_amt, ft.fin_tx_post_dt\n"
+            "FROM INS_CO.LOSS_CLAIMS.CLAIM_LINES cl\n"
+            "JOIN INS_CO.LOSS_CLAIMS.FINANCIAL_TRANSACTIONS ft ON ft.line_no = cl.line_no\n"
+            f"WHERE cl.claim_no = '{claim_no}'\n"
+            "ORDER BY cl.line_no, ft.fin_tx_post_dt"
+        )
+        return {
+            "request_id": hashlib.md5(question.encode("utf-8")).hexdigest(),
+            "message": {
+                "role": "analyst",
+                "content": [
+                    {"type": "text", "text": f"[offline analyst] Transactions for claim {claim_no}."},
+                    {"type": "sql", "statement": statement},
+                ],
+            },
+        }
+
+
+class FakeFileOperation:
+    """Stand-in for Session.file, reading and writing the local stage directories."""
+
+    def __init__(self, backend: LocalBackend):
+        self._backend = backend
+
+    def get_stream(self, stage_location: str, parallel: int = 10, decompress: bool = False) -> io.BytesIO:
+        self._backend._wait("file")
+        return io.BytesIO(self._backend.resolve_stage_path(stage_location).read_bytes())
+
+    def put_stream(self, input_stream, stage_location: str, parallel: int = 4,
+                   auto_compress: bool = True, source_compression: str = "AUTO_DETECT",
+                   overwrite: bool = False):
+        self._backend._wait("file")
+        target = self._backend.resolve_stage_path(stage_location)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(input_stream.read())
+
+
+class FakeDataFrame:
+    """Lazy stand-in for the subset of the Snowpark DataFrame API used by the app."""
+
+    def __init__(self, backend: LocalBackend, query: str, params: Optional[List] = None):
+        self._backend = backend
+        self._query = query
+        self._params = params
+
+    def _derive(self, query: str) -> "FakeDataFrame":
+        return FakeDataFrame(self._backend, query, self._params)
+
+    def select(self, *columns: str) -> "FakeDataFrame":
+        return self._derive(f"SELECT {', '.join(columns)} FROM ({self._query})")
+
+    def filter(self, condition: str) -> "FakeDataFrame":
+        return self._derive(f"SELECT * FROM ({self._query}) WHERE {condition}")
+
+    where = filter
+
+    def distinct(self) -> "FakeDataFrame":
+        return self._derive(f"SELECT DISTINCT * FROM ({self._query})")
+
+    def limit(self, n: int) -> "FakeDataFrame":
+        return self._derive(f"SELECT * FROM ({self._query}) LIMIT {int(n)}")
+
+    def to_pandas(self) -> pd.DataFrame:
+        return self._backend.execute(self._query, self._params)
+
+    def collect(self) -> List[Dict]:
+        return self.to_pandas().to_dict("records")
+
+
+class FakeSession:
+    """Stand-in for snowflake.snowpark.Session backed by a LocalBackend."""
+
+    def __init__(self, backend: Optional[LocalBackend] = None):
+        self.backend = backend or LocalBackend()
+        self.file = FakeFileOperation(self.backend)
+
+    def table(self, name: str) -> FakeDataFrame:
+        return FakeDataFrame(self.backend, f"SELECT * FROM {name}")
+
+    def sql(self, query: str, params: Optional[List] = None) -> FakeDataFrame:
+        return FakeDataFrame(self.backend, query, params)
+
+
+def install(backend: Optional[LocalBackend] = None) -> FakeSession:
+    """
+    Make the app's Snowflake imports resolve to the local stand-ins.
+
+    Registers a `_snowflake` module whose send_snow_api_request answers Cortex Analyst
+    requests from the backend, and patches get_active_session to return a FakeSession.
+    If snowflake-snowpark-python is not installed, minimal context and exceptions
+    modules are registered instead.
+
+    Args:
+        backend: Backend to serve from (a default LocalBackend when omitted)
+
+    Returns:
+        The FakeSession returned by get_active_session
+    """
+    try:
+        import snowflake.snowpark.context as snowpark_context
+        import snowflake.snowpark.exceptions  # noqa: F401
+    except ImportError:
+        snowpark_context = types.ModuleType("snowflake.snowpark.context")
+        exceptions = types.ModuleType("snowflake.snowpark.exceptions")
+        exceptions.SnowparkSQLException = type("SnowparkSQLException", (Exception,), {})
+        snowpark = types.ModuleType("snowflake.snowpark")
+        snowpark.context, snowpark.exceptions = snowpark_context, exceptions
+        sys.modules.setdefault("snowflake", types.ModuleType("snowflake")).snowpark = snowpark
+        sys.modules.update({
+            "snowflake.snowpark": snowpark,
+            "snowflake.snowpark.context": snowpark_context,
+            "snowflake.snowpark.exceptions": exceptions,
+        })
+
+    session = FakeSession(backend)
+
+    def send_snow_api_request(method, path, headers, params, body, request_guid, timeout):
+        content = session.backend.analyst_response(body)
+        return {"status": 200, "content": json.dumps(content)}
+
+    snowflake_module = types.ModuleType("_snowflake")
+    snowflake_module.send_snow_api_request = send_snow_api_request
+    sys.modules["_snowflake"] = snowflake_module
+    snowpark_context.get_active_session = lambda: session
+    return session
+
+
+def main():
+    """
+    Run a Streamlit app against the local stand-ins.
+
+    Usage (as a Streamlit script):
+        streamlit run sislocal.py -- <path/to/streamlit_app.py>
+    """
+    app_path = Path(sys.argv[1]) if len(sys.argv) > 1 else SNOW_CLI_DIR / "streamlit" / "streamlit_app.py"
+    if not app_path.exists():
+        print(f"Error: Streamlit app not found: {app_path}", file=sys.stderr)
+        sys.exit(1)
+
+    import streamlit as st
+
+    # Streamlit re-executes this script on every rerun; keep one backend per process
+    @st.cache_resource
+    def get_local_backend() -> LocalBackend:
+        return LocalBackend()
+
+    install(get_local_backend())
+    runpy.run_path(str(app_path), run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+snowbroker - persistent local Snowflake session broker for the pyutil tools
+A long-lived process, started on first use and reached over a Unix socket, that keeps a
+warm pool of authenticated snowflake.connector sessions per CLI connection name. snowclisp,
+snowcliput and genagentsql send it statements and PUTs as JSON lines instead of spawning a
+`snow` process (config load + authentication) per call, and fall back to the Snowflake CLI
+when the broker cannot be used. The broker exits on its own after an idle timeout.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+SOCKET_DIR = Path(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()) / f"snowbroker-{os.getuid()}"
+DEFAULT_SOCKET_PATH = SOCKET_DIR / "snowbroker.sock"
+LOG_PATH = SOCKET_DIR / "snowbroker.log"
+DEFAULT_IDLE_TIMEOUT_SECONDS = 900
+STARTUP_TIMEOUT_SECONDS = 15
+MAX_IDLE_SESSIONS = 4
+
+# Set to 1 to always use the Snowflake CLI
+DISABLE_ENV = "SNOWBROKER_DISABLE"
+
+
+class BrokerError(Exception):
+    """A statement sent through the broker failed in Snowflake, or the broker was lost after it was sent."""
+
+
+# ---------------------------------------------------------------------------
+# Broker (server side)
+# ---------------------------------------------------------------------------
+
+class SessionPool:
+    """Idle authenticated sessions per connection name, with connect-time statistics."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.idle: Dict[str, List] = {}
+        self.auth_ms: Dict[str, List[float]] = {}
+        self.contexts: Dict[int, tuple] = {}
+
+    def checkout(self, connection_name: str):
+        """Return (session, auth_ms) with auth_ms 0 for a reused session."""
+        with self.lock:
+            sessions = self.idle.get(connection_name)
+            if sessions:
+                return sessions.pop(), 0.0
+
+        import snowflake.connector
+
+        started = time.perf_counter()
+        session = snowflake.connector.connect(connection_name=connection_name, client_session_keep_alive=True)
+        auth_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.auth_ms.setdefault(connection_name, []).append(auth_ms)
+            self.contexts[id(session)] = session_context(session)
+        return session, auth_ms
+
+    def restore_context(self, session) -> bool:
+        """
+        Undo USE statements of the last request so every caller starts in the connection's
+        configured context, as a new `snow` process would.
+
+        Parts of the context the connection does not configure (e.g. no default database)
+        cannot be unset with USE; they are left as the last request set them.
+
+        Returns:
+            False if the context could not be restored (e.g. its database was dropped)
+        """
+        initial = self.contexts.get(id(session))
+        if initial is None or context_matches(session_context(session), initial):
+            return True
+        role, warehouse, database, schema = initial
+        current = session_context(session)
+        statements = [f'USE ROLE "{role}"' if role and current[0] != role else None,
+                      f'USE WAREHOUSE "{warehouse}"' if warehouse and current[1] != warehouse else None,
+                      f'USE SCHEMA "{database}"."{schema}"' if database and schema else
+                      f'USE DATABASE "{database}"' if database else None]
+        try:
+            for statement in filter(None, statements):
+                session.cursor().execute(statement)
+        except Exception:
+            return False
+        return context_matches(session_context(session), initial)
+
+    def checkin(self, connection_name: str, session):
+        """Return a healthy session to the pool, closing it if the pool is full."""
+        if not session.is_closed() and self.restore_context(session):
+            with self.lock:
+                sessions = self.idle.setdefault(connection_name, [])
+                if len(sessions) < MAX_IDLE_SESSIONS:
+                    sessions.append(session)
+                    return
+        self.discard(session)
+
+    def discard(self, session):
+        """Close a session that is not going back to the pool."""
+        with self.lock:
+            self.contexts.pop(id(session), None)
+        try:
+            session.close()
+        except Exception:
+            pass
+
+    def average_auth_ms(self, connection_name: str) -> float:
+        """Average time it took to open an authenticated session for a connection."""
+        samples = self.auth_ms.get(connection_name) or [0.0]
+        return sum(samples) / len(samples)
+
+    def close_all(self):
+        """Close every idle session."""
+        with self.lock:
+            sessions = [session for pooled in self.idle.values() for session in pooled]
+            self.idle.clear()
+        for session in sessions:
+            self.discard(session)
+
+
+def session_context(session) -> tuple:
+    """Role, warehouse, database and schema of a session as last reported by Snowflake."""
+    return session.role, session.warehouse, session.database, session.schema
+
+
+def context_matches(current: tuple, initial: tuple) -> bool:
+    """True if every part of the initial context that was set is set the same way now."""
+    return all(value is None or value == now for now, value in zip(current, initial))
+
+
+def measure_cli_start_ms() -> float:
+    """Wall time of a `snow` process that does no work, i.e. the per-call CLI start cost."""
+    if shutil.which("snow") is None:
+        return 0.0
+    started = time.perf_counter()
+    subprocess.run(["snow", "--version"], capture_output=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def json_value(value):
+    """Make connector values (Decimal, dates, bytes) JSON-serializable like the CLI output."""
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return str(value)
+
+
+class BrokerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket server that executes requests on pooled sessions."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, idle_timeout: int):
+        self.pool = SessionPool()
+        self.idle_timeout = idle_timeout
+        self.last_activity = time.monotonic()
+        self.active = 0
+        self.active_lock = threading.Lock()
+        self.cli_start_ms = 0.0
+        self.stats = {"requests": 0, "sessions_opened": 0, "sessions_reused": 0, "saved_ms": 0.0}
+        super().__init__(str(socket_path), BrokerRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def execute(self, request: Dict) -> Dict:
+        """Run the statements of one request on a pooled session."""
+        connection_name = request["connection"]
+        try:
+            session, auth_ms = self.pool.checkout(connection_name)
+        except Exception as e:
+            # Let the client fall back to the Snowflake CLI, which reports the problem itself
+            return {"ok": False, "connect_failed": True, "error": str(e)}
+        started = time.perf_counter()
+        healthy = True
+        try:
+            results = []
+            # A list of scripts (e.g. one per SQL file) runs in order on the same session
+            scripts = request["sql"] if isinstance(request["sql"], list) else [request["sql"]]
+            for script in scripts:
+                for cursor in session.execute_string(script, remove_comments=False):
+                    columns = [c[0] for c in cursor.description or []]
+                    rows = cursor.fetchall() if cursor.description else []
+                    results.append([dict(zip(columns, row)) for row in rows])
+            response = {"ok": True, "results": results}
+        except Exception as e:
+            # Errors raised by Snowflake for a statement leave the session usable
+            healthy = hasattr(e, "sqlstate") and not session.is_closed()
+            response = {"ok": False, "error": str(e)}
+        finally:
+            if healthy:
+                self.pool.checkin(connection_name, session)
+            else:
+                self.pool.discard(session)
+
+        reused = auth_ms == 0.0
+        # A CLI call would have paid the process start, and authentication unless it is paid here too
+        saved_ms = self.cli_start_ms + (self.pool.average_auth_ms(connection_name) if reused else 0.0)
+        self.stats["requests"] += 1
+        self.stats["sessions_reused" if reused else "sessions_opened"] += 1
+        self.stats["saved_ms"] += saved_ms
+        response["stats"] = {
+            "session_reused": reused,
+            "auth_ms": round(auth_ms, 1),
+            "exec_ms": round((time.perf_counter() - started) * 1000, 1),
+            "saved_ms": round(saved_ms, 1),
+        }
+        return response
+
+    def handle_request_line(self, request: Dict) -> Dict:
+        """Dispatch one JSON request."""
+        op = request.get("op")
+        if op == "execute":
+            return self.execute(request)
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "stats":
+            return {"ok": True, "stats": dict(self.stats, cli_start_ms=round(self.cli_start_ms, 1))}
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+    def watch_idle(self):
+        """Shut the broker down once it has been idle for idle_timeout seconds."""
+        while True:
+            time.sleep(min(30, self.idle_timeout))
+            with self.active_lock:
+                idle = self.active == 0 and time.monotonic() - self.last_activity > self.idle_timeout
+            if idle:
+                self.shutdown()
+                return
+
+
+class BrokerRequestHandler(socketserver.StreamRequestHandler):
+    """One client connection: a JSON request per line, a JSON response per line."""
+
+    def handle(self):
+        for line in self.rfile:
+            with self.server.active_lock:
+                self.server.active += 1
+            try:
+                request = json.loads(line)
+                response = self.server.handle_request_line(request)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            finally:
+                with self.server.active_lock:
+                    self.server.active -= 1
+                    self.server.last_activity = time.monotonic()
+            self.wfile.write((json.dumps(response, default=json_value) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+def serve(socket_path: Path, idle_timeout: int):
+    """Run the broker until it is idle for idle_timeout seconds or asked to shut down."""
+    socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if socket_path.exists():
+        socket_path.unlink()
+    server = BrokerServer(socket_path, idle_timeout)
+    threading.Thread(target=server.watch_idle, daemon=True).start()
+    threading.Thread(target=lambda: setattr(server, "cli_start_ms", measure_cli_start_ms()), daemon=True).start()
+    print(f"snowbroker {os.getpid()} listening on {socket_path} (idle timeout {idle_timeout}s)", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.pool.close_all()
+        server.server_close()
+        if socket_path.exists():
+            socket_path.unlink()
+        print(f"snowbroker {os.getpid()} stopped after {server.stats['requests']} request(s)", flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+# Requests this process sent through the broker, for print_savings
+CLIENT_STATS = {"requests": 0, "sessions_reused": 0, "saved_ms": 0.0}
+
+
+def request(message: Dict, socket_path: Path = DEFAULT_SOCKET_PATH, timeout: Optional[float] = None) -> Dict:
+    """Send one JSON request to the broker and return its JSON response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("Broker closed the connection")
+    return json.loads(line)
+
+
+def ensure_broker(socket_path: Path = DEFAULT_SOCKET_PATH) -> bool:
+    """
+    Make sure a broker is listening, starting one in the background if needed.
+
+    Returns:
+        True if the broker can be used, False if the caller should use the Snowflake CLI
+    """
+    if os.environ.get(DISABLE_ENV) == "1" or not hasattr(socket, "AF_UNIX"):
+        return False
+    try:
+        return request({"op": "ping"}, socket_path, timeout=2).get("ok", False)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        import snowflake.connector  # noqa: F401  (the broker needs it; fall back without it)
+    except ImportError:
+        return False
+
+    socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    with open(socket_path.parent / LOG_PATH.name, "a") as log:
+        process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--socket", str(socket_path), "serve"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True
+        )
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline and process.poll() is None:
+        try:
+            if request({"op": "ping"}, socket_path, timeout=2).get("ok"):
+                return True
+        except (OSError, ValueError):
+            time.sleep(0.1)
+    return False
+
+
+def execute(
+    connection_name: str,
+    sql: Union[str, List[str]],
+    socket_path: Path = DEFAULT_SOCKET_PATH
+) -> Optional[List[List[Dict]]]:
+    """
+    Execute one or more statements through the broker.
+
+    Args:
+        connection_name: Snowflake CLI connection name
+        sql: Statements to execute, separated by semicolons (Snowflake Scripting blocks allowed),
+            or a list of such scripts to run in order on one session
+
+    Returns:
+        Rows of each statement (dicts keyed by column name), or None if the broker is not
+        available and the caller should fall back to the Snowflake CLI
+
+    Raises:
+        BrokerError: If a statement failed in Snowflake, or the broker failed after the
+            statements were sent (they may have run, so they must not be re-run blindly)
+    """
+    if not ensure_broker(socket_path):
+        return None
+
+    message = json.dumps({"op": "execute", "connection": connection_name, "sql": sql}) + "\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return None
+        try:
+            sock.sendall(message.encode("utf-8"))
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+            if not line:
+                raise ConnectionError("Broker closed the connection")
+            response = json.loads(line)
+        except (OSError, ValueError) as e:
+            raise BrokerError(f"Lost the session broker after sending the statements: {e}") from e
+
+    if response.get("connect_failed"):
+        return None
+    stats = response.get("stats")
+    if stats:
+        CLIENT_STATS["requests"] += 1
+        CLIENT_STATS["sessions_reused"] += int(stats["session_reused"])
+        CLIENT_STATS["saved_ms"] += stats["saved_ms"]
+    if not response.get("ok"):
+        raise BrokerError(response.get("error", "Unknown broker error"))
+    return response["results"]
+
+
+def format_results(results: List[List[Dict]]) -> str:
+    """Render statement results as text for the tools' console output."""
+    lines = []
+    for rows in results:
+        if len(rows) == 1 and len(rows[0]) == 1:
+            lines.append(str(next(iter(rows[0].values()))))
+        else:
+            lines.append(f"{len(rows)} row(s)")
+            lines.extend(f"  {json.dumps(row, default=json_value)}" for row in rows[:5])
+    return "\n".join(lines)
+
+
+def print_savings():
+    """Print what routing this step's calls through the broker saved, if it was used."""
+    if not CLIENT_STATS["requests"]:
+        return
+    print(f"\n{'='*60}")
+    print("Session Broker:")
+    print(f"  Calls through broker:       {CLIENT_STATS['requests']}")
+    print(f"  Warm sessions reused:       {CLIENT_STATS['sessions_reused']}")
+    print(f"  Process start + auth saved: ~{CLIENT_STATS['saved_ms'] / 1000:.1f}s")
+    print(f"{'='*60}")
+
+
+def main():
+    """
+    Main entry point for command-line execution.
+
+    Usage:
+        python snowbroker.py serve [--idle-timeout SECONDS]
+        python snowbroker.py exec <connection_name> (-q SQL | -f FILE ...)
+        python snowbroker.py stats | stop
+    """
+    parser = argparse.ArgumentParser(description="Persistent local Snowflake session broker for the pyutil tools")
+    parser.add_argument("--socket", default=str(DEFAULT_SOCKET_PATH),
+                        help=f"Broker Unix socket (default: {DEFAULT_SOCKET_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Run the broker in the foreground")
+    serve_parser.add_argument("--idle-timeout", type=int, default=DEFAULT_IDLE_TIMEOUT_SECONDS,
+                              help=f"Exit after this many idle seconds (default: {DEFAULT_IDLE_TIMEOUT_SECONDS})")
+
+    exec_parser = subparsers.add_parser("exec", help="Execute SQL through the broker (Snowflake CLI fallback)")
+    exec_parser.add_argument("connection_name", help="Snowflake CLI connection name")
+    exec_group = exec_parser.add_mutually_exclusive_group(required=True)
+    exec_group.add_argument("-q", "--query", help="SQL to execute")
+    exec_group.add_argument("-f", "--filename", action="append", help="SQL file to execute (repeatable)")
+
+    subparsers.add_parser("stats", help="Print the running broker's statistics")
+    subparsers.add_parser("stop", help="Stop the running broker")
+
+    args = parser.parse_args()
+    socket_path = Path(args.socket)
+
+    if args.command == "serve":
+        serve(socket_path, args.idle_timeout)
+        sys.exit(0)
+
+    if args.command in ("stats", "stop"):
+        try:
+            response = request({"op": args.command if args.command == "stats" else "shutdown"}, socket_path, timeout=5)
+        except (OSError, ValueError):
+            print("No broker is running")
+            sys.exit(0)
+        print(json.dumps(response["stats"], indent=2) if "stats" in response else "Session broker stopped")
+        sys.exit(0)
+
+    sql = args.query if args.query else [Path(f).read_text(encoding="utf-8") for f in args.filename]
+    try:
+        results = execute(args.connection_name, sql, socket_path)
+        if results is None:
+            cmd = ['snow', 'sql', '-c', args.connection_name]
+            cmd += ['-q', args.query] if args.query else [a for f in args.filename for a in ('-f', f)]
+            sys.exit(subprocess.run(cmd).returncode)
+        print(format_results(results))
+        print_savings()
+        sys.exit(0)
+    except BrokerError as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+snowcliload - bulk loader for the claims reference tables
+Loads CLAIMS, CLAIM_LINES, FINANCIAL_TRANSACTIONS, INVOICES and AUTHORIZATION from
+CSV or Parquet files (one file or a directory of part files per table) using the
+Snowflake CLI: CSV parts are gzipped in parallel, PUT to the REFERENCE_DATA stage and
+loaded with COPY INTO, either truncate-and-load or merged by each table's key.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = "INS_CO.LOSS_CLAIMS"
+LOAD_STAGE = "@INS_CO.LOSS_CLAIMS.REFERENCE_DATA"
+FILE_FORMATS = {
+    "csv": "INS_CO.LOSS_CLAIMS.REFERENCE_CSV_FORMAT",
+    "parquet": "INS_CO.LOSS_CLAIMS.REFERENCE_PARQUET_FORMAT",
+}
+
+# Table name -> merge key and columns (as declared in sql/batch-1/001-table_ddl.sql)
+TABLES = {
+    "AUTHORIZATION": {
+        "key": ["PERFORMER_ID"],
+        "columns": ["PERFORMER_ID", "FROM_AMT", "TO_AMT", "CURRENCY"],
+    },
+    "CLAIMS": {
+        "key": ["CLAIM_NO"],
+        "columns": ["CLAIM_NO", "LINE_OF_BUSINESS", "CLAIM_STATUS", "CAUSE_OF_LOSS", "CREATED_DATE",
+                    "LOSS_DATE", "REPORTED_DATE", "CLAIMANT_ID", "PERFORMER", "POLICY_NO",
+                    "FNOL_COMPLETION_DATE", "LOSS_DESCRIPTION", "LOSS_STATE", "LOSS_ZIP_CODE"],
+    },
+    "CLAIM_LINES": {
+        "key": ["LINE_NO"],
+        "columns": ["CLAIM_NO", "LINE_NO", "LOSS_DESCRIPTION", "CLAIM_STATUS", "CREATED_DATE",
+                    "REPORTED_DATE", "CLAIMANT_ID", "PERFORMER_ID"],
+    },
+    "FINANCIAL_TRANSACTIONS": {
+        "key": ["FXID"],
+        "columns": ["FXID", "LINE_NO", "FINANCIAL_TYPE", "CURRENCY", "FIN_TX_AMT", "FIN_TX_POST_DT"],
+    },
+    "INVOICES": {
+        "key": ["INV_ID", "INV_LINE_NBR"],
+        "columns": ["INV_ID", "INV_LINE_NBR", "LINE_NO", "DESCRIPTION", "CURRENCY", "INVOICE_AMOUNT",
+                    "INVOICE_DATE", "VENDOR"],
+    },
+}
+
+PART_SUFFIXES = {
+    ".csv": "csv",
+    ".csv.gz": "csv",
+    ".parquet": "parquet",
+}
+
+
+def file_suffix(file_path: Path) -> Optional[str]:
+    """Return the recognized part suffix of a file (.csv, .csv.gz or .parquet), or None."""
+    name = file_path.name.lower()
+    for suffix in sorted(PART_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return suffix
+    return None
+
+
+def find_table_inputs(data_dir: Path) -> Dict[str, Tuple[str, List[Path], bool]]:
+    """
+    Find the input files for each reference table in a data directory.
+
+    A table is read from `<table>.csv`, `<table>.csv.gz`, `<table>.parquet`, or a
+    `<table>/` directory of part files in one of those formats.
+
+    Args:
+        data_dir: Directory containing the per-table inputs
+
+    Returns:
+        Dict of table name -> (format, files, is_directory)
+    """
+    if not data_dir.is_dir():
+        raise NotADirectoryError(f"Path is not a directory: {data_dir}")
+
+    inputs = {}
+    for entry in sorted(data_dir.iterdir()):
+        if entry.is_dir():
+            table = entry.name.upper()
+            files = sorted(f for f in entry.iterdir() if f.is_file() and file_suffix(f))
+            is_directory = True
+        else:
+            suffix = file_suffix(entry)
+            if not suffix:
+                continue
+            table = entry.name[:-len(suffix)].upper()
+            files = [entry]
+            is_directory = False
+
+        if table not in TABLES or not files:
+            continue
+        if table in inputs:
+            raise ValueError(f"More than one input found for {table} in {data_dir}")
+
+        formats = {PART_SUFFIXES[file_suffix(f)] for f in files}
+        if len(formats) > 1:
+            raise ValueError(f"Mixed CSV and Parquet parts for {table}: {entry}")
+        inputs[table] = (formats.pop(), files, is_directory)
+
+    return inputs
+
+
+def read_csv_header(file_path: Path) -> List[str]:
+    """Read the header row of a (optionally gzipped) CSV part."""
+    opener = gzip.open if file_path.name.lower().endswith(".gz") else open
+    with opener(file_path, "rt", encoding="utf-8") as f:
+        return [column.strip().strip('"').upper() for column in f.readline().rstrip("\r\n").split(",")]
+
+
+def validate_csv_headers(table: str, files: List[Path]):
+    """Fail early if a CSV part has columns the target table does not have."""
+    allowed = set(TABLES[table]["columns"])
+    for file_path in files:
+        unknown = [column for column in read_csv_header(file_path) if column not in allowed]
+        if unknown:
+            raise ValueError(f"{file_path.name}: columns not in {table}: {', '.join(unknown)}")
+
+
+def gzip_file(source: Path, target: Path) -> Path:
+    """Gzip a single file."""
+    with open(source, "rb") as src, gzip.open(target, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, length=1024 * 1024)
+    return target
+
+
+def compress_parts(files: List[Path], output_dir: Path, workers: int) -> List[Path]:
+    """
+    Gzip uncompressed CSV parts in parallel into output_dir.
+
+    Args:
+        files: CSV part files (plain or already gzipped)
+        output_dir: Directory for the compressed parts
+        workers: Number of parallel compression threads
+
+    Returns:
+        Paths of the compressed parts
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    to_compress = []
+    for index, source in enumerate(files):
+        target = output_dir / f"part_{index:05d}.csv.gz"
+        if source.name.lower().endswith(".gz"):
+            shutil.copyfile(source, target)
+        else:
+            to_compress.append((source, target))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda job: gzip_file(*job), to_compress))
+
+    return sorted(output_dir.glob("*.csv.gz"))
+
+
+def build_load_sql(table: str, put_sources: List[str], stage_path: str, file_format: str,
+                   mode: str, parallel: int) -> str:
+    """
+    Build the PUT + COPY (+ MERGE) script for one table.
+
+    Args:
+        table: Target table name
+        put_sources: Local file paths or globs to PUT
+        stage_path: Stage folder the parts are uploaded to
+        file_format: 'csv' or 'parquet'
+        mode: 'truncate' or 'merge'
+        parallel: PUT upload threads
+
+    Returns:
+        SQL script executed in a single Snowflake CLI session
+    """
+    target = f"{SCHEMA}.{table}"
+    statements = [
+        f"PUT 'file://{source}' {stage_path} PARALLEL={parallel} AUTO_COMPRESS=FALSE OVERWRITE=TRUE"
+        for source in put_sources
+    ]
+    copy_options = (
+        f"FROM {stage_path}\n"
+        f"  FILE_FORMAT = (FORMAT_NAME = '{FILE_FORMATS[file_format]}')\n"
+        f"  MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE\n"
+        f"  ON_ERROR = ABORT_STATEMENT\n"
+        f"  PURGE = TRUE"
+    )
+
+    if mode == "truncate":
+        statements.append(f"TRUNCATE TABLE IF EXISTS {target}")
+        statements.append(f"COPY INTO {target}\n  {copy_options}")
+    else:
+        key = TABLES[table]["key"]
+        columns = TABLES[table]["columns"]
+        load_table = f"{target}_LOAD"
+        on_clause = " AND ".join(f"t.{column} = s.{column}" for column in key)
+        update_clause = ", ".join(f"t.{column} = s.{column}" for column in columns if column not in key)
+        statements.append(f"CREATE OR REPLACE TEMPORARY TABLE {load_table} LIKE {target}")
+        statements.append(f"COPY INTO {load_table}\n  {copy_options}")
+        statements.append(
+            f"MERGE INTO {target} t\n"
+            f"USING (SELECT * FROM {load_table}\n"
+            f"       QUALIFY ROW_NUMBER() OVER (PARTITION BY {', '.join(key)} ORDER BY {', '.join(key)}) = 1) s\n"
+            f"ON {on_clause}\n"
+            f"WHEN MATCHED THEN UPDATE SET {update_clause}\n"
+            f"WHEN NOT MATCHED THEN INSERT ({', '.join(columns)})\n"
+            f"  VALUES ({', '.join(f's.{column}' for column in columns)})"
+        )
+
+    return ";\n".join(statements) + ";"
+
+
+def collect_counts(result) -> Dict[str, int]:
+    """Sum the row counts reported by COPY and MERGE anywhere in the CLI's JSON output."""
+    counts = {"rows_loaded": 0, "rows_inserted": 0, "rows_updated": 0}
+    if isinstance(result, list):
+        for item in result:
+            for name, value in collect_counts(item).items():
+                counts[name] += value
+    elif isinstance(result, dict):
+        for name, value in result.items():
+            name = name.lower()
+            if name == "rows_loaded":
+                counts["rows_loaded"] += int(value or 0)
+            elif name == "number of rows inserted":
+                counts["rows_inserted"] += int(value or 0)
+            elif name == "number of rows updated":
+                counts["rows_updated"] += int(value or 0)
+    return counts
+
+
+def load_table(connection_name: str, table: str, file_format: str, files: List[Path], is_directory: bool,
+               mode: str, run_id: str, work_dir: Path, workers: int, parallel: int,
+               verbose: bool = True) -> Dict:
+    """
+    Compress, upload and COPY one table's input files.
+
+    Returns:
+        Dict with table, files, rows and elapsed seconds
+    """
+    started = time.perf_counter()
+    stage_path = f"{LOAD_STAGE}/{run_id}/{table.lower()}/"
+
+    if file_format == "csv":
+        validate_csv_headers(table, files)
+        parts = compress_parts(files, work_dir / table.lower(), workers)
+        put_sources = [str((work_dir / table.lower()).absolute() / "*.csv.gz")]
+    elif is_directory:
+        parts = files
+        put_sources = [str(files[0].parent.absolute() / "*.parquet")]
+    else:
+        parts = files
+        put_sources = [str(f.absolute()) for f in files]
+
+    script = build_load_sql(table, put_sources, stage_path, file_format, mode, parallel)
+    cmd = ['snow', 'sql', '-c', connection_name, '-q', script, '--format', 'JSON']
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    counts = collect_counts(json.loads(result.stdout) if result.stdout.strip() else [])
+    elapsed = time.perf_counter() - started
+
+    if verbose:
+        rate = counts["rows_loaded"] / elapsed if elapsed else 0.0
+        print(f"  {table:<24}{len(parts):>6} part(s){counts['rows_loaded']:>14,} rows"
+              f"{elapsed:>9.1f}s{rate:>14,.0f} rows/s")
+
+    return {"table": table, "files": len(parts), "seconds": elapsed, **counts}
+
+
+def load_reference_data(connection_name: str, data_dir: Path, mode: str = "truncate",
+                        tables: Optional[List[str]] = None, workers: int = 0, parallel: int = 8,
+                        verbose: bool = True) -> List[Dict]:
+    """
+    Load every reference table found in a data directory.
+
+    Args:
+        connection_name: Snowflake CLI connection name
+        data_dir: Directory containing the per-table inputs
+        mode: 'truncate' (truncate and load) or 'merge' (upsert by table key)
+        tables: Only load these tables (default: all found)
+        workers: Parallel compression threads (default: CPU count)
+        parallel: PUT upload threads per statement
+        verbose: Print per-table results
+
+    Returns:
+        List of per-table result dicts
+    """
+    inputs = find_table_inputs(data_dir)
+    if tables:
+        missing = [table for table in tables if table not in inputs]
+        if missing:
+            raise FileNotFoundError(f"No input found for: {', '.join(missing)}")
+        inputs = {table: inputs[table] for table in tables}
+
+    if not inputs:
+        print(f"Warning: No reference table inputs found in {data_dir}")
+        return []
+
+    run_id = f"{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    workers = workers or os.cpu_count() or 4
+
+    if verbose:
+        print(f"\n{'='*60}")
+        print(f"Loading {len(inputs)} table(s) from: {data_dir}")
+        print(f"Connection: {connection_name}")
+        print(f"Mode: {mode}")
+        print(f"{'='*60}\n")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="snowcliload_") as tmp_dir:
+        for table in [name for name in TABLES if name in inputs]:
+            file_format, files, is_directory = inputs[table]
+            results.append(load_table(connection_name, table, file_format, files, is_directory,
+                                      mode, run_id, Path(tmp_dir), workers, parallel, verbose))
+    return results
+
+
+def main():
+    """
+    Main entry point for command-line execution.
+
+    Usage:
+        python snowcliload.py <data_dir> <connection_name> [--mode truncate|merge] [--table NAME ...]
+
+    Example:
+        python snowcliload.py data/reference my_connection
+        python snowcliload.py /data/synthetic my_connection --mode merge --table CLAIMS --table CLAIM_LINES
+    """
+    parser = argparse.ArgumentParser(
+        description="Bulk-load claims reference tables from CSV/Parquet with PUT and COPY INTO"
+    )
+    parser.add_argument("data_dir", help="Directory with <table>.csv|.csv.gz|.parquet files or <table>/ part directories")
+    parser.add_argument("connection_name", help="Snowflake CLI connection name")
+    parser.add_argument("--mode", choices=["truncate", "merge"], default="truncate",
+                        help="truncate: replace table contents; merge: upsert by table key (default: truncate)")
+    parser.add_argument("--table", dest="tables", action="append", type=str.upper, choices=list(TABLES),
+                        help="Only load this table (repeatable)")
+    parser.add_argument("--workers", type=int, default=0, help="Parallel compression threads (default: CPU count)")
+    parser.add_argument("--parallel", type=int, default=8, help="PUT upload threads (default: 8)")
+
+    args = parser.parse_args()
+
+    try:
+        started = time.perf_counter()
+        results = load_reference_data(args.connection_name, Path(args.data_dir), args.mode,
+                                      args.tables, args.workers, args.parallel)
+        elapsed = time.perf_counter() - started
+
+        if not results:
+            sys.exit(0)
+
+        total_rows = sum(result["rows_loaded"] for result in results)
+        print(f"\n{'='*60}")
+        print("Load Summary:")
+        print(f"  Tables:   {len(results)}")
+        print(f"  Rows:     {total_rows:,}")
+        if args.mode == "merge":
+            print(f"  Inserted: {sum(result['rows_inserted'] for result in results):,}")
+            print(f"  Updated:  {sum(result['rows_updated'] for result in results):,}")
+        print(f"  Elapsed:  {elapsed:.1f}s")
+        print(f"  Rows/sec: {total_rows / elapsed if elapsed else 0.0:,.0f}")
+        print(f"{'='*60}")
+        sys.exit(0)
+
+    except subprocess.CalledProcessError as e:
+        print(f"\nERROR: Load failed with code {e.returncode}", file=sys.stderr)
+        if e.stderr:
+            print(f"\nSTDERR:\n{e.stderr}", file=sys.stderr)
+        sys.exit(1)
+    except (FileNotFoundError, NotADirectoryError, ValueError) as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nERROR: Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
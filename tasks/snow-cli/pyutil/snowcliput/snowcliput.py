@@ -3,13 +3,39 @@
 upload_to_snowflake.py - Upload files to Snowflake internal stage using PUT command
 
 Uploads all files from the snow-cli/upload directory to a Snowflake internal stage
-using the Snowflake CLI and PUT command.
+using the Snowflake CLI and PUT command. With --normalize-images, evidence images are
+first downscaled, re-encoded and stripped of metadata in a process pool, and the
+originals are archived to a separate stage prefix.
 """
 
+import argparse
 import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "snowbroker"))
+import snowbroker  # noqa: E402
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # Pillow is only needed for --normalize-images
+    Image = None
+
+# Longest edge the multimodal model works with; larger images are downscaled by the service anyway
+DEFAULT_MAX_DIMENSION = 1568
+DEFAULT_JPEG_QUALITY = 85
+DEFAULT_ARCHIVE_LOCATION = "@INS_CO.LOSS_CLAIMS.EVIDENCE_ORIGINALS/originals"
+
+# Re-encoded format per extension; GIFs are left alone so animations survive
+NORMALIZED_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG", ".webp": "WEBP"}
+
+# Colour profiles up to this size (e.g. sRGB) are kept; everything else (EXIF with its
+# embedded thumbnail, XMP, oversized profiles) is dropped
+MAX_ICC_PROFILE_BYTES = 4096
 
 
 def get_upload_files(upload_dir: Path) -> List[Path]:
@@ -77,6 +103,17 @@ def upload_file_to_stage(
     if verbose:
         print(f"  Uploading: {file_path.name}...", end=' ', flush=True)
     
+    # Prefer a warm session of the local session broker over a new CLI process per file;
+    # if the broker is unavailable or the PUT fails there, retry it with the Snowflake CLI
+    try:
+        results = snowbroker.execute(connection_name, put_query)
+        if results is not None:
+            if verbose:
+                print("✓")
+            return True, snowbroker.format_results(results)
+    except snowbroker.BrokerError:
+        pass
+    
     try:
         result = subprocess.run(
             cmd,
@@ -101,13 +138,114 @@ def upload_file_to_stage(
         return False, error_msg
 
 
+def normalize_image(
+    file_path: str,
+    output_dir: str,
+    max_dimension: int,
+    jpeg_quality: int
+) -> Dict:
+    """
+    Downscale, re-encode and strip one image for upload.
+    
+    The image is re-encoded in the format its extension names (so a PNG saved as .jpeg
+    becomes a real JPEG), with EXIF orientation applied before the metadata is dropped.
+    The result is only used if it was resized or is smaller than the original.
+    
+    Args:
+        file_path: Path to the original image
+        output_dir: Directory to write the normalized image to, under the same name
+        max_dimension: Longest edge in pixels after downscaling
+        jpeg_quality: JPEG/WebP quality
+        
+    Returns:
+        Dict with name, original_bytes, normalized_bytes, resized, and normalized_path
+        (None if the original is uploaded unchanged)
+    """
+    source = Path(file_path)
+    original_bytes = source.stat().st_size
+    result = {"name": source.name, "original_bytes": original_bytes, "normalized_bytes": original_bytes,
+              "resized": False, "normalized_path": None}
+    fmt = NORMALIZED_FORMATS.get(source.suffix.lower())
+    if fmt is None:
+        return result
+    
+    try:
+        with Image.open(source) as img:
+            icc_profile = img.info.get("icc_profile")
+            normalized = ImageOps.exif_transpose(img)
+            if max(normalized.size) > max_dimension:
+                normalized.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+                result["resized"] = True
+            
+            # Pillow's writers fall back to normalized.info["icc_profile"], so drop it explicitly
+            save_options = {"optimize": True, "icc_profile": None}
+            if icc_profile and len(icc_profile) <= MAX_ICC_PROFILE_BYTES:
+                save_options["icc_profile"] = icc_profile
+            if fmt == "JPEG":
+                if normalized.mode in ("RGBA", "LA", "P"):
+                    # JPEG has no alpha; flatten onto white as the image viewers do
+                    rgba = normalized.convert("RGBA")
+                    normalized = Image.new("RGB", rgba.size, (255, 255, 255))
+                    normalized.paste(rgba, mask=rgba.getchannel("A"))
+                elif normalized.mode != "RGB" and normalized.mode != "L":
+                    normalized = normalized.convert("RGB")
+                save_options.update(quality=jpeg_quality, progressive=True)
+            elif fmt == "WEBP":
+                save_options.update(quality=jpeg_quality)
+            
+            output_path = Path(output_dir) / source.name
+            normalized.save(output_path, fmt, **save_options)
+    except (UnidentifiedImageError, OSError):
+        return result
+    
+    normalized_bytes = output_path.stat().st_size
+    if not result["resized"] and normalized_bytes >= original_bytes:
+        output_path.unlink()
+        return result
+    
+    result.update(normalized_bytes=normalized_bytes, normalized_path=str(output_path))
+    return result
+
+
+def normalize_images(
+    files: List[Path],
+    output_dir: Path,
+    max_dimension: int = DEFAULT_MAX_DIMENSION,
+    jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+    workers: Optional[int] = None
+) -> List[Dict]:
+    """
+    Normalize all images in a file list in a process pool.
+    
+    Args:
+        files: Files to upload; files that are not images are passed through
+        output_dir: Directory for the normalized images
+        max_dimension: Longest edge in pixels after downscaling
+        jpeg_quality: JPEG/WebP quality
+        workers: Worker processes (default: CPU count)
+        
+    Returns:
+        One normalize_image result per file, in the same order
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required for --normalize-images (pip install pillow)")
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(normalize_image, str(f), str(output_dir), max_dimension, jpeg_quality)
+            for f in files
+        ]
+        return [future.result() for future in futures]
+
+
 def upload_directory_to_stage(
     connection_name: str,
     upload_dir: Path,
     stage_name: str,
     auto_compress: bool = True,
     overwrite: bool = True,
-    verbose: bool = True
+    verbose: bool = True,
+    files: Optional[List[Path]] = None
 ) -> Tuple[int, int, List[str]]:
     """
     Upload all files from a directory to Snowflake internal stage.
@@ -119,11 +257,13 @@ def upload_directory_to_stage(
         auto_compress: Auto-compress files during upload
         overwrite: Overwrite existing files
         verbose: Print execution details
+        files: Files to upload instead of the directory contents (e.g. normalized copies)
         
     Returns:
         Tuple of (successful_count, failed_count, error_messages)
     """
-    files = get_upload_files(upload_dir)
+    if files is None:
+        files = get_upload_files(upload_dir)
     
     if not files:
         return 0, 0, []
@@ -165,56 +305,116 @@ def upload_directory_to_stage(
     return successful, failed, error_messages
 
 
+def print_normalization_summary(results: List[Dict], upload_bytes: int, upload_seconds: float):
+    """
+    Print the bytes saved by image normalization and the upload time they are worth.
+    
+    The time saved is estimated from the throughput measured for this upload.
+    """
+    normalized = [r for r in results if r["normalized_path"]]
+    original_bytes = sum(r["original_bytes"] for r in normalized)
+    saved_bytes = sum(r["original_bytes"] - r["normalized_bytes"] for r in normalized)
+    throughput = upload_bytes / upload_seconds if upload_seconds > 0 else 0
+    
+    print(f"\n{'='*60}")
+    print(f"Image Normalization Summary:")
+    print(f"  Images normalized: {len(normalized)} ({sum(r['resized'] for r in normalized)} downscaled)")
+    if original_bytes:
+        print(f"  Bytes:             {original_bytes:,} -> {original_bytes - saved_bytes:,} "
+              f"({saved_bytes:,} saved, {saved_bytes / original_bytes:.0%})")
+    if throughput and saved_bytes:
+        print(f"  Upload time saved: ~{saved_bytes / throughput:.1f}s "
+              f"(at the measured {throughput / 1024:.0f} KB/s)")
+    print(f"{'='*60}")
+
+
 def main():
     """
     Main entry point for command-line execution.
     
     Usage:
-        python snowcliput.py <directory> <connection_name> <stage_name>
+        python snowcliput.py <directory> <connection_name> <stage_name> [--normalize-images]
     
     Example:
         python snowcliput.py ./tasks/snow-cli/upload my_connection loss_evidence
-        python snowcliput.py ./data my_connection @loss_evidence
+        python snowcliput.py ./data my_connection @loss_evidence --normalize-images
     """
-    if len(sys.argv) < 4:
-        print("Usage: python snowcliput.py <directory> <connection_name> <stage_name>")
-        print("\nArguments:")
-        print("  directory         : Path to directory containing files to upload")
-        print("  connection_name   : Snowflake CLI connection name")
-        print("  stage_name        : Snowflake internal stage name (with or without @ prefix)")
-        print("\nExample:")
-        print("  python snowcliput.py ./tasks/snow-cli/upload my_connection loss_evidence")
-        print("  python snowcliput.py ./data demo_connection @loss_evidence")
-        sys.exit(1)
-    
-    directory = sys.argv[1]
-    connection_name = sys.argv[2]
-    stage_name = sys.argv[3]
+    parser = argparse.ArgumentParser(
+        description="Upload all files in a directory to a Snowflake internal stage with PUT"
+    )
+    parser.add_argument("directory", help="Path to directory containing files to upload")
+    parser.add_argument("connection_name", help="Snowflake CLI connection name")
+    parser.add_argument("stage_name", help="Snowflake internal stage name (with or without @ prefix)")
+    parser.add_argument("--normalize-images", dest="normalize_images", action="store_true",
+                        help="Downscale, re-encode and strip metadata from images before upload")
+    parser.add_argument("--max-dimension", type=int, default=DEFAULT_MAX_DIMENSION,
+                        help=f"Longest image edge in pixels (default: {DEFAULT_MAX_DIMENSION})")
+    parser.add_argument("--jpeg-quality", type=int, default=DEFAULT_JPEG_QUALITY,
+                        help=f"JPEG/WebP quality (default: {DEFAULT_JPEG_QUALITY})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Image normalization processes (default: CPU count)")
+    parser.add_argument("--archive-location", default=DEFAULT_ARCHIVE_LOCATION,
+                        help=f"Stage path the originals of normalized images are archived to "
+                             f"(default: {DEFAULT_ARCHIVE_LOCATION})")
+    parser.add_argument("--no-archive", dest="no_archive", action="store_true",
+                        help="Do not archive the originals of normalized images")
     
-    # Convert directory string to Path
-    upload_dir = Path(directory)
+    args = parser.parse_args()
+    upload_dir = Path(args.directory)
     
     # Validate inputs
-    if not connection_name or not connection_name.strip():
+    if not args.connection_name.strip():
         print("Error: Connection name cannot be empty", file=sys.stderr)
         sys.exit(1)
     
-    if not stage_name or not stage_name.strip():
+    if not args.stage_name.strip():
         print("Error: Stage name cannot be empty", file=sys.stderr)
         sys.exit(1)
     
     try:
         # Print directory being scanned (like snowclisp does)
-        print(f"Scanning directory: {directory}")
-        
-        successful, failed, error_messages = upload_directory_to_stage(
-            connection_name=connection_name,
-            upload_dir=upload_dir,
-            stage_name=stage_name,
-            auto_compress=False,
-            overwrite=True,
-            verbose=True
-        )
+        print(f"Scanning directory: {args.directory}")
+        
+        with tempfile.TemporaryDirectory(prefix="snowcliput_") as tmp_dir:
+            files = get_upload_files(upload_dir)
+            results = []
+            if args.normalize_images and files:
+                print(f"Normalizing images (max {args.max_dimension}px, quality {args.jpeg_quality})...")
+                results = normalize_images(files, Path(tmp_dir), args.max_dimension,
+                                           args.jpeg_quality, args.workers)
+                files = [Path(r["normalized_path"] or f) for r, f in zip(results, files)]
+            
+            started = time.perf_counter()
+            successful, failed, error_messages = upload_directory_to_stage(
+                connection_name=args.connection_name,
+                upload_dir=upload_dir,
+                stage_name=args.stage_name,
+                auto_compress=False,
+                overwrite=True,
+                verbose=True,
+                files=files
+            )
+            upload_seconds = time.perf_counter() - started
+            
+            originals = [upload_dir / r["name"] for r in results if r["normalized_path"]]
+            if originals and not args.no_archive:
+                print(f"\nArchiving {len(originals)} original image(s) to {args.archive_location}...")
+                _, archive_failed, archive_errors = upload_directory_to_stage(
+                    connection_name=args.connection_name,
+                    upload_dir=upload_dir,
+                    stage_name=args.archive_location,
+                    auto_compress=False,
+                    overwrite=True,
+                    verbose=False,
+                    files=originals
+                )
+                failed += archive_failed
+                error_messages.extend(archive_errors)
+            
+            if results:
+                print_normalization_summary(results, sum(f.stat().st_size for f in files), upload_seconds)
+        
+        snowbroker.print_savings()
         
         if failed > 0:
             print(f"\n⚠️  {failed} file(s) failed to upload:", file=sys.stderr)
@@ -226,7 +426,7 @@ def main():
             print("\n⚠️  No files were uploaded.")
             sys.exit(0)
         
-        print(f"\n✓ Successfully uploaded {successful} file(s) to {stage_name}")
+        print(f"\n✓ Successfully uploaded {successful} file(s) to {args.stage_name}")
         sys.exit(0)
         
     except FileNotFoundError as e:
@@ -235,9 +435,12 @@ def main():
     except NotADirectoryError as e:
         print(f"\nERROR: {e}", file=sys.stderr)
         sys.exit(1)
+    except RuntimeError as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
     except Exception as e:
         print(f"\nERROR: Unexpected error: {e}", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -9,7 +9,10 @@ import re
 import subprocess
 import sys
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "snowbroker"))
+import snowbroker  # noqa: E402
 
 
 def extract_numeric_prefix(filename: str) -> int:
@@ -71,6 +74,47 @@ def get_sorted_sql_files(directory: str, pattern: str = r'^\d+-.*\.sql$') -> Tup
     return [path for _, path in matching_files], non_matching_files
 
 
+def execute_sql_files_with_broker(
+    connection_name: str,
+    sql_files: List[Path],
+    verbose: bool = True
+) -> Optional[bool]:
+    """
+    Execute SQL files on one warm session of the local session broker (pyutil/snowbroker).
+    
+    All files are sent as a single request, so USE statements in one file apply to the
+    files after it, as in a single `snow sql -f ... -f ...` run.
+    
+    Args:
+        connection_name: Snowflake CLI connection name
+        sql_files: List of SQL file paths to execute (in order)
+        verbose: Print execution details
+        
+    Returns:
+        True if all files executed successfully, False otherwise, None if the broker
+        is not available and the Snowflake CLI should be used
+    """
+    scripts = [sql_file.read_text(encoding="utf-8") for sql_file in sql_files]
+    
+    try:
+        results = snowbroker.execute(connection_name, scripts)
+    except snowbroker.BrokerError as e:
+        print(f"\n{'='*60}\n✗ Failed to execute SQL files\n{'='*60}", file=sys.stderr)
+        print(str(e), file=sys.stderr)
+        return False
+    
+    if results is None:
+        return None
+    
+    if verbose:
+        print(f"\n{'='*60}")
+        print(f"✓ Successfully executed all {len(sql_files)} SQL file(s) "
+              f"({len(results)} statement(s)) through the session broker")
+        print(f"{'='*60}")
+    
+    return True
+
+
 def execute_sql_files_with_snowflake_cli(
     connection_name: str,
     sql_files: List[Path],
@@ -206,13 +250,16 @@ def main():
             else:
                 print(f"  {i}. [---] {sql_file.name}")
         
-        # Execute all files in one command
+        # Execute all files on a warm broker session, or in one Snowflake CLI command
         print(f"\nUsing Snowflake connection: {connection_name}")
-        success = execute_sql_files_with_snowflake_cli(
-            connection_name,
-            sql_files,
-            verbose=True
-        )
+        success = execute_sql_files_with_broker(connection_name, sql_files, verbose=True)
+        if success is None:
+            success = execute_sql_files_with_snowflake_cli(
+                connection_name,
+                sql_files,
+                verbose=True
+            )
+        snowbroker.print_savings()
         
         sys.exit(0 if success else 1)
         
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+synthclaims - synthetic claims data generator for scale testing
+Generates N referentially consistent claims with fan-out into CLAIM_LINES,
+FINANCIAL_TRANSACTIONS (one RSV and one PAY per line), INVOICES and AUTHORIZATION,
+honoring the relationships declared in the CA_INS_CO semantic view:
+
+    CLAIM_LINES(CLAIM_NO)     -> CLAIMS(CLAIM_NO)
+    CLAIM_LINES(PERFORMER_ID) -> AUTHORIZATION(PERFORMER_ID)
+    CLAIM_LINES(LINE_NO)      -> FINANCIAL_TRANSACTIONS(LINE_NO)
+    INVOICES(LINE_NO)         -> CLAIM_LINES(LINE_NO)
+
+Claims are generated in fixed-size chunks with NumPy and written as one part file per
+table per chunk, so memory stays constant regardless of N. The output directory is laid
+out for pyutil/snowcliload (<table>/part_NNNNN.csv|.parquet). A controllable share of
+claim lines carries audit violations (late payment, payment over performer authority),
+as does a share of claims (total payment over total reserve); the injected violations
+are written to audit_truth/ for checking audit rules against.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional; CSV output only needs pandas
+    pa = None
+    pq = None
+
+# Column order per table, matching sql/batch-1/001-table_ddl.sql and pyutil/snowcliload
+TABLE_COLUMNS = {
+    "authorization": ["PERFORMER_ID", "FROM_AMT", "TO_AMT", "CURRENCY"],
+    "claims": ["CLAIM_NO", "LINE_OF_BUSINESS", "CLAIM_STATUS", "CAUSE_OF_LOSS", "CREATED_DATE", "LOSS_DATE",
+               "REPORTED_DATE", "CLAIMANT_ID", "PERFORMER", "POLICY_NO", "FNOL_COMPLETION_DATE",
+               "LOSS_DESCRIPTION", "LOSS_STATE", "LOSS_ZIP_CODE"],
+    "claim_lines": ["CLAIM_NO", "LINE_NO", "LOSS_DESCRIPTION", "CLAIM_STATUS", "CREATED_DATE", "REPORTED_DATE",
+                    "CLAIMANT_ID", "PERFORMER_ID"],
+    "financial_transactions": ["FXID", "LINE_NO", "FINANCIAL_TYPE", "CURRENCY", "FIN_TX_AMT", "FIN_TX_POST_DT"],
+    "invoices": ["INV_ID", "INV_LINE_NBR", "LINE_NO", "DESCRIPTION", "CURRENCY", "INVOICE_AMOUNT", "INVOICE_DATE",
+                 "VENDOR"],
+    "audit_truth": ["CLAIM_NO", "LINE_NO", "LATE_PAYMENT", "OVER_RESERVE", "OVER_AUTHORITY"],
+}
+
+# Generated ids start above the demo reference data so both can be loaded side by side
+DEFAULT_ID_OFFSET = 100000
+
+LINES_OF_BUSINESS = np.array(["Property", "Homeowners", "Commercial Property", "Auto"])
+CLAIM_STATUSES = np.array(["Open", "Closed"])
+CAUSES_OF_LOSS = np.array(["Hurricane", "Fire", "Water Damage", "Theft", "Hail", "Wind", "Collision", "Vandalism"])
+LINE_DESCRIPTIONS = np.array(["Damaged Dwelling", "Damaged Fence", "Damaged Lawn", "Damaged Roof",
+                              "Water Damage to Interior", "Damaged Garage", "Damaged Vehicle", "Damaged Contents"])
+CLAIM_DESCRIPTIONS = np.array([
+    "Damaged dwelling and fence after the tree fell",
+    "Roof and siding damaged by high winds",
+    "Kitchen and basement flooded after a pipe burst",
+    "Garage and contents damaged by fire",
+    "Vehicle and fence damaged in a collision",
+    "Windows and roof damaged by hail",
+])
+STATES = np.array(["NJ", "NY", "FL", "TX", "CA", "PA", "GA", "NC", "LA", "IL"])
+VENDORS = np.array(["ABC", "LMN", "XYZ", "Acme Restoration", "Summit Roofing", "Coastal Builders", "Metro Fencing"])
+INVOICE_ITEMS = np.array(["Labor", "Materials", "Hardware", "Equipment Rental", "Debris Removal", "Permits",
+                          "Wooden Logs", "Fence", "Lawn"])
+AUTHORITY_LIMITS = np.array([2500.00, 3000.00, 5000.00, 10000.00, 25000.00])
+
+
+def iso_dates(days: np.ndarray) -> np.ndarray:
+    """Format datetime64[D] values as ISO date strings."""
+    return np.datetime_as_string(days, unit="D")
+
+
+def write_part(output_dir: Path, table: str, part: int, columns: Dict[str, np.ndarray], output_format: str) -> int:
+    """
+    Write one chunk of a table as a part file.
+
+    Args:
+        output_dir: Root output directory
+        table: Table name (part files go to <output_dir>/<table>/)
+        part: Part number
+        columns: Column name -> values, in TABLE_COLUMNS order
+        output_format: 'csv' or 'parquet'
+
+    Returns:
+        Number of rows written
+    """
+    table_dir = output_dir / table
+    table_dir.mkdir(parents=True, exist_ok=True)
+    rows = len(next(iter(columns.values())))
+
+    if output_format == "parquet":
+        arrays = {}
+        for name, values in columns.items():
+            arrays[name] = pa.array(values.astype("datetime64[D]") if values.dtype.kind == "M" else values)
+        pq.write_table(pa.table(arrays), table_dir / f"part_{part:05d}.parquet", compression="zstd")
+    else:
+        frame = pd.DataFrame({
+            name: iso_dates(values) if values.dtype.kind == "M" else values
+            for name, values in columns.items()
+        })
+        frame.to_csv(table_dir / f"part_{part:05d}.csv", index=False, float_format="%.2f")
+
+    return rows
+
+
+def split_amounts(totals: np.ndarray, counts: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Split each total into `count` positive cent amounts that add up to the total exactly.
+
+    Args:
+        totals: Amount per group
+        counts: Number of parts per group
+        rng: Random generator
+
+    Returns:
+        Flat array of part amounts, grouped in input order
+    """
+    group = np.repeat(np.arange(len(totals)), counts)
+    weights = rng.uniform(0.5, 1.5, size=len(group))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    shares = weights / np.add.reduceat(weights, starts)[group]
+    cents = np.floor(shares * np.round(totals * 100)[group])
+    remainder = np.round(totals * 100) - np.add.reduceat(cents, starts)
+    last = starts + counts - 1
+    cents[last] += remainder
+    return cents / 100
+
+
+def generate_authorization(output_dir: Path, performers: int, id_offset: int, output_format: str, seed: int) -> np.ndarray:
+    """
+    Write the AUTHORIZATION table and return each performer's authority limit.
+
+    Args:
+        output_dir: Root output directory
+        performers: Number of performers
+        id_offset: First performer id
+        output_format: 'csv' or 'parquet'
+        seed: Random seed
+
+    Returns:
+        Array of TO_AMT limits indexed by performer number
+    """
+    rng = np.random.default_rng([seed, 0])
+    limits = rng.choice(AUTHORITY_LIMITS, size=performers, p=[0.2, 0.2, 0.3, 0.2, 0.1])
+    write_part(output_dir, "authorization", 0, {
+        "PERFORMER_ID": id_offset + np.arange(performers),
+        "FROM_AMT": np.zeros(performers),
+        "TO_AMT": limits,
+        "CURRENCY": np.full(performers, "USD"),
+    }, output_format)
+    return limits
+
+
+def generate_chunk(
+    output_dir: Path,
+    part: int,
+    first_claim: int,
+    claims: int,
+    first_line: int,
+    limits: np.ndarray,
+    args: argparse.Namespace
+) -> Dict[str, int]:
+    """
+    Generate one chunk of claims with their lines, transactions and invoices.
+
+    Ids are derived from the chunk's first claim and first line number, so they are
+    globally unique across chunks, and every chunk has its own deterministic random stream.
+
+    Args:
+        output_dir: Root output directory
+        part: Chunk (part file) number
+        first_claim: Index of the first claim in this chunk
+        claims: Number of claims in this chunk
+        first_line: Index of the first claim line in this chunk
+        limits: Authority limit per performer
+        args: Parsed command-line options
+
+    Returns:
+        Dict of table name -> rows written, plus per-violation counts
+    """
+    rng = np.random.default_rng([args.seed, part + 1])
+    offset = args.id_offset
+    counts = {}
+
+    # Claims
+    claim_no = offset + first_claim + np.arange(claims)
+    start = np.datetime64(args.start_date, "D")
+    span = (np.datetime64(args.end_date, "D") - start).astype(int) + 1
+    loss_date = start + rng.integers(0, span, size=claims).astype("timedelta64[D]")
+    reported_date = loss_date + rng.integers(0, 11, size=claims).astype("timedelta64[D]")
+    fnol_date = reported_date + rng.integers(0, 4, size=claims).astype("timedelta64[D]")
+    claimant_id = offset + rng.integers(0, max(claims * 8, 1000), size=claims) + first_claim
+    claim_status = CLAIM_STATUSES[(rng.random(claims) < 0.6).astype(int)]
+    counts["claims"] = write_part(output_dir, "claims", part, {
+        "CLAIM_NO": claim_no,
+        "LINE_OF_BUSINESS": rng.choice(LINES_OF_BUSINESS, size=claims, p=[0.4, 0.3, 0.2, 0.1]),
+        "CLAIM_STATUS": claim_status,
+        "CAUSE_OF_LOSS": rng.choice(CAUSES_OF_LOSS, size=claims),
+        "CREATED_DATE": reported_date,
+        "LOSS_DATE": loss_date,
+        "REPORTED_DATE": reported_date,
+        "CLAIMANT_ID": claimant_id,
+        "PERFORMER": offset + rng.integers(0, args.adjusters, size=claims),
+        "POLICY_NO": offset + rng.integers(0, claims * 4 + 1000, size=claims) + first_claim,
+        "FNOL_COMPLETION_DATE": fnol_date,
+        "LOSS_DESCRIPTION": rng.choice(CLAIM_DESCRIPTIONS, size=claims),
+        "LOSS_STATE": rng.choice(STATES, size=claims),
+        "LOSS_ZIP_CODE": np.char.zfill(rng.integers(501, 99951, size=claims).astype(str), 5),
+    }, args.format)
+
+    # Claim lines (1..max_lines per claim)
+    lines_per_claim = rng.integers(1, args.max_lines_per_claim + 1, size=claims)
+    line_claim = np.repeat(np.arange(claims), lines_per_claim)
+    lines = len(line_claim)
+    line_no = offset + first_line + np.arange(lines)
+    performer = rng.integers(0, len(limits), size=lines)
+    counts["claim_lines"] = write_part(output_dir, "claim_lines", part, {
+        "CLAIM_NO": claim_no[line_claim],
+        "LINE_NO": line_no,
+        "LOSS_DESCRIPTION": rng.choice(LINE_DESCRIPTIONS, size=lines),
+        "CLAIM_STATUS": claim_status[line_claim],
+        "CREATED_DATE": reported_date[line_claim],
+        "REPORTED_DATE": reported_date[line_claim],
+        "CLAIMANT_ID": claimant_id[line_claim],
+        "PERFORMER_ID": offset + performer,
+    }, args.format)
+
+    # Amounts: payment within authority and reserve, unless a violation is injected. Payment
+    # over reserve is a claim-level rule (total PAY > total RSV), so it is injected per claim:
+    # every line of such a claim is paid over its reserve, and no line of any other claim is
+    authority = limits[performer]
+    late = rng.random(lines) < args.late_payment_rate
+    over_reserve = (rng.random(claims) < args.over_reserve_rate)[line_claim]
+    over_authority = rng.random(lines) < args.over_authority_rate
+
+    pay_amt = np.where(over_authority,
+                       authority * rng.uniform(1.05, 1.5, size=lines),
+                       authority * rng.uniform(0.16, 0.6, size=lines))
+    pay_amt = np.round(pay_amt, 2)
+    rsv_amt = np.where(over_reserve,
+                       pay_amt / rng.uniform(1.05, 1.5, size=lines),
+                       pay_amt / rng.uniform(0.8, 1.0, size=lines))
+    rsv_amt = np.round(rsv_amt, 2)
+    # Rounding may not leave a clean line exactly at or under its reserve
+    rsv_amt = np.where(~over_reserve, np.maximum(rsv_amt, pay_amt), np.minimum(rsv_amt, pay_amt - 0.01))
+
+    # Dates: reserve soon after reporting, invoice later, payment 0-2 days after the invoice (31+ if
+    # late), so clean lines fall outside every PAYMENT_LAG_* bucket in pyutil/auditrules
+    line_reported = reported_date[line_claim]
+    rsv_date = line_reported + rng.integers(0, 6, size=lines).astype("timedelta64[D]")
+    invoice_date = line_reported + rng.integers(5, 61, size=lines).astype("timedelta64[D]")
+    lag = np.where(late, rng.integers(31, 121, size=lines), rng.integers(0, 3, size=lines))
+    pay_date = invoice_date + lag.astype("timedelta64[D]")
+
+    # Financial transactions: RSV then PAY for each line
+    counts["financial_transactions"] = write_part(output_dir, "financial_transactions", part, {
+        "FXID": offset + 2 * first_line + np.arange(2 * lines),
+        "LINE_NO": np.repeat(line_no, 2),
+        "FINANCIAL_TYPE": np.tile(np.array(["RSV", "PAY"]), lines),
+        "CURRENCY": np.full(lines * 2, "USD"),
+        "FIN_TX_AMT": np.column_stack((rsv_amt, pay_amt)).ravel(),
+        "FIN_TX_POST_DT": np.column_stack((rsv_date, pay_date)).ravel(),
+    }, args.format)
+
+    # Invoices: one invoice per line whose line items add up to the payment
+    items_per_invoice = rng.integers(1, args.max_invoice_items + 1, size=lines)
+    item_line = np.repeat(np.arange(lines), items_per_invoice)
+    item_starts = np.concatenate(([0], np.cumsum(items_per_invoice)[:-1]))
+    items = len(item_line)
+    counts["invoices"] = write_part(output_dir, "invoices", part, {
+        "INV_ID": line_no[item_line],
+        "INV_LINE_NBR": np.arange(items) - item_starts[item_line] + 1,
+        "LINE_NO": line_no[item_line],
+        "DESCRIPTION": rng.choice(INVOICE_ITEMS, size=items),
+        "CURRENCY": np.full(items, "USD"),
+        "INVOICE_AMOUNT": split_amounts(pay_amt, items_per_invoice, rng),
+        "INVOICE_DATE": invoice_date[item_line],
+        "VENDOR": rng.choice(VENDORS, size=lines)[item_line],
+    }, args.format)
+
+    # Ground truth of the injected violations
+    flagged = late | over_reserve | over_authority
+    write_part(output_dir, "audit_truth", part, {
+        "CLAIM_NO": claim_no[line_claim][flagged],
+        "LINE_NO": line_no[flagged],
+        "LATE_PAYMENT": late[flagged],
+        "OVER_RESERVE": over_reserve[flagged],
+        "OVER_AUTHORITY": over_authority[flagged],
+    }, args.format)
+    # Claims with at least one injected violation of each kind, as the audit rules flag them
+    counts["late_payment"] = len(np.unique(line_claim[late]))
+    counts["over_reserve"] = len(np.unique(line_claim[over_reserve]))
+    counts["over_authority"] = len(np.unique(line_claim[over_authority]))
+
+    return counts
+
+
+def generate(args: argparse.Namespace, verbose: bool = True) -> Dict[str, int]:
+    """
+    Generate the full dataset chunk by chunk.
+
+    Args:
+        args: Parsed command-line options
+        verbose: Print per-chunk progress
+
+    Returns:
+        Dict of table name -> total rows, plus per-violation counts
+    """
+    output_dir = Path(args.output_dir)
+    if output_dir.exists() and any(output_dir.iterdir()):
+        raise FileExistsError(f"Output directory is not empty: {output_dir}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    performers = args.performers or max(100, args.claims // 50)
+    limits = generate_authorization(output_dir, performers, args.id_offset, args.format, args.seed)
+    totals = {"authorization": performers}
+
+    first_line = 0
+    chunks = (args.claims + args.chunk_size - 1) // args.chunk_size
+    for part in range(chunks):
+        first_claim = part * args.chunk_size
+        claims = min(args.chunk_size, args.claims - first_claim)
+        # Line numbers continue from the previous chunk to stay globally unique
+        counts = generate_chunk(output_dir, part, first_claim, claims, first_line, limits, args)
+        first_line += counts["claim_lines"]
+        for name, value in counts.items():
+            totals[name] = totals.get(name, 0) + value
+        if verbose:
+            print(f"  Chunk {part + 1}/{chunks}: {claims:,} claims, {counts['claim_lines']:,} lines")
+
+    return totals
+
+
+def main():
+    """
+    Main entry point for command-line execution.
+
+    Usage:
+        python synthclaims.py <output_dir> [--claims N] [--chunk-size N] [--format csv|parquet]
+
+    Example:
+        python synthclaims.py /tmp/claims_1m --claims 1000000 --late-payment-rate 0.05
+        python snowcliload.py /tmp/claims_1m my_connection --mode merge
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate referentially consistent synthetic claims data with injected audit violations"
+    )
+    parser.add_argument("output_dir", help="Directory to write <table>/part_NNNNN files to (must be empty)")
+    parser.add_argument("--claims", type=int, default=10000, help="Number of claims (default: 10000)")
+    parser.add_argument("--chunk-size", dest="chunk_size", type=int, default=100000,
+                        help="Claims per chunk / part file; bounds memory use (default: 100000)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Output format (default: csv)")
+    parser.add_argument("--seed", type=int, default=1899, help="Random seed (default: 1899)")
+    parser.add_argument("--id-offset", dest="id_offset", type=int, default=DEFAULT_ID_OFFSET,
+                        help=f"First generated id (default: {DEFAULT_ID_OFFSET})")
+    parser.add_argument("--max-lines-per-claim", dest="max_lines_per_claim", type=int, default=5,
+                        help="Maximum claim lines per claim (default: 5)")
+    parser.add_argument("--max-invoice-items", dest="max_invoice_items", type=int, default=4,
+                        help="Maximum invoice line items per claim line (default: 4)")
+    parser.add_argument("--performers", type=int, default=0,
+                        help="Number of performers in AUTHORIZATION (default: claims / 50, at least 100)")
+    parser.add_argument("--adjusters", type=int, default=500, help="Number of claim adjusters (default: 500)")
+    parser.add_argument("--start-date", dest="start_date", default="2023-01-01", help="Earliest loss date")
+    parser.add_argument("--end-date", dest="end_date", default="2025-06-30", help="Latest loss date")
+    parser.add_argument("--late-payment-rate", dest="late_payment_rate", type=float, default=0.02,
+                        help="Share of lines paid 30+ days after the invoice (default: 0.02)")
+    parser.add_argument("--over-reserve-rate", dest="over_reserve_rate", type=float, default=0.02,
+                        help="Share of claims paid more than their total reserve (default: 0.02)")
+    parser.add_argument("--over-authority-rate", dest="over_authority_rate", type=float, default=0.02,
+                        help="Share of lines paid more than the performer's authority (default: 0.02)")
+
+    args = parser.parse_args()
+
+    if args.format == "parquet" and pa is None:
+        print("Error: --format parquet requires pyarrow (pip install pyarrow)", file=sys.stderr)
+        sys.exit(1)
+    if args.claims < 1 or args.chunk_size < 1:
+        print("Error: --claims and --chunk-size must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        print(f"Generating {args.claims:,} claims into: {args.output_dir}")
+        started = time.perf_counter()
+        totals = generate(args)
+        elapsed = time.perf_counter() - started
+
+        rows = sum(totals[table] for table in TABLE_COLUMNS if table in totals)
+        print(f"\n{'='*60}")
+        print("Generation Summary:")
+        for table in TABLE_COLUMNS:
+            if table in totals:
+                print(f"  {table:<24}{totals[table]:>14,} rows")
+        print(f"  Claims with injected violations: {totals['late_payment']:,} late payment, "
+              f"{totals['over_reserve']:,} over reserve, {totals['over_authority']:,} over authority")
+        print(f"  Elapsed:  {elapsed:.1f}s ({rows / elapsed if elapsed else 0.0:,.0f} rows/s)")
+        print(f"{'='*60}")
+        sys.exit(0)
+
+    except FileExistsError as e:
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nERROR: Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -118,3 +118,157 @@ CREATE TABLE IF NOT EXISTS loss_claims.guidelines_chunk_table
     chunk    VARCHAR,
     language VARCHAR
 );
+
+CREATE TABLE IF NOT EXISTS image_summaries
+(
+    relative_path VARCHAR COMMENT 'Path of the image file relative to the loss_evidence stage',
+    md5           VARCHAR COMMENT 'MD5 of the staged file the summary was generated from',
+    summary       VARCHAR COMMENT 'Multimodal model summary of the image',
+    model         VARCHAR COMMENT 'Model used to generate the summary',
+    summarized_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS image_similarity_scores
+(
+    summary_hash     VARCHAR COMMENT 'SHA2 of the image summary text that was scored',
+    description_hash VARCHAR COMMENT 'SHA2 of the claim loss description that was scored',
+    score            FLOAT COMMENT 'AI_SIMILARITY score between the summary and the description',
+    scored_at        TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS document_parse_ledger
+(
+    relative_path VARCHAR COMMENT 'Path of the parsed file relative to the loss_evidence stage',
+    md5           VARCHAR COMMENT 'MD5 of the staged file that was parsed',
+    doc_class     VARCHAR COMMENT 'Classification by file name: CLAIM_NOTE, GUIDELINE or INVOICE',
+    target_table  VARCHAR COMMENT 'PARSED_* table the extracted content was routed to',
+    parse_mode    VARCHAR COMMENT 'How the text was extracted: OCR (ai_parse_document) or LOCAL (pyutil/docextract)',
+    parse_ms      INT COMMENT 'Wall-clock extraction time in milliseconds (OCR rows: the batch parse time apportioned by file size)',
+    parsed_at     TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS local_document_extracts
+(
+    relative_path     VARCHAR COMMENT 'Path of the source file relative to the loss_evidence stage',
+    md5               VARCHAR COMMENT 'MD5 of the local file, used only when it matches the staged file',
+    doc_class         VARCHAR COMMENT 'Classification by file name: CLAIM_NOTE, GUIDELINE or INVOICE',
+    extracted_content VARCHAR COMMENT 'Text extracted locally from the born-digital document',
+    extractor         VARCHAR COMMENT 'Local extractor used (docx-xml or pdf-text-layer)',
+    extract_ms        INT COMMENT 'Local extraction time, in milliseconds',
+    extracted_at      TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS claim_audit_flags
+(
+    claim_no         VARCHAR COMMENT 'Claim the audit rule was evaluated for',
+    rule_id          VARCHAR COMMENT 'Audit rule identifier from pyutil/auditrules',
+    rule_order       INT COMMENT 'Display order of the rule',
+    rule_description VARCHAR COMMENT 'What the rule checks',
+    flagged          BOOLEAN COMMENT 'TRUE if the claim violates the rule',
+    violation_count  INT COMMENT 'Number of offending lines, payments or totals',
+    details          VARCHAR COMMENT 'JSON array describing each violation, NULL if not flagged',
+    evaluated_at     TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS document_ai_results
+(
+    stage_name    VARCHAR COMMENT 'Stage the file was read from, without the leading @',
+    relative_path VARCHAR COMMENT 'Path of the file relative to the stage',
+    md5           VARCHAR COMMENT 'MD5 of the staged file the result was computed from',
+    function_name VARCHAR COMMENT 'Memoized function: CLASSIFY_DOCUMENT or PARSE_DOCUMENT_FROM_STAGE',
+    options_hash  VARCHAR COMMENT 'SHA2 of the DOCUMENT_AI_OPTIONS the result was computed with',
+    result        VARIANT COMMENT 'Function result returned on a memo hit',
+    computed_at   TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS document_ai_runs
+(
+    function_name   VARCHAR COMMENT 'Function the batch ran: CLASSIFY_DOCUMENT or PARSE_DOCUMENT_FROM_STAGE',
+    file_filter     VARCHAR COMMENT 'JSON of the file list and path pattern the batch was called with',
+    files_requested INT COMMENT 'Stage files matching the filter',
+    memo_hits       INT COMMENT 'Files whose result was already memoized',
+    computed        INT COMMENT 'Files the Cortex function was called for',
+    run_ms          INT COMMENT 'Wall-clock time of the batch, in milliseconds',
+    run_at          TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS call_transcripts
+(
+    relative_path  VARCHAR COMMENT 'Path of the recording relative to the loss_evidence stage',
+    md5            VARCHAR COMMENT 'MD5 of the recording, the lookup key for TRANSCRIBE_AUDIO_SIMPLE',
+    transcript     VARIANT COMMENT 'Speaker-labelled transcript shaped like the AI_TRANSCRIBE result',
+    segment_count  INT COMMENT 'Number of segments transcribed in parallel, 1 for a whole-file transcription',
+    audio_seconds  FLOAT COMMENT 'Recording duration in seconds',
+    transcribe_ms  INT COMMENT 'Wall-clock transcription time, in milliseconds',
+    method         VARCHAR COMMENT 'SEGMENTED (pyutil/segtranscribe) or LIVE (TRANSCRIBE_AUDIO_SIMPLE)',
+    transcribed_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS evidence_image_hashes
+(
+    relative_path VARCHAR COMMENT 'Path of the image file relative to the loss_evidence stage',
+    md5           VARCHAR COMMENT 'MD5 of the image file that was hashed',
+    claim_no      VARCHAR COMMENT 'Claim number from the file name prefix, NULL if the name has none',
+    phash         VARCHAR COMMENT 'DCT perceptual hash (64 bits, hex)',
+    dhash         VARCHAR COMMENT 'Gradient difference hash (64 bits, hex)',
+    width         INT COMMENT 'Image width in pixels',
+    height        INT COMMENT 'Image height in pixels',
+    hashed_at     TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS evidence_image_matches
+(
+    relative_path       VARCHAR COMMENT 'Image the match was found for',
+    claim_no            VARCHAR COMMENT 'Claim of the image',
+    match_relative_path VARCHAR COMMENT 'Near-duplicate image',
+    match_claim_no      VARCHAR COMMENT 'Claim of the near-duplicate image',
+    phash_distance      INT COMMENT 'Hamming distance between the pHashes (0-64, lower is more similar)',
+    dhash_distance      INT COMMENT 'Hamming distance between the dHashes (0-64, lower is more similar)',
+    cross_claim         BOOLEAN COMMENT 'TRUE if the two images belong to different claims',
+    matched_at          TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- OCR calls avoided by local extraction, and the OCR time they would have cost at the
+-- average observed OCR parse time for the same file type
+CREATE OR REPLACE VIEW document_parse_savings AS
+WITH ocr_times AS (SELECT LOWER(SPLIT_PART(relative_path, '.', -1)) AS file_type,
+                          AVG(parse_ms)                             AS avg_ocr_ms
+                   FROM document_parse_ledger
+                   WHERE parse_mode = 'OCR'
+                   GROUP BY file_type),
+     all_ocr AS (SELECT AVG(parse_ms) AS avg_ocr_ms
+                 FROM document_parse_ledger
+                 WHERE parse_mode = 'OCR')
+SELECT COUNT(*)                                                       AS ocr_calls_avoided,
+       SUM(l.parse_ms)                                                AS local_extract_ms,
+       SUM(COALESCE(t.avg_ocr_ms, a.avg_ocr_ms))                      AS estimated_ocr_ms,
+       SUM(COALESCE(t.avg_ocr_ms, a.avg_ocr_ms)) - SUM(l.parse_ms)    AS estimated_ms_saved
+FROM document_parse_ledger l
+         LEFT JOIN ocr_times t ON t.file_type = LOWER(SPLIT_PART(l.relative_path, '.', -1))
+         CROSS JOIN all_ocr a
+WHERE l.parse_mode = 'LOCAL';
+
+-- Memo hit rate of the document AI batch procedures, per function
+CREATE OR REPLACE VIEW document_ai_memo_stats AS
+WITH runs AS (SELECT function_name,
+                     COUNT(*)             AS batch_runs,
+                     SUM(files_requested) AS files_requested,
+                     SUM(memo_hits)       AS memo_hits,
+                     SUM(computed)        AS computed,
+                     MAX(run_at)          AS last_run_at
+              FROM document_ai_runs
+              GROUP BY function_name),
+     memo AS (SELECT function_name,
+                     COUNT(*) AS memoized_results
+              FROM document_ai_results
+              GROUP BY function_name)
+SELECT COALESCE(r.function_name, m.function_name)          AS function_name,
+       COALESCE(r.batch_runs, 0)                           AS batch_runs,
+       COALESCE(r.files_requested, 0)                      AS files_requested,
+       COALESCE(r.memo_hits, 0)                            AS memo_hits,
+       COALESCE(r.computed, 0)                             AS computed,
+       ROUND(r.memo_hits / NULLIF(r.files_requested, 0), 3) AS hit_rate,
+       COALESCE(m.memoized_results, 0)                     AS memoized_results,
+       r.last_run_at
+FROM runs r
+         FULL OUTER JOIN memo m ON m.function_name = r.function_name;
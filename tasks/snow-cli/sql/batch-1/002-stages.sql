@@ -8,3 +8,41 @@ USE SCHEMA ins_co.loss_claims;
 CREATE OR REPLACE STAGE loss_evidence
     DIRECTORY = ( ENABLE = TRUE )
 	ENCRYPTION = ( TYPE = 'SNOWFLAKE_SSE' );
+
+CREATE STAGE IF NOT EXISTS evidence_originals
+    ENCRYPTION = ( TYPE = 'SNOWFLAKE_SSE' )
+    COMMENT = 'Full-size originals of evidence images normalized by pyutil/snowcliput before upload, under originals/';
+
+CREATE STAGE IF NOT EXISTS app_telemetry
+    DIRECTORY = ( ENABLE = TRUE )
+	ENCRYPTION = ( TYPE = 'SNOWFLAKE_SSE' )
+    COMMENT = 'Performance traces exported by the Streamlit app as JSON lines';
+
+CREATE STAGE IF NOT EXISTS document_ingest
+    ENCRYPTION = ( TYPE = 'SNOWFLAKE_SSE' )
+    COMMENT = 'Gzipped CSV batches of locally extracted document text, loaded into LOCAL_DOCUMENT_EXTRACTS';
+
+CREATE STAGE IF NOT EXISTS reference_data
+    ENCRYPTION = ( TYPE = 'SNOWFLAKE_SSE' )
+    COMMENT = 'Compressed CSV/Parquet parts for the claims reference tables, loaded by pyutil/snowcliload';
+
+CREATE STAGE IF NOT EXISTS audio_segments
+    DIRECTORY = ( ENABLE = TRUE )
+    ENCRYPTION = ( TYPE = 'SNOWFLAKE_SSE' )
+    COMMENT = 'WAV segments of long call recordings transcribed in parallel by pyutil/segtranscribe';
+
+CREATE STAGE IF NOT EXISTS image_hash_ingest
+    ENCRYPTION = ( TYPE = 'SNOWFLAKE_SSE' )
+    COMMENT = 'Gzipped CSV batches of perceptual image hashes and matches, loaded by pyutil/imghash';
+
+CREATE OR REPLACE FILE FORMAT reference_csv_format
+    TYPE = CSV
+    PARSE_HEADER = TRUE
+    FIELD_OPTIONALLY_ENCLOSED_BY = '"'
+    EMPTY_FIELD_AS_NULL = TRUE
+    DATE_FORMAT = 'AUTO'
+    COMPRESSION = AUTO;
+
+CREATE OR REPLACE FILE FORMAT reference_parquet_format
+    TYPE = PARQUET
+    COMPRESSION = AUTO;
@@ -1,4 +1,19 @@
-CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.CLASSIFY_DOCUMENT(p_file_name VARCHAR, p_stage_name VARCHAR DEFAULT '@INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE')
+-- Options each document AI function is called with. Memoized results are keyed by a hash
+-- of these options, so changing them here invalidates the memo for that function.
+CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.DOCUMENT_AI_OPTIONS(p_function_name VARCHAR)
+  RETURNS VARIANT
+  LANGUAGE SQL
+  AS
+  $$
+    CASE UPPER(p_function_name)
+        WHEN 'CLASSIFY_DOCUMENT' THEN TO_VARIANT(ARRAY_CONSTRUCT(
+                'What type of document is this? Classify as one of: Invoice, Evidence Image, Medical Bill, Insurance Claim, Policy Document, Correspondence, Legal Document, Financial Statement, Other'))
+        WHEN 'PARSE_DOCUMENT_FROM_STAGE' THEN PARSE_JSON('{"mode": "layout", "page_split": true}')
+    END
+  $$
+;
+
+CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.CLASSIFY_DOCUMENT_LIVE(p_file_name VARCHAR, p_stage_name VARCHAR DEFAULT '@INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE')
   RETURNS OBJECT
   LANGUAGE SQL
   AS
@@ -7,7 +22,7 @@ CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.CLASSIFY_DOCUMENT(p_file_name VARC
          AS (SELECT to_file(p_stage_name, p_file_name) AS target_file,
                     ai_extract(FILE => target_file,
                                responseFormat =>
-                               ARRAY_CONSTRUCT('What type of document is this? Classify as one of: Invoice, Evidence Image, Medical Bill, Insurance Claim, Policy Document, Correspondence, Legal Document, Financial Statement, Other')
+                               INS_CO.LOSS_CLAIMS.DOCUMENT_AI_OPTIONS('CLASSIFY_DOCUMENT')::ARRAY
                     )                                  AS classification_data)
 
     SELECT OBJECT_CONSTRUCT(
@@ -28,30 +43,247 @@ CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.CLASSIFY_DOCUMENT(p_file_name VARC
   $$
 ;
 
-CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.PARSE_DOCUMENT_FROM_STAGE(p_file_name VARCHAR, p_stage_name VARCHAR DEFAULT '@INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE')
+CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.CLASSIFY_DOCUMENT(p_file_name VARCHAR, p_stage_name VARCHAR DEFAULT '@INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE')
+  RETURNS OBJECT
+  LANGUAGE SQL
+  AS
+  $$
+    -- Read the result memoized by RUN_DOCUMENT_AI_BATCH for the current file content,
+    -- falling back to a live ai_extract call
+    WITH memo_cte AS (SELECT MAX_BY(m.result, m.computed_at) AS result
+                      FROM INS_CO.LOSS_CLAIMS.DOCUMENT_AI_RESULTS m
+                               JOIN directory('@ins_co.loss_claims.loss_evidence') d
+                                    ON d.relative_path = m.relative_path AND d.md5 = m.md5
+                      WHERE m.relative_path = p_file_name
+                        AND m.stage_name = UPPER(LTRIM(p_stage_name, '@'))
+                        AND m.function_name = 'CLASSIFY_DOCUMENT'
+                        AND m.options_hash = SHA2(TO_JSON(INS_CO.LOSS_CLAIMS.DOCUMENT_AI_OPTIONS('CLASSIFY_DOCUMENT'))))
+
+    SELECT CASE
+               WHEN memo_cte.result IS NOT NULL THEN memo_cte.result::OBJECT
+               ELSE INS_CO.LOSS_CLAIMS.CLASSIFY_DOCUMENT_LIVE(p_file_name, p_stage_name)
+           END
+    FROM memo_cte
+  $$
+;
+
+CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.PARSE_DOCUMENT_FROM_STAGE_LIVE(p_file_name VARCHAR, p_stage_name VARCHAR DEFAULT '@INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE')
   RETURNS VARIANT
   LANGUAGE SQL
   AS
   $$
-    WITH ai_parse_doc_cte AS (SELECT to_file(p_stage_name, p_file_name)                                    AS target_file,
-                                     TO_OBJECT(PARSE_JSON('{"mode": "layout", "page_split": true}'))       AS ai_parse_document_options,
-                                     TO_VARIANT(ai_parse_document(target_file, ai_parse_document_options)) AS raw_text_dict)
+    WITH ai_parse_doc_cte AS (SELECT to_file(p_stage_name, p_file_name)                                                 AS target_file,
+                                     TO_OBJECT(INS_CO.LOSS_CLAIMS.DOCUMENT_AI_OPTIONS('PARSE_DOCUMENT_FROM_STAGE'))     AS ai_parse_document_options,
+                                     TO_VARIANT(ai_parse_document(target_file, ai_parse_document_options))              AS raw_text_dict)
 
     SELECT raw_text_dict
     FROM ai_parse_doc_cte
   $$
 ;
 
+CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.PARSE_DOCUMENT_FROM_STAGE(p_file_name VARCHAR, p_stage_name VARCHAR DEFAULT '@INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE')
+  RETURNS VARIANT
+  LANGUAGE SQL
+  AS
+  $$
+    -- Read the result memoized by RUN_DOCUMENT_AI_BATCH for the current file content,
+    -- falling back to a live ai_parse_document call
+    WITH memo_cte AS (SELECT MAX_BY(m.result, m.computed_at) AS result
+                      FROM INS_CO.LOSS_CLAIMS.DOCUMENT_AI_RESULTS m
+                               JOIN directory('@ins_co.loss_claims.loss_evidence') d
+                                    ON d.relative_path = m.relative_path AND d.md5 = m.md5
+                      WHERE m.relative_path = p_file_name
+                        AND m.stage_name = UPPER(LTRIM(p_stage_name, '@'))
+                        AND m.function_name = 'PARSE_DOCUMENT_FROM_STAGE'
+                        AND m.options_hash = SHA2(TO_JSON(INS_CO.LOSS_CLAIMS.DOCUMENT_AI_OPTIONS('PARSE_DOCUMENT_FROM_STAGE'))))
+
+    SELECT CASE
+               WHEN memo_cte.result IS NOT NULL THEN memo_cte.result
+               ELSE INS_CO.LOSS_CLAIMS.PARSE_DOCUMENT_FROM_STAGE_LIVE(p_file_name, p_stage_name)
+           END
+    FROM memo_cte
+  $$
+;
+
+-- Runs a Document AI function (CLASSIFY_DOCUMENT or PARSE_DOCUMENT_FROM_STAGE) over a list of
+-- files and/or the files matching a path pattern (ILIKE) in the loss_evidence stage in one
+-- set-based statement, memoizing each result in DOCUMENT_AI_RESULTS.
+-- Files already memoized for their current md5 and options are not sent to the model again.
+CREATE OR REPLACE PROCEDURE INS_CO.LOSS_CLAIMS.RUN_DOCUMENT_AI_BATCH(p_function_name VARCHAR, p_files ARRAY DEFAULT NULL, p_path_pattern VARCHAR DEFAULT NULL)
+  RETURNS OBJECT
+  LANGUAGE SQL
+  EXECUTE AS OWNER
+  AS
+  $$
+    DECLARE
+    v_function_name VARCHAR;
+    v_started TIMESTAMP_NTZ;
+    v_options_hash VARCHAR;
+    v_requested INTEGER DEFAULT 0;
+    v_computed INTEGER DEFAULT 0;
+    v_run_ms INTEGER DEFAULT 0;
+    BEGIN
+      v_function_name := UPPER(p_function_name);
+      IF (v_function_name NOT IN ('CLASSIFY_DOCUMENT', 'PARSE_DOCUMENT_FROM_STAGE')) THEN
+        RETURN OBJECT_CONSTRUCT('success', FALSE,
+                                'message', 'Unknown function: ' || :p_function_name ||
+                                           ' (expected CLASSIFY_DOCUMENT or PARSE_DOCUMENT_FROM_STAGE)');
+      END IF;
+
+      v_started := SYSDATE();
+      SELECT SHA2(TO_JSON(INS_CO.LOSS_CLAIMS.DOCUMENT_AI_OPTIONS(:v_function_name))) INTO :v_options_hash;
+
+      CREATE OR REPLACE TEMPORARY TABLE DOCUMENT_AI_BATCH_FILES AS
+      SELECT relative_path, md5
+      FROM directory('@ins_co.loss_claims.loss_evidence')
+      WHERE LOWER(relative_path) REGEXP '.*\\.(pdf|docx|pptx|txt|html?|jpe?g|png|tiff?)'
+        AND (:p_files IS NULL OR ARRAY_CONTAINS(relative_path::VARIANT, :p_files))
+        AND (:p_path_pattern IS NULL OR relative_path ILIKE :p_path_pattern);
+      SELECT COUNT(*) INTO :v_requested FROM DOCUMENT_AI_BATCH_FILES;
+
+      -- Drop results of earlier versions of the requested files
+      DELETE FROM INS_CO.LOSS_CLAIMS.DOCUMENT_AI_RESULTS m
+      USING DOCUMENT_AI_BATCH_FILES f
+      WHERE m.stage_name = 'INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE'
+        AND m.function_name = :v_function_name
+        AND m.relative_path = f.relative_path
+        AND (m.md5 <> f.md5 OR m.options_hash <> :v_options_hash);
+
+      INSERT INTO INS_CO.LOSS_CLAIMS.DOCUMENT_AI_RESULTS (stage_name, relative_path, md5, function_name, options_hash, result)
+      SELECT 'INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE',
+             f.relative_path,
+             f.md5,
+             :v_function_name,
+             :v_options_hash,
+             CASE :v_function_name
+                 WHEN 'CLASSIFY_DOCUMENT'
+                     THEN TO_VARIANT(INS_CO.LOSS_CLAIMS.CLASSIFY_DOCUMENT_LIVE(f.relative_path, '@INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE'))
+                 ELSE TO_VARIANT(INS_CO.LOSS_CLAIMS.PARSE_DOCUMENT_FROM_STAGE_LIVE(f.relative_path, '@INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE'))
+             END
+      FROM DOCUMENT_AI_BATCH_FILES f
+      WHERE NOT EXISTS (SELECT 1
+                        FROM INS_CO.LOSS_CLAIMS.DOCUMENT_AI_RESULTS m
+                        WHERE m.stage_name = 'INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE'
+                          AND m.function_name = :v_function_name
+                          AND m.relative_path = f.relative_path
+                          AND m.md5 = f.md5
+                          AND m.options_hash = :v_options_hash);
+      v_computed := SQLROWCOUNT;
+      v_run_ms := DATEDIFF('millisecond', v_started, SYSDATE());
+
+      INSERT INTO INS_CO.LOSS_CLAIMS.DOCUMENT_AI_RUNS (function_name, file_filter, files_requested, memo_hits, computed, run_ms)
+      SELECT :v_function_name,
+             TO_JSON(OBJECT_CONSTRUCT('files', :p_files, 'path_pattern', :p_path_pattern)),
+             :v_requested,
+             :v_requested - :v_computed,
+             :v_computed,
+             :v_run_ms;
+
+      RETURN OBJECT_CONSTRUCT(
+              'success', TRUE,
+              'function_name', :v_function_name,
+              'files', :v_requested,
+              'memo_hits', :v_requested - :v_computed,
+              'computed', :v_computed,
+              'run_ms', :v_run_ms
+             );
+    END;
+  $$
+;
+
 CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.GET_IMAGE_SUMMARY(p_file_name VARCHAR, p_stage_name VARCHAR DEFAULT '@INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE')
   RETURNS VARIANT
   LANGUAGE SQL
   AS
   $$
-    SELECT AI_COMPLETE(
-                   'claude-3-5-sonnet',
-                   'Summarize the key insights from the attached image in 100 words.',
-                   to_file(p_stage_name, p_file_name)
-           )
+    -- Read the summary precomputed by REFRESH_IMAGE_SUMMARIES for the current file content,
+    -- falling back to a live AI_COMPLETE call
+    WITH precomputed_cte AS (SELECT MAX_BY(s.summary, s.summarized_at) AS summary
+                             FROM INS_CO.LOSS_CLAIMS.IMAGE_SUMMARIES s
+                                      JOIN directory('@ins_co.loss_claims.loss_evidence') d
+                                           ON d.relative_path = s.relative_path AND d.md5 = s.md5
+                             WHERE s.relative_path = p_file_name
+                               AND UPPER(LTRIM(p_stage_name, '@')) = 'INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE')
+
+    SELECT CASE
+               WHEN precomputed_cte.summary IS NOT NULL THEN TO_VARIANT(precomputed_cte.summary)
+               ELSE TO_VARIANT(AI_COMPLETE(
+                       'claude-3-5-sonnet',
+                       'Summarize the key insights from the attached image in 100 words.',
+                       to_file(p_stage_name, p_file_name)
+                    ))
+           END
+    FROM precomputed_cte
+  $$
+;
+
+-- Near-duplicates of an evidence image found by pyutil/imghash: an empty array if the image was
+-- hashed and has none, NULL if it has not been hashed yet
+CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.FIND_REUSED_IMAGES(p_file_name VARCHAR)
+  RETURNS ARRAY
+  LANGUAGE SQL
+  AS
+  $$
+    WITH hashed_cte AS (SELECT COUNT(*) > 0 AS hashed
+                        FROM INS_CO.LOSS_CLAIMS.EVIDENCE_IMAGE_HASHES
+                        WHERE relative_path = p_file_name),
+         matches_cte AS (SELECT ARRAY_AGG(OBJECT_CONSTRUCT('match_relative_path', match_relative_path,
+                                                           'match_claim_no', match_claim_no,
+                                                           'cross_claim', cross_claim,
+                                                           'phash_distance', phash_distance,
+                                                           'dhash_distance', dhash_distance))
+                                         WITHIN GROUP (ORDER BY phash_distance, dhash_distance, match_relative_path) AS matches
+                         FROM INS_CO.LOSS_CLAIMS.EVIDENCE_IMAGE_MATCHES
+                         WHERE relative_path = p_file_name)
+
+    SELECT IFF(hashed_cte.hashed, COALESCE(matches_cte.matches, ARRAY_CONSTRUCT()), NULL)
+    FROM hashed_cte, matches_cte
+  $$
+;
+
+CREATE OR REPLACE PROCEDURE INS_CO.LOSS_CLAIMS.REFRESH_IMAGE_SUMMARIES()
+  RETURNS OBJECT
+  LANGUAGE SQL
+  EXECUTE AS OWNER
+  AS
+  $$
+    DECLARE
+    v_removed INTEGER DEFAULT 0;
+    v_summarized INTEGER DEFAULT 0;
+    BEGIN
+      -- Drop summaries of images that were deleted or re-uploaded with different content
+      DELETE FROM INS_CO.LOSS_CLAIMS.IMAGE_SUMMARIES s
+      WHERE NOT EXISTS (SELECT 1
+                        FROM directory('@ins_co.loss_claims.loss_evidence') d
+                        WHERE d.relative_path = s.relative_path
+                          AND d.md5 = s.md5);
+      v_removed := SQLROWCOUNT;
+
+      -- Summarize only images whose relative_path + md5 has not been summarized yet
+      INSERT INTO INS_CO.LOSS_CLAIMS.IMAGE_SUMMARIES (relative_path, md5, summary, model)
+      SELECT d.relative_path,
+             d.md5,
+             AI_COMPLETE(
+                     'claude-3-5-sonnet',
+                     'Summarize the key insights from the attached image in 100 words.',
+                     to_file('@ins_co.loss_claims.loss_evidence', d.relative_path)
+             ),
+             'claude-3-5-sonnet'
+      FROM directory('@ins_co.loss_claims.loss_evidence') d
+      WHERE LOWER(d.relative_path) REGEXP '.*\\.(jpe?g|png|gif|webp)'
+        AND NOT EXISTS (SELECT 1
+                        FROM INS_CO.LOSS_CLAIMS.IMAGE_SUMMARIES s
+                        WHERE s.relative_path = d.relative_path
+                          AND s.md5 = d.md5);
+      v_summarized := SQLROWCOUNT;
+
+      RETURN OBJECT_CONSTRUCT(
+              'success', TRUE,
+              'removed', :v_removed,
+              'summarized', :v_summarized,
+              'refresh_timestamp', CURRENT_TIMESTAMP()
+             );
+    END;
   $$
 ;
 
@@ -63,7 +295,30 @@ CREATE OR REPLACE PROCEDURE INS_CO.LOSS_CLAIMS.TRANSCRIBE_AUDIO_SIMPLE(p_file_na
   $$
     DECLARE
     v_obj OBJECT;
+    v_md5 VARCHAR;
+    v_transcript VARIANT;
     BEGIN
+      -- Return the stored transcript of the current file content (from pyutil/segtranscribe or an
+      -- earlier call) instead of re-transcribing the whole recording
+      IF (UPPER(LTRIM(:p_stage_name, '@')) = 'INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE') THEN
+        SELECT MAX(d.md5), MAX_BY(t.transcript, t.transcribed_at)
+        INTO :v_md5, :v_transcript
+        FROM directory('@ins_co.loss_claims.loss_evidence') d
+                 LEFT JOIN INS_CO.LOSS_CLAIMS.CALL_TRANSCRIPTS t ON t.md5 = d.md5
+        WHERE d.relative_path = :p_file_name;
+
+        IF (v_transcript IS NOT NULL) THEN
+          RETURN OBJECT_CONSTRUCT(
+                  'success', TRUE,
+                  'file_name', :p_file_name,
+                  'stage_name', :p_stage_name,
+                  'transcription', :v_transcript,
+                  'transcription_timestamp', CURRENT_TIMESTAMP(),
+                  'stored_transcript', TRUE
+                 );
+        END IF;
+      END IF;
+
       WITH transcription_query_cte AS (SELECT to_file(:p_stage_name, :p_file_name) AS target_file,
                                               ai_transcribe(f => target_file,
                                                             options => PARSE_JSON('{"timestamp_granularity": "speaker"}')
@@ -78,6 +333,13 @@ CREATE OR REPLACE PROCEDURE INS_CO.LOSS_CLAIMS.TRANSCRIBE_AUDIO_SIMPLE(p_file_na
              ) into :v_obj
       FROM transcription_query_cte tq;
 
+      -- Keep the transcript so later questions about the same recording read it
+      IF (v_md5 IS NOT NULL) THEN
+        INSERT INTO INS_CO.LOSS_CLAIMS.CALL_TRANSCRIPTS (relative_path, md5, transcript, segment_count, audio_seconds, method)
+        SELECT :p_file_name, :v_md5, GET(:v_obj, 'transcription'), 1,
+               GET(GET(:v_obj, 'transcription'), 'audio_duration')::FLOAT, 'LIVE';
+      END IF;
+
       RETURN v_obj;
     END;
   $$
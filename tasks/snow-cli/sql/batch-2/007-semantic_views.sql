@@ -57,5 +57,5 @@ create or replace semantic view INS_CO.LOSS_CLAIMS.CA_INS_CO
 		INVOICES.LINE_NO as LINE_NO with synonyms=('entry_number','item_number','line_item_number','line_number','row_number','sequence_number') comment='A unique identifier for each line item on an invoice, representing the sequential order in which the items appear on the invoice.',
 		INVOICES.VENDOR as VENDOR with synonyms=('contractor','dealer','distributor','manufacturer','merchant','provider','seller','supplier','trader') comment='The name of the vendor or supplier that the invoice is associated with.'
 	)
-	with extension (CA='{"tables":[{"name":"AUTHORIZATION","dimensions":[{"name":"CURRENCY","sample_values":["USD"]},{"name":"PERFORMER_ID","sample_values":["181","171","191"]}],"facts":[{"name":"FROM_AMT","sample_values":["0.00"]},{"name":"TO_AMT","sample_values":["3000.00","2500.00","5000.00"]}]},{"name":"CLAIMS","dimensions":[{"name":"CAUSE_OF_LOSS","sample_values":["Hurricane"]},{"name":"CLAIM_NO","sample_values":["1899"]},{"name":"CLAIM_STATUS","sample_values":["Open"]},{"name":"CLAIMANT_ID","sample_values":["19"]},{"name":"LINE_OF_BUSINESS","sample_values":["Property"]},{"name":"LOSS_DESCRIPTION","sample_values":["Damaged dwelling and fence after the tree fell"]},{"name":"LOSS_STATE","sample_values":["NJ"]},{"name":"LOSS_ZIP_CODE","sample_values":["8820"]},{"name":"PERFORMER","sample_values":["18"]},{"name":"POLICY_NO","sample_values":["888"]}],"time_dimensions":[{"name":"CREATED_DATE","sample_values":["2025-01-06"]},{"name":"FNOL_COMPLETION_DATE","sample_values":["2025-01-06"]},{"name":"LOSS_DATE","sample_values":["2025-01-06"]},{"name":"REPORTED_DATE","sample_values":["2025-01-06"]}]},{"name":"CLAIM_LINES","dimensions":[{"name":"CLAIM_NO","sample_values":["1899"]},{"name":"CLAIM_STATUS","sample_values":["Open"]},{"name":"CLAIMANT_ID","sample_values":["19"]},{"name":"LINE_NO","sample_values":["17","18","16"]},{"name":"LOSS_DESCRIPTION","sample_values":["Damaged Dwelling","Damaged Fence","Damaged Lawn"]},{"name":"PERFORMER_ID","sample_values":["181","171","191"]}],"time_dimensions":[{"name":"CREATED_DATE","sample_values":["2025-01-06"]},{"name":"REPORTED_DATE","sample_values":["2025-01-06"]}]},{"name":"FINANCIAL_TRANSACTIONS","dimensions":[{"name":"CURRENCY","sample_values":["USD"]},{"name":"FINANCIAL_TYPE","sample_values":["RSV","PAY"]},{"name":"FXID","sample_values":["22","23","24"]},{"name":"LINE_NO","sample_values":["17","18","16"]}],"facts":[{"name":"FIN_TX_AMT","sample_values":["3000.00","3500.00","4000.00"]}],"time_dimensions":[{"name":"FIN_TX_POST_DT","sample_values":["2025-03-06","2025-06-15","2025-02-15"]}]},{"name":"INVOICES","dimensions":[{"name":"CURRENCY","sample_values":["USD"]},{"name":"DESCRIPTION","sample_values":["Hardware","Labor","Wooden Logs"]},{"name":"INV_ID","sample_values":["7","5","6"]},{"name":"INV_LINE_NBR","sample_values":["3","2","1"]},{"name":"LINE_NO","sample_values":["16","18","17"]},{"name":"VENDOR","sample_values":["LMN","XYZ","ABC"]}],"facts":[{"name":"INVOICE_AMOUNT","sample_values":["2500.00","1000.00","500.00"]}],"time_dimensions":[{"name":"INVOICE_DATE","sample_values":["2025-05-15","2025-03-18","2025-04-20"]}]}],"relationships":[{"name":"CLAIM_LINES_TO_AUTHORIZATION"},{"name":"CLAIM_TO_CLAIM_LINES_CLAIM_ID"},{"name":"FINANCIAL_TO_CLAIM_LINES"},{"name":"CLAIM_LINES_TO_INVOICE"},{"name":"FINANCIAL_TO_INVOICE"}],"verified_queries":[{"name":"Was a payment made in excess of the performer authority? Please respond yes or no and provide more details if yes.","question":"Was a payment made in excess of the performer authority? Please respond yes or no and provide more details if yes.","sql":"WITH auth_fin_tx AS (\\n  SELECT\\n    a.performer_id,\\n    a.to_amt AS max_authorized_amt,\\n    ft.fin_tx_amt\\n  FROM\\n    authorization AS a\\n    INNER JOIN claim_lines AS cl ON a.performer_id = cl.performer_id\\n    INNER JOIN financial_transactions AS ft ON cl.line_no = ft.line_no\\n)\\nSELECT\\n  performer_id,\\n  max_authorized_amt,\\n  fin_tx_amt,\\n  CASE\\n    WHEN fin_tx_amt > max_authorized_amt THEN ''Yes''\\n    ELSE ''No''\\n  END AS payment_exceeds_authority\\nFROM\\n  auth_fin_tx","use_as_onboarding_question":false,"verified_by":"Marie Duran","verified_at":1755720163},{"name":"Was a payment issued to the vendor 30+ calendar days after the invoice was received? If yes, please provide details","question":"Was a payment issued to the vendor 30+ calendar days after the invoice was received? If yes, please provide details","sql":"WITH invoice_payment AS (\\n  SELECT\\n    i.vendor,\\n    i.invoice_date,\\n    ft.fin_tx_post_dt,\\n    DATEDIFF(DAY, i.invoice_date, ft.fin_tx_post_dt) AS days_between\\n  FROM\\n    invoices AS i\\n    LEFT OUTER JOIN financial_transactions AS ft ON i.line_no = ft.line_no\\n)\\nSELECT\\n  vendor,\\n  invoice_date,\\n  fin_tx_post_dt,\\n  days_between,\\n  CASE\\n    WHEN days_between > 30 THEN ''Yes''\\n    ELSE ''No''\\n  END AS payment_issued_late\\nFROM\\n  invoice_payment","use_as_onboarding_question":false,"verified_by":"Marie Duran","verified_at":1755720298},{"name":"Was a payment issued to the vendor 8-13 calendar days after the invoice was received?","question":"Was a payment issued to the vendor 8-13 calendar days after the invoice was received?","sql":"WITH invoice_payment AS (\\n  SELECT\\n    i.vendor,\\n    i.invoice_date,\\n    ft.fin_tx_post_dt,\\n    DATEDIFF(DAY, i.invoice_date, ft.fin_tx_post_dt) AS days_between\\n  FROM\\n    invoices AS i\\n    LEFT OUTER JOIN financial_transactions AS ft ON i.line_no = ft.line_no\\n)\\nSELECT\\n  vendor,\\n  invoice_date,\\n  fin_tx_post_dt,\\n  days_between,\\n  CASE\\n    WHEN days_between BETWEEN 8\\n    AND 13 THEN ''Yes''\\n    ELSE ''No''\\n  END AS payment_issued_within_range\\nFROM\\n  invoice_payment","use_as_onboarding_question":false,"verified_by":"Marie Duran","verified_at":1755720353}]}'
+	with extension (CA='{"tables":[{"name":"AUTHORIZATION","dimensions":[{"name":"CURRENCY","sample_values":["USD"]},{"name":"PERFORMER_ID","sample_values":["171","181","191"]}],"facts":[{"name":"FROM_AMT","sample_values":["0.00"]},{"name":"TO_AMT","sample_values":["2500.00","3000.00","5000.00"]}]},{"name":"CLAIMS","dimensions":[{"name":"CAUSE_OF_LOSS","sample_values":["Hurricane"]},{"name":"CLAIM_NO","sample_values":["1899"]},{"name":"CLAIM_STATUS","sample_values":["Open"]},{"name":"CLAIMANT_ID","sample_values":["19"]},{"name":"LINE_OF_BUSINESS","sample_values":["Property"]},{"name":"LOSS_DESCRIPTION","sample_values":["Damaged dwelling and fence after the tree fell"]},{"name":"LOSS_STATE","sample_values":["NJ"]},{"name":"LOSS_ZIP_CODE","sample_values":["8820"]},{"name":"PERFORMER","sample_values":["18"]},{"name":"POLICY_NO","sample_values":["888"]}],"time_dimensions":[{"name":"CREATED_DATE","sample_values":["2025-01-06"]},{"name":"FNOL_COMPLETION_DATE","sample_values":["2025-01-06"]},{"name":"LOSS_DATE","sample_values":["2025-01-06"]},{"name":"REPORTED_DATE","sample_values":["2025-01-06"]}]},{"name":"CLAIM_LINES","dimensions":[{"name":"CLAIM_NO","sample_values":["1899"]},{"name":"CLAIM_STATUS","sample_values":["Open"]},{"name":"CLAIMANT_ID","sample_values":["19"]},{"name":"LINE_NO","sample_values":["16","17","18"]},{"name":"LOSS_DESCRIPTION","sample_values":["Damaged Dwelling","Damaged Fence","Damaged Lawn"]},{"name":"PERFORMER_ID","sample_values":["171","181","191"]}],"time_dimensions":[{"name":"CREATED_DATE","sample_values":["2025-01-06"]},{"name":"REPORTED_DATE","sample_values":["2025-01-06"]}]},{"name":"FINANCIAL_TRANSACTIONS","dimensions":[{"name":"CURRENCY","sample_values":["USD"]},{"name":"FINANCIAL_TYPE","sample_values":["PAY","RSV"]},{"name":"FXID","sample_values":["21","22","23"]},{"name":"LINE_NO","sample_values":["16","17","18"]}],"facts":[{"name":"FIN_TX_AMT","sample_values":["2000.00","4000.00","3000.00"]}],"time_dimensions":[{"name":"FIN_TX_POST_DT","sample_values":["2025-02-15","2025-03-06","2025-04-05"]}]},{"name":"INVOICES","dimensions":[{"name":"CURRENCY","sample_values":["USD"]},{"name":"DESCRIPTION","sample_values":["Labor","Equipment Rental","Fence"]},{"name":"INV_ID","sample_values":["5","7","6"]},{"name":"INV_LINE_NBR","sample_values":["1","2","3"]},{"name":"LINE_NO","sample_values":["16","18","17"]},{"name":"VENDOR","sample_values":["ABC","XYZ","LMN"]}],"facts":[{"name":"INVOICE_AMOUNT","sample_values":["500.00","1000.00","1200.00"]}],"time_dimensions":[{"name":"INVOICE_DATE","sample_values":["2025-03-18","2025-05-15","2025-04-20"]}]}],"relationships":[{"name":"CLAIM_LINES_TO_AUTHORIZATION"},{"name":"CLAIM_TO_CLAIM_LINES_CLAIM_ID"},{"name":"FINANCIAL_TO_CLAIM_LINES"},{"name":"CLAIM_LINES_TO_INVOICE"},{"name":"FINANCIAL_TO_INVOICE"}],"verified_queries":[{"name":"Was a payment made in excess of the performer authority? Please respond yes or no and provide more details if yes.","question":"Was a payment made in excess of the performer authority? Please respond yes or no and provide more details if yes.","sql":"WITH auth_fin_tx AS (\\n  SELECT\\n    a.performer_id,\\n    a.to_amt AS max_authorized_amt,\\n    ft.fin_tx_amt\\n  FROM\\n    authorization AS a\\n    INNER JOIN claim_lines AS cl ON a.performer_id = cl.performer_id\\n    INNER JOIN financial_transactions AS ft ON cl.line_no = ft.line_no\\n)\\nSELECT\\n  performer_id,\\n  max_authorized_amt,\\n  fin_tx_amt,\\n  CASE\\n    WHEN fin_tx_amt > max_authorized_amt THEN ''Yes''\\n    ELSE ''No''\\n  END AS payment_exceeds_authority\\nFROM\\n  auth_fin_tx","use_as_onboarding_question":false,"verified_by":"Marie Duran","verified_at":1755720163},{"name":"Was a payment issued to the vendor 30+ calendar days after the invoice was received? If yes, please provide details","question":"Was a payment issued to the vendor 30+ calendar days after the invoice was received? If yes, please provide details","sql":"WITH invoice_payment AS (\\n  SELECT\\n    i.vendor,\\n    i.invoice_date,\\n    ft.fin_tx_post_dt,\\n    DATEDIFF(DAY, i.invoice_date, ft.fin_tx_post_dt) AS days_between\\n  FROM\\n    invoices AS i\\n    LEFT OUTER JOIN financial_transactions AS ft ON i.line_no = ft.line_no\\n)\\nSELECT\\n  vendor,\\n  invoice_date,\\n  fin_tx_post_dt,\\n  days_between,\\n  CASE\\n    WHEN days_between > 30 THEN ''Yes''\\n    ELSE ''No''\\n  END AS payment_issued_late\\nFROM\\n  invoice_payment","use_as_onboarding_question":false,"verified_by":"Marie Duran","verified_at":1755720298},{"name":"Was a payment issued to the vendor 8-13 calendar days after the invoice was received?","question":"Was a payment issued to the vendor 8-13 calendar days after the invoice was received?","sql":"WITH invoice_payment AS (\\n  SELECT\\n    i.vendor,\\n    i.invoice_date,\\n    ft.fin_tx_post_dt,\\n    DATEDIFF(DAY, i.invoice_date, ft.fin_tx_post_dt) AS days_between\\n  FROM\\n    invoices AS i\\n    LEFT OUTER JOIN financial_transactions AS ft ON i.line_no = ft.line_no\\n)\\nSELECT\\n  vendor,\\n  invoice_date,\\n  fin_tx_post_dt,\\n  days_between,\\n  CASE\\n    WHEN days_between BETWEEN 8\\n    AND 13 THEN ''Yes''\\n    ELSE ''No''\\n  END AS payment_issued_within_range\\nFROM\\n  invoice_payment","use_as_onboarding_question":false,"verified_by":"Marie Duran","verified_at":1755720353}]}'
 );
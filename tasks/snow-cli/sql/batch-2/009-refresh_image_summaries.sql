@@ -0,0 +1,2 @@
+-- Summarize new or changed images in the loss_evidence stage (no-op when nothing changed)
+CALL INS_CO.LOSS_CLAIMS.REFRESH_IMAGE_SUMMARIES();
@@ -0,0 +1,128 @@
+-- Generated by pyutil/auditrules/auditrules.py generate-sql. Do not edit by hand;
+-- change RULES in auditrules.py and regenerate.
+USE DATABASE ins_co;
+USE SCHEMA ins_co.loss_claims;
+
+-- Evaluates every audit rule for every claim in a single set-based statement and
+-- replaces the contents of CLAIM_AUDIT_FLAGS (one row per claim and rule).
+CREATE OR REPLACE PROCEDURE INS_CO.LOSS_CLAIMS.REFRESH_CLAIM_AUDIT_FLAGS()
+  RETURNS OBJECT
+  LANGUAGE SQL
+  EXECUTE AS OWNER
+  AS
+  $$
+    DECLARE
+    v_rows INTEGER DEFAULT 0;
+    v_flagged INTEGER DEFAULT 0;
+    BEGIN
+      INSERT OVERWRITE INTO INS_CO.LOSS_CLAIMS.CLAIM_AUDIT_FLAGS
+          (claim_no, rule_id, rule_order, rule_description, flagged, violation_count, details, evaluated_at)
+      WITH payments AS (SELECT cl.claim_no, cl.line_no, cl.performer_id, ft.fxid, ft.fin_tx_amt, ft.fin_tx_post_dt
+                        FROM INS_CO.LOSS_CLAIMS.claim_lines cl
+                                 JOIN INS_CO.LOSS_CLAIMS.financial_transactions ft ON ft.line_no = cl.line_no
+                        WHERE ft.financial_type = 'PAY'),
+           invoice_payments AS (SELECT p.claim_no, p.line_no, p.fxid, p.fin_tx_post_dt,
+                                       i.inv_id, i.vendor, i.invoice_date,
+                                       DATEDIFF(DAY, i.invoice_date, p.fin_tx_post_dt) AS days_between
+                                FROM payments p
+                                         JOIN (SELECT DISTINCT inv_id, line_no, vendor, invoice_date
+                                               FROM INS_CO.LOSS_CLAIMS.invoices) i ON i.line_no = p.line_no),
+           claim_totals AS (SELECT cl.claim_no,
+                                   SUM(IFF(ft.financial_type = 'PAY', ft.fin_tx_amt, 0)) AS total_pay,
+                                   SUM(IFF(ft.financial_type = 'RSV', ft.fin_tx_amt, 0)) AS total_rsv
+                            FROM INS_CO.LOSS_CLAIMS.claim_lines cl
+                                     JOIN INS_CO.LOSS_CLAIMS.financial_transactions ft ON ft.line_no = cl.line_no
+                            GROUP BY cl.claim_no),
+           violations AS (
+               SELECT claim_no, 'PAYMENT_LAG_3_5' AS rule_id, line_no, fxid,
+                      OBJECT_CONSTRUCT('line_no', line_no, 'inv_id', inv_id, 'vendor', vendor,
+                                       'invoice_date', invoice_date, 'payment_date', fin_tx_post_dt,
+                                       'days', days_between) AS detail
+               FROM invoice_payments
+               WHERE days_between BETWEEN 3 AND 5
+               UNION ALL
+               SELECT claim_no, 'PAYMENT_LAG_8_13' AS rule_id, line_no, fxid,
+                      OBJECT_CONSTRUCT('line_no', line_no, 'inv_id', inv_id, 'vendor', vendor,
+                                       'invoice_date', invoice_date, 'payment_date', fin_tx_post_dt,
+                                       'days', days_between) AS detail
+               FROM invoice_payments
+               WHERE days_between BETWEEN 8 AND 13
+               UNION ALL
+               SELECT claim_no, 'PAYMENT_LAG_14_29' AS rule_id, line_no, fxid,
+                      OBJECT_CONSTRUCT('line_no', line_no, 'inv_id', inv_id, 'vendor', vendor,
+                                       'invoice_date', invoice_date, 'payment_date', fin_tx_post_dt,
+                                       'days', days_between) AS detail
+               FROM invoice_payments
+               WHERE days_between BETWEEN 14 AND 29
+               UNION ALL
+               SELECT claim_no, 'PAYMENT_LAG_30_PLUS' AS rule_id, line_no, fxid,
+                      OBJECT_CONSTRUCT('line_no', line_no, 'inv_id', inv_id, 'vendor', vendor,
+                                       'invoice_date', invoice_date, 'payment_date', fin_tx_post_dt,
+                                       'days', days_between) AS detail
+               FROM invoice_payments
+               WHERE days_between >= 30
+               UNION ALL
+               SELECT claim_no, 'PAY_OVER_RESERVE' AS rule_id, NULL AS line_no, NULL AS fxid,
+                      OBJECT_CONSTRUCT('total_payment', total_pay, 'total_reserve', total_rsv) AS detail
+               FROM claim_totals
+               WHERE total_pay > total_rsv
+               UNION ALL
+               SELECT p.claim_no, 'PAY_OVER_AUTHORITY' AS rule_id, p.line_no, p.fxid,
+                      OBJECT_CONSTRUCT('line_no', p.line_no, 'performer_id', p.performer_id,
+                                       'payment', p.fin_tx_amt, 'authority', a.to_amt) AS detail
+               FROM payments p
+                        JOIN INS_CO.LOSS_CLAIMS.authorization a ON a.performer_id = p.performer_id
+               WHERE p.fin_tx_amt > a.to_amt
+           ),
+           rules AS (SELECT column1 AS rule_id, column2 AS rule_order, column3 AS rule_description
+                     FROM VALUES
+                  ('PAYMENT_LAG_3_5', 1, 'Payment issued to the vendor 3-5 calendar days after the invoice was received'),
+                  ('PAYMENT_LAG_8_13', 2, 'Payment issued to the vendor 8-13 calendar days after the invoice was received'),
+                  ('PAYMENT_LAG_14_29', 3, 'Payment issued to the vendor 14-29 calendar days after the invoice was received'),
+                  ('PAYMENT_LAG_30_PLUS', 4, 'Payment issued to the vendor 30+ calendar days after the invoice was received'),
+                  ('PAY_OVER_RESERVE', 5, 'Total payment amount for the claim exceeds the total reserved amount'),
+                  ('PAY_OVER_AUTHORITY', 6, 'Payment made in excess of the performer authority'))
+      SELECT c.claim_no,
+             r.rule_id,
+             r.rule_order,
+             r.rule_description,
+             COUNT(v.rule_id) > 0                                                           AS flagged,
+             COUNT(v.rule_id)                                                               AS violation_count,
+             IFF(COUNT(v.rule_id) > 0,
+                 TO_JSON(ARRAY_AGG(v.detail) WITHIN GROUP (ORDER BY v.line_no, v.fxid)), NULL) AS details,
+             CURRENT_TIMESTAMP()                                                            AS evaluated_at
+      FROM INS_CO.LOSS_CLAIMS.claims c
+               CROSS JOIN rules r
+               LEFT JOIN violations v ON v.claim_no = c.claim_no AND v.rule_id = r.rule_id
+      GROUP BY c.claim_no, r.rule_id, r.rule_order, r.rule_description;
+
+      v_rows := SQLROWCOUNT;
+      SELECT COUNT(DISTINCT claim_no) INTO :v_flagged
+      FROM INS_CO.LOSS_CLAIMS.CLAIM_AUDIT_FLAGS
+      WHERE flagged;
+
+      RETURN OBJECT_CONSTRUCT('success', TRUE, 'rows', :v_rows, 'flagged_claims', :v_flagged,
+                              'refresh_timestamp', CURRENT_TIMESTAMP());
+    END;
+  $$
+;
+
+-- Precomputed audit flags for one claim, for the agent and the Streamlit app
+CREATE OR REPLACE FUNCTION INS_CO.LOSS_CLAIMS.GET_CLAIM_AUDIT_FLAGS(P_CLAIM_NO VARCHAR)
+  RETURNS ARRAY
+  LANGUAGE SQL
+  AS
+  $$
+    SELECT ARRAY_AGG(OBJECT_CONSTRUCT('rule_id', rule_id,
+                                      'rule', rule_description,
+                                      'flagged', flagged,
+                                      'violation_count', violation_count,
+                                      'details', PARSE_JSON(details),
+                                      'evaluated_at', evaluated_at))
+                     WITHIN GROUP (ORDER BY rule_order)
+    FROM INS_CO.LOSS_CLAIMS.CLAIM_AUDIT_FLAGS
+    WHERE claim_no = P_CLAIM_NO
+  $$
+;
+
+CALL INS_CO.LOSS_CLAIMS.REFRESH_CLAIM_AUDIT_FLAGS();
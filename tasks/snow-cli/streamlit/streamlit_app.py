@@ -10,10 +10,20 @@ analysis from a Snowflake stage, all within a streamlined interface.
 # --- Imports ---
 import streamlit as st
 import pandas as pd
+import functools
+import hashlib
+import io
 import json
+import logging
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
 from typing import Dict, List, Optional, Tuple
 
+from PIL import Image, ImageOps
+
 # Snowflake-specific imports
 import _snowflake  # Required for Snow API requests and file URLs in Streamlit in Snowflake
 from snowflake.snowpark.context import get_active_session
@@ -37,6 +47,34 @@ CLAIMS_TABLE_NAME = "INS_CO.LOSS_CLAIMS.CLAIMS"
 CLAIM_LINES_TABLE_NAME = "INS_CO.LOSS_CLAIMS.CLAIM_LINES"
 CLAIM_NOTES_TABLE_NAME = "INS_CO.LOSS_CLAIMS.PARSED_CLAIM_NOTES"
 CLAIM_IMAGES_STAGE_NAME = "INS_CO.LOSS_CLAIMS.LOSS_EVIDENCE"
+IMAGE_SUMMARIES_TABLE_NAME = "INS_CO.LOSS_CLAIMS.IMAGE_SUMMARIES"
+IMAGE_SIMILARITY_SCORES_TABLE_NAME = "INS_CO.LOSS_CLAIMS.IMAGE_SIMILARITY_SCORES"
+CLAIM_AUDIT_FLAGS_TABLE_NAME = "INS_CO.LOSS_CLAIMS.CLAIM_AUDIT_FLAGS"
+
+# Evidence images scoring below this similarity to the loss description are flagged as outliers
+SIMILARITY_OUTLIER_THRESHOLD = 0.5
+
+# Prompt and model shared with the REFRESH_IMAGE_SUMMARIES batch job
+IMAGE_SUMMARY_MODEL = "claude-3-5-sonnet"
+IMAGE_SUMMARY_PROMPT = "Summarize the key insights from the attached image in 100 words."
+
+# Configuration for the stage file listing (backed by the stage directory table)
+IMAGE_FILE_EXTENSIONS = ("jpg", "jpeg", "png", "gif", "webp")
+STAGE_LISTING_FETCH_SIZE = 5000  # rows per DIRECTORY() round-trip
+STAGE_LISTING_PAGE_SIZE = 200  # files offered per page in the image selectbox
+STAGE_LISTING_REFRESH_SECONDS = 60  # minimum interval between incremental refreshes
+
+# Configuration for the evidence image cache
+IMAGE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "ins_co_claims_audit_image_cache")
+IMAGE_CACHE_MAX_MEMORY_BYTES = 64 * 1024 * 1024  # upper bound for the in-memory LRU tier
+IMAGE_CACHE_MAX_DISK_BYTES = 512 * 1024 * 1024  # upper bound for the on-disk tier
+IMAGE_THUMBNAIL_MAX_DIMENSION = 800  # longest edge of the preview rendition, in pixels
+IMAGE_THUMBNAIL_JPEG_QUALITY = 80
+
+# Configuration for performance tracing
+PERF_TRACE_STAGE_NAME = "INS_CO.LOSS_CLAIMS.APP_TELEMETRY"  # JSON lines exports land under perf_traces/
+PERF_TRACE_MAX_EVENTS = 2000  # trace events retained per app session
+perf_logger = logging.getLogger("ins_co_claims_audit.perf")
 
 # --- Snowflake Session Initialization ---
 try:
@@ -46,8 +84,166 @@ except Exception as e:
     st.stop()
 
 
+# --- Performance Instrumentation ---
+class PerfTracer:
+    """
+    Per-session record of timed Snowflake and Cortex round-trips.
+
+    Every traced call produces one event with its latency, result rows and bytes and, for
+    cached functions, whether the call was a cache hit or miss. Events are tagged with the
+    rerun they happened in and also emitted as JSON lines on the perf logger.
+    """
+
+    def __init__(self):
+        self.session_id = uuid.uuid4().hex
+        self.rerun = 0
+        self.events: deque = deque(maxlen=PERF_TRACE_MAX_EVENTS)
+
+    def start_rerun(self):
+        self.rerun += 1
+
+    def record(self, event: Dict):
+        event.update({"session_id": self.session_id, "rerun": self.rerun, "ts": time.time()})
+        self.events.append(event)
+        perf_logger.info(json.dumps(event, default=str))
+
+    def to_json_lines(self) -> str:
+        return "".join(json.dumps(event, default=str) + "\n" for event in self.events)
+
+    def summary(self, rerun: Optional[int] = None) -> pd.DataFrame:
+        """Aggregates events per traced call, optionally for a single rerun."""
+        events = [e for e in self.events if rerun is None or e["rerun"] == rerun]
+        if not events:
+            return pd.DataFrame()
+        df = pd.DataFrame(events)
+        for column in ("cache", "rows", "bytes"):
+            if column not in df.columns:
+                df[column] = None
+        return df.groupby("name").agg(
+            calls=("latency_ms", "size"),
+            total_ms=("latency_ms", "sum"),
+            max_ms=("latency_ms", "max"),
+            hits=("cache", lambda c: int((c == "hit").sum() + (c == "memory").sum() + (c == "disk").sum())),
+            misses=("cache", lambda c: int((c == "miss").sum())),
+            rows=("rows", "sum"),
+            bytes=("bytes", "sum"),
+        ).sort_values("total_ms", ascending=False)
+
+
+_trace_context = threading.local()
+
+
+def get_perf_tracer() -> PerfTracer:
+    """Returns the tracer stored in the current Streamlit session."""
+    if "perf_tracer" not in st.session_state:
+        st.session_state.perf_tracer = PerfTracer()
+    return st.session_state.perf_tracer
+
+
+def annotate_trace(**fields):
+    """Adds fields (e.g. which cache tier served the call) to the trace event in progress."""
+    stack = getattr(_trace_context, "stack", None)
+    if stack:
+        stack[-1].update(fields)
+
+
+def measure_result(result) -> Tuple[Optional[int], Optional[int]]:
+    """Returns (rows, bytes) for the common result shapes of the traced functions."""
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if isinstance(result, pd.DataFrame):
+        return len(result), int(result.memory_usage(deep=True).sum())
+    if isinstance(result, (bytes, bytearray)):
+        return None, len(result)
+    if isinstance(result, str):
+        return None, len(result.encode("utf-8"))
+    if isinstance(result, list):
+        return len(result), None
+    if isinstance(getattr(result, "files", None), dict):
+        # StageListing (matched by shape: cached instances outlive the class of a rerun)
+        return len(result.files), None
+    return None, None
+
+
+def traced(name: str, cache: Optional[Dict] = None):
+    """
+    Decorator that records a trace event for every call of the decorated function.
+
+    When cache is given, the function is also wrapped in st.cache_data(**cache) and the
+    event records whether the call was served from the cache.
+    """
+    def decorator(func):
+        inner = func
+        if cache is not None:
+            @functools.wraps(func)
+            def on_cache_miss(*args, **kwargs):
+                annotate_trace(cache="miss")
+                return func(*args, **kwargs)
+            inner = st.cache_data(**cache)(on_cache_miss)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            event = {"name": name, "cache": "hit" if cache is not None else None}
+            stack = _trace_context.__dict__.setdefault("stack", [])
+            stack.append(event)
+            started = time.perf_counter()
+            try:
+                result = inner(*args, **kwargs)
+                event["rows"], event["bytes"] = measure_result(result)
+                return result
+            except Exception as e:
+                event["error"] = type(e).__name__
+                raise
+            finally:
+                event["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                stack.pop()
+                get_perf_tracer().record(event)
+        return wrapper
+    return decorator
+
+
+def export_perf_trace() -> Optional[str]:
+    """Uploads the session's trace events as a JSON lines file and returns its stage path."""
+    tracer = get_perf_tracer()
+    stage_path = f"@{PERF_TRACE_STAGE_NAME}/perf_traces/{tracer.session_id}/{int(time.time())}.jsonl"
+    try:
+        session.file.put_stream(
+            io.BytesIO(tracer.to_json_lines().encode("utf-8")),
+            stage_path,
+            auto_compress=False,
+            overwrite=True
+        )
+        return stage_path
+    except Exception as e:
+        st.error(f"Error exporting performance trace to {stage_path}: {e}")
+        return None
+
+
+def display_perf_panel():
+    """Renders the optional sidebar panel summarizing traced round-trips."""
+    with st.sidebar:
+        if not st.checkbox("Show performance panel", key="show_perf_panel"):
+            return
+        tracer = get_perf_tracer()
+        current = tracer.summary(rerun=tracer.rerun)
+        st.subheader("Performance")
+        st.metric(
+            label=f"Rerun #{tracer.rerun} traced time",
+            value=f"{current['total_ms'].sum() if not current.empty else 0:.0f} ms",
+            help="Sum of traced Snowflake and Cortex call latencies during the last rerun."
+        )
+        st.caption("This rerun")
+        st.dataframe(current, use_container_width=True)
+        st.caption(f"Session ({len(tracer.events)} events)")
+        st.dataframe(tracer.summary(), use_container_width=True)
+        if st.button("Export trace (JSON lines)"):
+            exported_path = export_perf_trace()
+            if exported_path:
+                st.success(f"Exported to {exported_path}")
+
+
 # --- Data Retrieval Functions ---
-@st.cache_data(ttl=3600)
+@traced("get_claim_numbers", cache={"ttl": 3600})
 def get_claim_numbers() -> List[str]:
     """Fetches distinct claim numbers from the Snowflake CLAIMS table."""
     try:
@@ -59,7 +255,7 @@ def get_claim_numbers() -> List[str]:
         return []
 
 
-@st.cache_data(ttl=3600)
+@traced("get_claim_details", cache={"ttl": 3600})
 def get_claim_details(claim_number: str) -> Dict:
     """Fetches comprehensive details for a given claim number."""
     details = {"claim_details": "Error fetching details.", "audit_questions": [], "loss_description": None}
@@ -107,23 +303,136 @@ def get_claim_details(claim_number: str) -> Dict:
         return details
 
 
-@st.cache_data(ttl=3600)
-def list_images_in_stage(stage_name: str) -> List[str]:
-    """Lists image files in a specified Snowflake stage."""
+@traced("get_claim_audit_flags", cache={"ttl": 300, "show_spinner": False})
+def get_claim_audit_flags(claim_number: str) -> Optional[pd.DataFrame]:
+    """Looks up the audit rule results computed for all claims by REFRESH_CLAIM_AUDIT_FLAGS."""
     try:
-        df = session.sql(f"LS @{stage_name}").to_pandas()
-        if '"name"' in df.columns:
-            full_paths = df['"name"'].tolist()
-            return sorted([path.split('/')[-1] for path in full_paths])
+        df = session.sql(
+            "SELECT rule_description, flagged, violation_count, details, evaluated_at "
+            f"FROM {CLAIM_AUDIT_FLAGS_TABLE_NAME} WHERE claim_no = ? ORDER BY rule_order",
+            params=[claim_number]
+        ).to_pandas()
+    except SnowparkSQLException:
+        return None
+    return None if df.empty else df
+
+
+def display_claim_audit_flags(claim_number: str):
+    """Renders the precomputed audit flags for a claim, with the details of each violation."""
+    flags_df = get_claim_audit_flags(claim_number)
+    st.subheader("Audit Flags")
+    if flags_df is None:
+        st.info("No audit flags have been computed for this claim yet. Run REFRESH_CLAIM_AUDIT_FLAGS to evaluate all claims.")
+        return
+
+    flagged_count = int(flags_df["FLAGGED"].sum())
+    st.caption(
+        f"{flagged_count} of {len(flags_df)} audit rules flagged, evaluated at {flags_df['EVALUATED_AT'].iloc[0]}."
+    )
+    for _, row in flags_df.iterrows():
+        if row["FLAGGED"]:
+            with st.expander(f"🚩 {row['RULE_DESCRIPTION']} ({row['VIOLATION_COUNT']})"):
+                st.dataframe(pd.DataFrame(json.loads(row["DETAILS"])), use_container_width=True, hide_index=True)
         else:
-            st.warning(f"Could not find 'name' column in stage listing for @{stage_name}.")
-            return []
-    except Exception as e:
-        st.error(f"Error listing images in stage @{stage_name}: {e}")
-        return []
+            st.markdown(f"✅ {row['RULE_DESCRIPTION']}: no")
+
+
+class StageListing:
+    """
+    Incrementally maintained listing of the files in a stage's directory table that
+    match an extension and file-name prefix filter.
+
+    Each refresh only pulls rows modified at or after the newest LAST_MODIFIED already
+    seen. The watermark is inclusive, so files sharing its timestamp (e.g. from one
+    multi-file PUT) are not missed; rows seen again replace their entry by relative path.
+    Files removed from the stage stay listed until a full refresh is forced.
+    """
 
+    def __init__(self):
+        self.files: Dict[str, Dict] = {}
+        self.sorted_paths: List[str] = []
+        self.watermark: Optional[str] = None
+        self.refreshed_at = 0.0
+        self.lock = threading.Lock()
+
+    def reset(self):
+        self.files = {}
+        self.sorted_paths = []
+        self.watermark = None
+
+
+@st.cache_resource
+def get_stage_listing(stage_name: str, extensions: Tuple[str, ...], name_prefix: str) -> StageListing:
+    """Returns the process-wide listing for a stage and filter combination."""
+    return StageListing()
+
+
+@traced("refresh_stage_listing")
+def refresh_stage_listing(
+    stage_name: str,
+    extensions: Tuple[str, ...],
+    name_prefix: str = "",
+    force: bool = False
+) -> StageListing:
+    """
+    Brings a stage listing up to date from DIRECTORY(@stage).
 
-@st.cache_data(show_spinner=False)
+    The extension and prefix filters and the ordering are evaluated by Snowflake, and rows
+    are pulled in pages of STAGE_LISTING_FETCH_SIZE. Refreshes are throttled to one per
+    STAGE_LISTING_REFRESH_SECONDS unless forced; a forced refresh re-lists from scratch.
+    """
+    listing = get_stage_listing(stage_name, extensions, name_prefix)
+    with listing.lock:
+        if not force and time.time() - listing.refreshed_at < STAGE_LISTING_REFRESH_SECONDS:
+            annotate_trace(cache="hit")
+            return listing
+        annotate_trace(cache="miss")
+        if force:
+            listing.reset()
+
+        extension_binds = ", ".join("?" for _ in extensions)
+        watermark_filter = "AND last_modified >= TO_TIMESTAMP_TZ(?, 'YYYY-MM-DD HH24:MI:SS.FF9 TZHTZM')" if listing.watermark else ""
+        params = [*extensions, name_prefix] + ([listing.watermark] if listing.watermark else [])
+        offset = 0
+        try:
+            while True:
+                df = session.sql(
+                    f"""
+                    SELECT relative_path, size, md5,
+                           TO_VARCHAR(last_modified, 'YYYY-MM-DD HH24:MI:SS.FF9 TZHTZM') AS modified_at
+                    FROM DIRECTORY(@{stage_name})
+                    WHERE LOWER(SPLIT_PART(relative_path, '.', -1)) IN ({extension_binds})
+                      AND STARTSWITH(relative_path, ?)
+                      {watermark_filter}
+                    ORDER BY last_modified, relative_path
+                    LIMIT {STAGE_LISTING_FETCH_SIZE} OFFSET {offset}
+                    """,
+                    params=params
+                ).to_pandas()
+                # Keyed by path: rows at the inclusive watermark are fetched again and
+                # replace their entry (with the new md5 if the file was re-uploaded)
+                for row in df.itertuples(index=False):
+                    listing.files[row.RELATIVE_PATH] = {
+                        "relative_path": row.RELATIVE_PATH,
+                        "size": int(row.SIZE),
+                        "md5": row.MD5,
+                        "last_modified": row.MODIFIED_AT,
+                    }
+                if not df.empty:
+                    listing.watermark = df["MODIFIED_AT"].iloc[-1]
+                if len(df) < STAGE_LISTING_FETCH_SIZE:
+                    break
+                offset += STAGE_LISTING_FETCH_SIZE
+        except Exception as e:
+            st.error(f"Error listing files in stage @{stage_name}: {e}")
+            return listing
+
+        listing.sorted_paths = sorted(listing.files)
+        listing.refreshed_at = time.time()
+    return listing
+
+
+@traced("get_query_exec_result", cache={"show_spinner": False})
 def get_query_exec_result(query: str) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
     """Executes a SQL query and returns a DataFrame or an error message."""
     try:
@@ -133,7 +442,204 @@ def get_query_exec_result(query: str) -> Tuple[Optional[pd.DataFrame], Optional[
         return None, str(e)
 
 
+# --- Evidence Image Cache ---
+class ImageByteCache:
+    """
+    Two-tier cache for image bytes downloaded from a Snowflake stage.
+
+    Tier 1 is an in-memory LRU bounded by total bytes. Tier 2 is a content-addressed
+    store on local disk, also bounded by total bytes: when it grows past the cap, the
+    least recently used files (by modification time, refreshed on every disk hit) are
+    removed. Entries are keyed by stage path, file md5 and rendition, so a re-uploaded
+    file with new content never serves stale bytes, and the stale entries age out.
+    """
+
+    def __init__(self, cache_dir: str, max_memory_bytes: int, max_disk_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    @staticmethod
+    def content_key(stage_path: str, md5: str, rendition: str) -> str:
+        """Returns the content address for a rendition of a staged file."""
+        return hashlib.sha256(f"{stage_path}|{md5}|{rendition}".encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns cached bytes from memory, then disk, or None on a miss."""
+        return self.lookup(key)[0]
+
+    def lookup(self, key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Returns cached bytes and the tier ("memory" or "disk") that served them."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data, "memory"
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None, None
+        self._remember(key, data)
+        return data, "disk"
+
+    def put(self, key: str, data: bytes, in_memory: bool = True):
+        """Writes bytes to the disk store and, optionally, to the in-memory LRU."""
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        try:
+            replaced = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(temp_path, path)
+        with self._lock:
+            self._disk_bytes += len(data) - replaced
+            over_cap = self._disk_bytes > self.max_disk_bytes
+        if over_cap:
+            self._evict_disk()
+        if in_memory:
+            self._remember(key, data)
+
+    def _disk_files(self) -> List[Tuple[str, int, float]]:
+        """Returns (path, size, mtime) of every file in the disk store."""
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _evict_disk(self):
+        """Removes least recently used files until the disk store is at 90% of its cap."""
+        files = sorted(self._disk_files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * 0.9
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.max_memory_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._entries[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+
+@st.cache_resource
+def get_image_cache() -> ImageByteCache:
+    """Returns the process-wide image cache shared by all app sessions."""
+    return ImageByteCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MEMORY_BYTES, IMAGE_CACHE_MAX_DISK_BYTES)
+
+
+@traced("get_stage_file_md5", cache={"ttl": 300})
+def get_stage_file_md5(stage_name: str, file_name: str) -> Optional[str]:
+    """Returns the md5 recorded in the stage directory table for a single file."""
+    try:
+        df = session.sql(
+            f"SELECT md5 FROM DIRECTORY(@{stage_name}) WHERE relative_path = ?",
+            params=[file_name]
+        ).to_pandas()
+    except Exception as e:
+        st.error(f"Error reading metadata for '{file_name}' in stage @{stage_name}: {e}")
+        return None
+    return None if df.empty else df.iloc[0, 0]
+
+
+def make_image_thumbnail(image_bytes: bytes) -> bytes:
+    """Downscales an image to the preview rendition, re-encoded as JPEG."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        preview = ImageOps.exif_transpose(img)
+        preview.thumbnail((IMAGE_THUMBNAIL_MAX_DIMENSION, IMAGE_THUMBNAIL_MAX_DIMENSION))
+        if preview.mode not in ("RGB", "L"):
+            preview = preview.convert("RGB")
+        output = io.BytesIO()
+        preview.save(output, format="JPEG", quality=IMAGE_THUMBNAIL_JPEG_QUALITY, optimize=True)
+        return output.getvalue()
+
+
+@traced("get_image_from_stage")
+def get_image_from_stage(
+    stage_name: str,
+    file_name: str,
+    md5: Optional[str] = None,
+    rendition: str = "thumbnail"
+) -> Optional[bytes]:
+    """
+    Returns the bytes of a staged image, served from the image cache when possible.
+
+    The first fetch of a file streams the original from the stage, stores it on disk only,
+    and generates the downscaled "thumbnail" rendition, which is kept in both tiers. The
+    "original" rendition is only read back when explicitly requested. The md5 is looked up
+    in the directory table when the caller does not already have it from a stage listing.
+    """
+    stage_path = f"@{stage_name}/{file_name}"
+    md5 = md5 or get_stage_file_md5(stage_name, file_name)
+    if md5 is None:
+        st.error(f"Image '{file_name}' was not found in stage @{stage_name}.")
+        return None
+
+    cache = get_image_cache()
+    cached, tier = cache.lookup(ImageByteCache.content_key(stage_path, md5, rendition))
+    annotate_trace(cache=tier or "miss", rendition=rendition)
+    if cached is not None:
+        return cached
+
+    original_key = ImageByteCache.content_key(stage_path, md5, "original")
+    original = cache.get(original_key) if rendition != "original" else None
+    if original is None:
+        try:
+            original = session.file.get_stream(stage_path).read()
+        except Exception as e:
+            st.error(f"Error fetching image '{file_name}' from stage @{stage_name}: {e}")
+            return None
+        cache.put(original_key, original, in_memory=rendition == "original")
+    if rendition == "original":
+        return original
+
+    try:
+        thumbnail = make_image_thumbnail(original)
+    except Exception:
+        # Not decodable by Pillow; the browser may still render it, so serve the original.
+        thumbnail = original
+    cache.put(ImageByteCache.content_key(stage_path, md5, rendition), thumbnail)
+    return thumbnail
+
+
 # --- Cortex API & Chat Logic Functions ---
+@traced("get_analyst_response")
 def get_analyst_response(messages: List[Dict]) -> Tuple[Optional[Dict], Optional[str]]:
     """Sends chat history to the Cortex Analyst API and returns the response."""
     request_body = {
@@ -161,24 +667,6 @@ def get_analyst_response(messages: List[Dict]) -> Tuple[Optional[Dict], Optional
         return None, f"An unexpected error occurred during the API call: {e}"
 
 
-@st.cache_data(ttl=3600)
-def get_image_from_stage(stage_name: str, file_name: str) -> Optional[bytes]:
-    """
-    Downloads an image file from a Snowflake stage to a temporary local directory,
-    reads it into memory, and returns its bytes.
-    """
-    try:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            session.file.get(f"@{stage_name}/{file_name}", temp_dir)
-            local_file_path = os.path.join(temp_dir, file_name)
-            with open(local_file_path, "rb") as f:
-                image_bytes = f.read()
-            return image_bytes
-    except Exception as e:
-        st.error(f"Error fetching image '{file_name}' from stage @{stage_name}: {e}")
-        return None
-
-
 def process_user_input(prompt: str):
     """Adds a user prompt to the chat history and triggers a rerun."""
     if not prompt:
@@ -200,12 +688,35 @@ def get_and_process_analyst_response():
     st.session_state.messages.append(analyst_message)
 
 
-def get_image_summary(image_file: str, stage: str) -> str:
-    """Uses Snowflake Cortex to generate a summary for an image in a stage."""
-    prompt = "Summarize the key insights from the attached image in 100 words."
+@traced("get_precomputed_image_summary", cache={"ttl": 600, "show_spinner": False})
+def get_precomputed_image_summary(image_file: str, md5: str) -> Optional[str]:
+    """Looks up the summary generated by the REFRESH_IMAGE_SUMMARIES batch job."""
+    try:
+        df = session.sql(
+            f"SELECT summary FROM {IMAGE_SUMMARIES_TABLE_NAME} "
+            "WHERE relative_path = ? AND md5 = ? ORDER BY summarized_at DESC LIMIT 1",
+            params=[image_file, md5]
+        ).to_pandas()
+    except SnowparkSQLException:
+        return None
+    return None if df.empty else df.iloc[0, 0]
+
+
+@traced("get_image_summary")
+def get_image_summary(image_file: str, stage: str, md5: Optional[str] = None) -> str:
+    """
+    Returns the summary for an image in a stage, read from the precomputed
+    IMAGE_SUMMARIES table when available and generated live with Cortex otherwise.
+    """
+    md5 = md5 or get_stage_file_md5(stage, image_file)
+    if md5 and stage.upper() == CLAIM_IMAGES_STAGE_NAME:
+        summary = get_precomputed_image_summary(image_file, md5)
+        if summary:
+            return summary
+
     sql_query = f"""
-    SELECT SNOWFLAKE.CORTEX.COMPLETE('claude-3-5-sonnet',
-        '{prompt}',
+    SELECT SNOWFLAKE.CORTEX.COMPLETE('{IMAGE_SUMMARY_MODEL}',
+        '{IMAGE_SUMMARY_PROMPT}',
         TO_FILE('@{stage}/{image_file}'));
     """
     try:
@@ -222,18 +733,14 @@ def get_image_summary(image_file: str, stage: str) -> str:
         return "An error occurred during summary generation."
 
 
+@traced("get_similarity_score")
 def get_similarity_score(text1: str, text2: str) -> Optional[float]:
     """Calculates the AI_SIMILARITY score between two text inputs."""
-    # The AI_SIMILARITY function is called directly with the input strings.
-    sql_query = f"""
-    SELECT SNOWFLAKE.CORTEX.AI_SIMILARITY(
-        '{text1.replace("'", "''")}',
-        '{text2.replace("'", "''")}'
-    );
-    """
+    # The input strings are passed as bound parameters rather than escaped literals.
+    sql_query = "SELECT SNOWFLAKE.CORTEX.AI_SIMILARITY(?, ?)"
     try:
         with st.spinner("Calculating similarity score..."):
-            result_df = session.sql(sql_query).to_pandas()
+            result_df = session.sql(sql_query, params=[text1, text2]).to_pandas()
             if not result_df.empty and result_df.iloc[0, 0]:
                 return result_df.iloc[0, 0]
             else:
@@ -243,6 +750,68 @@ def get_similarity_score(text1: str, text2: str) -> Optional[float]:
         return None
 
 
+@traced("score_claim_images")
+def score_claim_images(claim_number: str, loss_description: str) -> bool:
+    """
+    Scores every summarized evidence image of a claim against its loss description.
+
+    Images belong to a claim when their file name starts with "<claim number>_". Scores are
+    persisted in IMAGE_SIMILARITY_SCORES by (summary hash, description hash), so only pairs
+    that were never scored before are sent to AI_SIMILARITY, in a single set-based statement.
+    Returns False on error.
+    """
+    claim_prefix = f"{claim_number}_"
+    score_missing_sql = f"""
+    INSERT INTO {IMAGE_SIMILARITY_SCORES_TABLE_NAME} (summary_hash, description_hash, score)
+    SELECT s.summary_hash, SHA2(?, 256), SNOWFLAKE.CORTEX.AI_SIMILARITY(s.summary, ?)
+    FROM (SELECT DISTINCT SHA2(summary, 256) AS summary_hash, summary
+          FROM {IMAGE_SUMMARIES_TABLE_NAME}
+          WHERE STARTSWITH(relative_path, ?)) s
+    WHERE NOT EXISTS (SELECT 1
+                      FROM {IMAGE_SIMILARITY_SCORES_TABLE_NAME} c
+                      WHERE c.summary_hash = s.summary_hash
+                        AND c.description_hash = SHA2(?, 256))
+    """
+    try:
+        session.sql(
+            score_missing_sql,
+            params=[loss_description, loss_description, claim_prefix, loss_description]
+        ).collect()
+        return True
+    except Exception as e:
+        st.error(f"Error scoring evidence images for claim {claim_number}: {e}")
+        return False
+
+
+@traced("rank_claim_images_by_similarity", cache={"ttl": 600, "show_spinner": False})
+def rank_claim_images_by_similarity(claim_number: str, loss_description: str,
+                                    scores_version: int) -> Optional[pd.DataFrame]:
+    """
+    Ranks the summarized evidence images of a claim by their persisted similarity score.
+
+    Read-only; images are scored by score_claim_images. scores_version is only part of the
+    cache key and changes after every scoring pass, so new summaries and scores show up.
+    """
+    claim_prefix = f"{claim_number}_"
+    ranking_sql = f"""
+    SELECT s.relative_path AS "Image", c.score AS "Similarity", s.summary AS "Summary"
+    FROM {IMAGE_SUMMARIES_TABLE_NAME} s
+    LEFT JOIN (SELECT summary_hash, description_hash, MAX(score) AS score
+               FROM {IMAGE_SIMILARITY_SCORES_TABLE_NAME}
+               GROUP BY summary_hash, description_hash) c
+           ON c.summary_hash = SHA2(s.summary, 256)
+          AND c.description_hash = SHA2(?, 256)
+    WHERE STARTSWITH(s.relative_path, ?)
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY s.relative_path ORDER BY s.summarized_at DESC) = 1
+    ORDER BY c.score ASC NULLS FIRST, s.relative_path
+    """
+    try:
+        return session.sql(ranking_sql, params=[loss_description, claim_prefix]).to_pandas()
+    except Exception as e:
+        st.error(f"Error ranking evidence images for claim {claim_number}: {e}")
+        return None
+
+
 # --- UI Display Functions ---
 def display_sql_query(sql: str):
     """Displays an expander with the SQL query and the results in a table and chart."""
@@ -302,7 +871,8 @@ def on_claim_change():
     st.session_state.messages = []
 
 
-# 3. Check if the last message was from the user, if so, get the analyst response
+# 3. Start a new trace rerun, then check if the last message was from the user, if so, get the analyst response
+get_perf_tracer().start_rerun()
 if st.session_state.messages and st.session_state.messages[-1]["role"] == "user":
     get_and_process_analyst_response()
 
@@ -365,6 +935,7 @@ SELECT SNOWFLAKE.CORTEX.SEARCH(
         # --- Claim Details and Predefined Questions ---
         data = get_claim_details(selected_claim)
         st.text_area("Claim Details Summary", data["claim_details"], height=250, disabled=True)
+        display_claim_audit_flags(selected_claim)
         st.markdown("---")
 
         col1, col2 = st.columns([3, 1])
@@ -419,16 +990,52 @@ with tab2:
                        );
                 """, language="sql")
 
-    image_files = list_images_in_stage(CLAIM_IMAGES_STAGE_NAME)
+    list_col, refresh_col = st.columns([3, 1])
+    with list_col:
+        claim_images_only = st.checkbox(
+            "Only list images for the selected claim",
+            value=False,
+            disabled=not st.session_state.selected_claim
+        )
+    with refresh_col:
+        force_relist = st.button("Re-list Stage", use_container_width=True)
+
+    image_prefix = f"{st.session_state.selected_claim}_" if claim_images_only and st.session_state.selected_claim else ""
+    image_listing = refresh_stage_listing(
+        CLAIM_IMAGES_STAGE_NAME,
+        IMAGE_FILE_EXTENSIONS,
+        image_prefix,
+        force=force_relist
+    )
+    image_files = image_listing.sorted_paths
 
     if not image_files:
         st.warning(f"No image files found in stage @{CLAIM_IMAGES_STAGE_NAME}.")
     else:
-        selected_image = st.selectbox("Select an Image File:", options=[""] + image_files)
+        page_count = (len(image_files) + STAGE_LISTING_PAGE_SIZE - 1) // STAGE_LISTING_PAGE_SIZE
+        page = 1
+        if page_count > 1:
+            page = st.number_input(
+                f"Page (of {page_count}, {len(image_files)} images):",
+                min_value=1,
+                max_value=page_count,
+                value=1
+            )
+        page_start = (page - 1) * STAGE_LISTING_PAGE_SIZE
+        page_files = image_files[page_start:page_start + STAGE_LISTING_PAGE_SIZE]
+        selected_image = st.selectbox("Select an Image File:", options=[""] + page_files)
 
         if selected_image and st.session_state.selected_claim:
-            # Display the selected image from the stage
-            image_bytes = get_image_from_stage(CLAIM_IMAGES_STAGE_NAME, selected_image)
+            image_md5 = image_listing.files[selected_image]["md5"]
+
+            # Display the selected image from the stage (preview rendition unless the original is requested)
+            show_original = st.checkbox("Load full-resolution original", key="show_original_image")
+            image_bytes = get_image_from_stage(
+                CLAIM_IMAGES_STAGE_NAME,
+                selected_image,
+                md5=image_md5,
+                rendition="original" if show_original else "thumbnail"
+            )
             if image_bytes:
                 st.image(
                     image_bytes,
@@ -439,7 +1046,7 @@ with tab2:
             # Button to generate the summary for the displayed image
             if st.button("Generate Image Summary & Similarity"):
                 # Get the image summary
-                image_summary = get_image_summary(selected_image, CLAIM_IMAGES_STAGE_NAME)
+                image_summary = get_image_summary(selected_image, CLAIM_IMAGES_STAGE_NAME, md5=image_md5)
 
                 # Get the loss description from the main claim details
                 claim_details = get_claim_details(st.session_state.selected_claim)
@@ -466,3 +1073,53 @@ with tab2:
                     st.info("Both an image summary and a claim description are needed to calculate a similarity score.")
         elif selected_image and not st.session_state.selected_claim:
             st.info("Please select a claim from the 'Claims Audit & Chat' tab to compare against the image.")
+
+    # --- Claim-wide Similarity Ranking ---
+    st.markdown("---")
+    st.subheader("Claim Evidence Similarity Ranking")
+    if not st.session_state.selected_claim:
+        st.info("Please select a claim from the 'Claims Audit & Chat' tab to rank its evidence images.")
+    else:
+        ranking_claim = st.session_state.selected_claim
+        outlier_threshold = st.slider(
+            "Flag images scoring below:",
+            min_value=0.0,
+            max_value=1.0,
+            value=SIMILARITY_OUTLIER_THRESHOLD,
+            step=0.05
+        )
+        rank_clicked = st.button("Rank All Evidence Images for Claim")
+        if rank_clicked:
+            st.session_state.ranked_claim = ranking_claim
+
+        if st.session_state.get("ranked_claim") == ranking_claim:
+            loss_description = get_claim_details(ranking_claim).get("loss_description")
+            if not loss_description:
+                st.info("A claim description is needed to rank evidence images.")
+            else:
+                with st.spinner("Scoring evidence images against the claim description..."):
+                    # Score summaries added since the last click, then read a fresh ranking;
+                    # reruns in between (e.g. moving the slider) reuse the cached ranking
+                    if rank_clicked:
+                        score_claim_images(ranking_claim, loss_description)
+                        st.session_state.ranking_scores_version = st.session_state.get("ranking_scores_version", 0) + 1
+                    ranking_df = rank_claim_images_by_similarity(
+                        ranking_claim, loss_description, st.session_state.get("ranking_scores_version", 0)
+                    )
+                if ranking_df is not None and ranking_df.empty:
+                    st.info(
+                        f"No summarized images found for claim {ranking_claim}. "
+                        "Image summaries are produced by the REFRESH_IMAGE_SUMMARIES batch job."
+                    )
+                elif ranking_df is not None:
+                    ranking_df = ranking_df.copy()
+                    ranking_df["Outlier"] = ranking_df["Similarity"].isna() | (ranking_df["Similarity"] < outlier_threshold)
+                    outlier_count = int(ranking_df["Outlier"].sum())
+                    st.metric(
+                        label=f"Images below {outlier_threshold:.2f}",
+                        value=f"{outlier_count} of {len(ranking_df)}"
+                    )
+                    st.dataframe(ranking_df, use_container_width=True, hide_index=True)
+
+# 5. Render the optional performance panel last, so it includes this rerun's calls
+display_perf_panel()